@@ -1,37 +1,115 @@
-from typing import Any
-from langchain_openai import ChatOpenAI, AzureChatOpenAI
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_ollama import ChatOllama
-from langchain_anthropic import ChatAnthropic
+from typing import Any, Optional
+import asyncio
+import hashlib
+import httpx
+import importlib
 import logging
 import os
+import threading
 
 from app.utils.config.llm import (
     get_llm_config,
+    get_llm_settings,
+    get_llm_target_config,
 )
+from app.utils.config_manager import config_manager
+from app.models.llm_router import RoutingChatModel, TargetStats
+from app.utils.llm_cache import get_response_cache, reset_response_cache
+from app.utils.rate_limiter import clear_rate_limiters, get_rate_limiter
 
 logger = logging.getLogger(__name__)
 
 
 # Combined dictionary with provider information
+# The provider SDKs are slow to import, so the chat model class is only imported
+# (see get_provider_class) when a provider is actually used
 LLM_PROVIDERS = {
-    "openai": {"class": ChatOpenAI, "endpoint_required": False},
-    "google": {"class": ChatGoogleGenerativeAI, "endpoint_required": False},
-    "ollama": {"class": ChatOllama, "endpoint_required": False},
-    "anthropic": {"class": ChatAnthropic, "endpoint_required": False},
-    "azure_openai": {"class": AzureChatOpenAI, "endpoint_required": True},
-    "deepseek": {"class": ChatOpenAI, "endpoint_required": False, "custom_url": "https://api.deepseek.com/v1"}
+    "openai": {"class": "langchain_openai.ChatOpenAI", "endpoint_required": False},
+    "google": {"class": "langchain_google_genai.ChatGoogleGenerativeAI", "endpoint_required": False},
+    "ollama": {"class": "langchain_ollama.ChatOllama", "endpoint_required": False},
+    "anthropic": {"class": "langchain_anthropic.ChatAnthropic", "endpoint_required": False},
+    "azure_openai": {"class": "langchain_openai.AzureChatOpenAI", "endpoint_required": True},
+    "deepseek": {"class": "langchain_openai.ChatOpenAI", "endpoint_required": False, "custom_url": "https://api.deepseek.com/v1"}
 }
 
-def get_llm_instance(planner=False) -> Any:
+# Registry of shared LLM clients keyed by (provider, model, params, event loop) so that every
+# scraper (and nested scrapers such as the PDF scraper run from a browser action) reuses the
+# same client and HTTP connection pool instead of opening new connections per instance.
+# Async HTTP clients are bound to the event loop they first ran on, so the clients are
+# shared per running loop (each asyncio.run gets its own)
+_LLM_INSTANCES = {}
+_LLM_INSTANCES_LOCK = threading.Lock()
+# HTTP connection pools shared by all clients of a provider, by (provider, loop id)
+_HTTP_POOLS = {}
+# Event loops the clients were created in, by loop id
+_LOOPS = {}
+# Latency/error statistics shared by all routers over the same targets
+_ROUTER_STATS = {}
+
+def get_llm_instance(planner=False, priority=None) -> Any:
     """
     Get an instance of the LLM based on the configuration.
     
+    Instances are cached per provider, model and parameters, so repeated calls return the
+    same client. Chat model clients are safe to share between threads and async tasks.
+    
+    Args:
+        planner: Whether to use the planner LLM configuration
+        priority: Rate limiter priority class ("planner", "executor" or "pdf_qa"),
+            defaults to "planner" for the planner LLM and "executor" otherwise
+    
     Returns:
         An instance of the LLM class based on the provider specified in the configuration.
     """
     LLM_CONFIG = get_llm_config(planner=planner)
+    priority = priority or ("planner" if planner else "executor")
+    
+    # Route between several provider/model targets if configured
+    routing = LLM_CONFIG.get("routing") or {}
+    if routing.get("targets"):
+        return _get_routing_instance(routing, priority)
+    
+    return _get_llm_client(LLM_CONFIG, priority)
+
+def _get_routing_instance(routing, priority) -> RoutingChatModel:
+    """
+    Get the (shared) routing model over the configured targets, each target being a
+    regular cached client with its own response cache and rate limiter.
+    """
+    targets = routing["targets"]
+    target_names = [f"{target['provider']}/{target['model']}" for target in targets]
+    
+    key = ("routing", tuple(target_names), priority, _loop_id())
+    with _LLM_INSTANCES_LOCK:
+        _drop_closed_loops()
+        router = _LLM_INSTANCES.get(key)
+    if router is not None:
+        return router
     
+    clients = [
+        _get_llm_client(get_llm_target_config(target["provider"], target["model"]), priority)
+        for target in targets
+    ]
+    router = RoutingChatModel(
+        targets=clients,
+        target_names=target_names,
+        weights=[float(target.get("weight", 1.0)) for target in targets],
+        hedge_delay_seconds=routing.get("hedge_delay_seconds"),
+        stats=_ROUTER_STATS.setdefault(tuple(target_names), TargetStats(
+            window_size=routing.get("window_size", 50),
+            max_error_rate=routing.get("max_error_rate", 0.5),
+            cooldown_seconds=routing.get("cooldown_seconds", 30),
+        )),
+    )
+    logger.info(f"Routing LLM requests across {', '.join(target_names)}")
+    
+    with _LLM_INSTANCES_LOCK:
+        return _LLM_INSTANCES.setdefault(key, router)
+
+def _get_llm_client(LLM_CONFIG, priority) -> Any:
+    """
+    Get the cached client for a single provider/model configuration.
+    """
     provider = LLM_CONFIG["provider"]
     
     if provider not in LLM_PROVIDERS:
@@ -52,11 +130,179 @@ def get_llm_instance(planner=False) -> Any:
         })
     elif provider == "ollama":
         params["num_ctx"] = 32000
-        
-    set_llm_environment_variables(provider, LLM_CONFIG["api_key"], LLM_CONFIG.get("endpoint", None))
-    logger.info(f"Using {provider} as LLM provider with model {LLM_CONFIG['model']}")
     
-    return LLM_PROVIDERS[provider]["class"](**params)
+    # Disk-backed response cache (None when disabled for the current profile)
+    params["cache"] = get_response_cache()
+    
+    key = _llm_instance_key(provider, params, LLM_CONFIG.get("api_key"), LLM_CONFIG.get("endpoint"), priority)
+    with _LLM_INSTANCES_LOCK:
+        _drop_closed_loops()
+        llm = _LLM_INSTANCES.get(key)
+        if llm is None:
+            set_llm_environment_variables(provider, LLM_CONFIG["api_key"], LLM_CONFIG.get("endpoint", None))
+            params.update(_connection_pool_params(provider, LLM_CONFIG.get("connection_pool") or {}))
+            
+            # Process-wide rate limiting shared by all clients of the same provider/model
+            rate_limiter = get_rate_limiter(provider, LLM_CONFIG["model"], priority)
+            if rate_limiter:
+                params["rate_limiter"], rate_limit_handler = rate_limiter
+                params["callbacks"] = [rate_limit_handler]
+            
+            llm = get_provider_class(provider)(**params)
+            _LLM_INSTANCES[key] = llm
+            logger.info(f"Using {provider} as LLM provider with model {LLM_CONFIG['model']}")
+        else:
+            logger.debug(f"Reusing {provider} LLM client for model {LLM_CONFIG['model']}")
+    
+    return llm
+
+def get_provider_class(provider) -> type:
+    """
+    Import and return the chat model class of a provider.
+    
+    Args:
+        provider: Name of the provider (key of LLM_PROVIDERS)
+    
+    Returns:
+        The langchain chat model class
+    """
+    module_name, class_name = LLM_PROVIDERS[provider]["class"].rsplit(".", 1)
+    try:
+        module = importlib.import_module(module_name)
+    except ImportError as e:
+        raise ImportError(f"The {provider} provider requires the {module_name} package: pip install {module_name.replace('_', '-')}") from e
+    return getattr(module, class_name)
+
+def clear_llm_instances() -> None:
+    """
+    Drop all cached LLM clients (e.g after the LLM configuration changed) and close their
+    HTTP connection pools.
+    """
+    with _LLM_INSTANCES_LOCK:
+        pools = list(_HTTP_POOLS.items())
+        _LLM_INSTANCES.clear()
+        _HTTP_POOLS.clear()
+        _LOOPS.clear()
+        _ROUTER_STATS.clear()
+    for (_, loop_id), (loop, pool_params) in pools:
+        _close_http_pool(loop, pool_params)
+
+def _loop_id() -> Optional[int]:
+    """Id of the running event loop (None outside of a loop)."""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+    _LOOPS.setdefault(id(loop), loop)
+    return id(loop)
+
+def _drop_closed_loops() -> None:
+    """Drop the clients and pools bound to event loops that were closed (called with the registry lock held)."""
+    closed = {loop_id for loop_id, loop in _LOOPS.items() if loop.is_closed()}
+    if not closed:
+        return
+    for key in [key for key in _LLM_INSTANCES if key[-1] in closed]:
+        del _LLM_INSTANCES[key]
+    for pool_key in [pool_key for pool_key in _HTTP_POOLS if pool_key[1] in closed]:
+        loop, pool_params = _HTTP_POOLS.pop(pool_key)
+        _close_http_pool(loop, pool_params)
+    for loop_id in closed:
+        del _LOOPS[loop_id]
+    logger.debug(f"Dropped the LLM clients of {len(closed)} closed event loops")
+
+def _close_http_pool(loop, pool_params) -> None:
+    """Close the HTTP clients of a pool (the async client in the event loop it is bound to)."""
+    http_client = pool_params.get("http_client")
+    if http_client is not None:
+        http_client.close()
+    async_client = pool_params.get("http_async_client")
+    if async_client is None or loop is None or loop.is_closed():
+        # the connections of a closed loop were closed with its transports
+        return
+    try:
+        running_loop = asyncio.get_running_loop()
+    except RuntimeError:
+        running_loop = None
+    if running_loop is loop:
+        loop.create_task(async_client.aclose())
+    elif loop.is_running():
+        asyncio.run_coroutine_threadsafe(async_client.aclose(), loop)
+    else:
+        try:
+            loop.run_until_complete(async_client.aclose())
+        except RuntimeError as e:
+            # another loop is running in this thread
+            logger.debug(f"Could not close the async HTTP client: {str(e)}")
+
+def _recycle_llm_instances(old_snapshot, new_snapshot) -> None:
+    """
+    Drop the cached clients when a configuration change affects them (LLM settings,
+    credentials, rate limits or response cache). Other changes keep the warm clients.
+    """
+    if not _LLM_INSTANCES:
+        return
+    
+    def client_settings():
+        return (
+            get_llm_settings(),
+            config_manager.get("llm_config.rate_limits"),
+            config_manager.get("llm_config.response_cache"),
+        )
+    
+    with config_manager.pin(old_snapshot):
+        old_settings = client_settings()
+    with config_manager.pin(new_snapshot):
+        new_settings = client_settings()
+    if old_settings == new_settings:
+        return
+    
+    if old_settings[1] != new_settings[1]:
+        clear_rate_limiters()
+    if old_settings[2] != new_settings[2]:
+        reset_response_cache()
+    clear_llm_instances()
+    logger.info("LLM configuration changed, recycling the LLM clients")
+
+config_manager.subscribe(("llm_config", "secrets"), _recycle_llm_instances)
+
+def _llm_instance_key(provider, params, api_key=None, endpoint=None, priority=None) -> tuple:
+    """
+    Build the registry key for an LLM client. The credentials are hashed so a changed key
+    creates a new client without keeping the secret itself in the key.
+    """
+    credentials = hashlib.sha256(f"{api_key}|{endpoint}".encode()).hexdigest()
+    return (provider, tuple(sorted(params.items())), credentials, priority, _loop_id())
+
+def _connection_pool_params(provider, pool_config) -> dict:
+    """
+    Build the HTTP client parameters for a keep-alive connection pool shared by all
+    requests of the clients created in the running event loop. Providers without a
+    configurable HTTP client use their defaults.
+    """
+    loop_id = _loop_id()
+    pool_key = (provider, loop_id)
+    if pool_key in _HTTP_POOLS:
+        return _HTTP_POOLS[pool_key][1]
+    
+    limits = httpx.Limits(
+        max_connections=pool_config.get("max_connections", 20),
+        max_keepalive_connections=pool_config.get("max_keepalive_connections", 10),
+        keepalive_expiry=pool_config.get("keepalive_expiry", 60),
+    )
+    timeout = pool_config.get("timeout", 120)
+    
+    if provider in ["openai", "deepseek", "azure_openai"]:
+        pool_params = {"http_client": httpx.Client(limits=limits, timeout=timeout)}
+        if loop_id is not None:
+            # outside of a loop the SDK creates its own async client
+            pool_params["http_async_client"] = httpx.AsyncClient(limits=limits, timeout=timeout)
+    elif provider == "ollama":
+        pool_params = {"client_kwargs": {"limits": limits, "timeout": timeout}}
+    else:
+        pool_params = {}
+    
+    _HTTP_POOLS[pool_key] = (_LOOPS.get(loop_id), pool_params)
+    return pool_params
 
 # Add a function to set the required environment variables for the selected LLM provider
 def set_llm_environment_variables(provider, api_key=None, endpoint=None):
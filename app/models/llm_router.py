@@ -0,0 +1,224 @@
+"""
+Latency-aware routing chat model across several provider/model targets.
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import ConfigDict, Field, model_validator
+
+logger = logging.getLogger(__name__)
+
+
+class TargetStats:
+    """
+    Rolling latency and error statistics of the routing targets, shared by a router
+    and the copies created by bind_tools/with_structured_output.
+    """
+
+    def __init__(self, window_size: int = 50, max_error_rate: float = 0.5, cooldown_seconds: float = 30):
+        """
+        Args:
+            window_size: Number of recent requests per target the statistics are based on
+            max_error_rate: Targets above this error rate are unhealthy
+            cooldown_seconds: Time an unhealthy target is skipped before it is retried
+        """
+        self.window_size = window_size
+        self.max_error_rate = max_error_rate
+        self.cooldown_seconds = cooldown_seconds
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, deque] = {}
+        self._outcomes: Dict[str, deque] = {}
+        self._unhealthy_until: Dict[str, float] = {}
+
+    def record(self, name: str, latency: Optional[float], ok: bool) -> None:
+        """Record the outcome of a request to a target."""
+        with self._lock:
+            outcomes = self._outcomes.setdefault(name, deque(maxlen=self.window_size))
+            outcomes.append(ok)
+            if ok and latency is not None:
+                self._latencies.setdefault(name, deque(maxlen=self.window_size)).append(latency)
+            if not ok and len(outcomes) >= 2 and outcomes.count(False) / len(outcomes) > self.max_error_rate:
+                self._unhealthy_until[name] = time.monotonic() + self.cooldown_seconds
+                # start from a clean slate after the cooldown
+                outcomes.clear()
+                logger.warning(f"LLM target {name} marked unhealthy for {self.cooldown_seconds}s")
+
+    def percentile(self, name: str, percentile: float) -> Optional[float]:
+        """Latency percentile (0-100) of a target, None without samples."""
+        with self._lock:
+            latencies = sorted(self._latencies.get(name, []))
+        if not latencies:
+            return None
+        index = min(len(latencies) - 1, int(round(percentile / 100 * (len(latencies) - 1))))
+        return latencies[index]
+
+    def is_healthy(self, name: str) -> bool:
+        with self._lock:
+            return time.monotonic() >= self._unhealthy_until.get(name, 0)
+
+    def order(self, names: List[str], weights: List[float]) -> List[str]:
+        """
+        Order the targets for a request: healthy targets by p50 latency divided by their
+        weight and penalized by their error rate (untried targets first, in configured
+        order), unhealthy targets last.
+        """
+        def score(item):
+            name, weight = item
+            p50 = self.percentile(name, 50)
+            with self._lock:
+                outcomes = list(self._outcomes.get(name, []))
+            error_rate = outcomes.count(False) / len(outcomes) if outcomes else 0.0
+            if p50 is None:
+                return float("inf") if error_rate else 0.0
+            return p50 / max(weight, 1e-6) * (1 + error_rate)
+
+        targets = list(zip(names, weights))
+        healthy = sorted([t for t in targets if self.is_healthy(t[0])], key=score)
+        unhealthy = [t for t in targets if not self.is_healthy(t[0])]
+        return [name for name, _ in healthy + unhealthy]
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """p50/p95 latency and error rate per target."""
+        names = list(self._outcomes.keys() | self._latencies.keys())
+        result = {}
+        for name in names:
+            outcomes = list(self._outcomes.get(name, []))
+            result[name] = {
+                "p50": self.percentile(name, 50),
+                "p95": self.percentile(name, 95),
+                "error_rate": outcomes.count(False) / len(outcomes) if outcomes else 0.0,
+                "healthy": self.is_healthy(name),
+            }
+        return result
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    """Whether a failed request should fail over to the next target (429, 5xx, timeouts)."""
+    response = getattr(error, "response", None)
+    status_code = getattr(error, "status_code", None) or getattr(response, "status_code", None)
+    if isinstance(status_code, int):
+        return status_code == 429 or status_code >= 500
+    name = type(error).__name__
+    return isinstance(error, (asyncio.TimeoutError, ConnectionError)) or "Timeout" in name or "Connection" in name
+
+
+class RoutingChatModel(BaseChatModel):
+    """
+    Chat model that sends each request to the fastest healthy target, hedges slow requests
+    with the next target after `hedge_delay_seconds`, and fails over on 429/5xx errors.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    targets: List[Any] = Field(..., description="Chat models (or tool-bound runnables) to route between")
+    target_names: List[str] = Field(..., description="Names of the targets (provider/model)")
+    weights: List[float] = Field(default_factory=list, description="Relative preference of each target")
+    hedge_delay_seconds: Optional[float] = Field(None, description="Start a second target when the first is slower than this")
+    stats: Any = Field(default_factory=TargetStats, description="Shared TargetStats")
+    model_name: str = Field("", description="Model name of the first target (used by browser-use)")
+
+    @model_validator(mode="after")
+    def _set_routing_defaults(self) -> "RoutingChatModel":
+        if not self.weights:
+            self.weights = [1.0] * len(self.targets)
+        if not self.model_name:
+            self.model_name = self.target_names[0].split("/", 1)[-1]
+        return self
+
+    @property
+    def _llm_type(self) -> str:
+        return "routing"
+
+    def bind_tools(self, tools, **kwargs: Any):
+        """Bind the tools to every target, keeping the shared statistics."""
+        return self.model_copy(update={"targets": [target.bind_tools(tools, **kwargs) for target in self.targets]})
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager=None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        last_error = None
+        for name in self.stats.order(self.target_names, self.weights):
+            target = self.targets[self.target_names.index(name)]
+            start = time.monotonic()
+            try:
+                message = target.invoke(messages, stop=stop, **kwargs)
+            except Exception as e:
+                self.stats.record(name, None, ok=False)
+                if not is_retryable_error(e):
+                    raise
+                logger.warning(f"LLM target {name} failed ({type(e).__name__}), failing over")
+                last_error = e
+                continue
+            self.stats.record(name, time.monotonic() - start, ok=True)
+            return ChatResult(generations=[ChatGeneration(message=message)])
+        raise last_error
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager=None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        remaining = self.stats.order(self.target_names, self.weights)
+        running: Dict[asyncio.Task, str] = {}
+        last_error = None
+
+        async def call(name: str):
+            target = self.targets[self.target_names.index(name)]
+            start = time.monotonic()
+            try:
+                message = await target.ainvoke(messages, stop=stop, **kwargs)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.stats.record(name, None, ok=False)
+                raise
+            self.stats.record(name, time.monotonic() - start, ok=True)
+            return message
+
+        def start_next() -> bool:
+            if not remaining:
+                return False
+            name = remaining.pop(0)
+            running[asyncio.create_task(call(name))] = name
+            return True
+
+        start_next()
+        try:
+            while running:
+                # only hedge while a single request is in flight
+                timeout = self.hedge_delay_seconds if len(running) == 1 and remaining else None
+                done, _ = await asyncio.wait(running.keys(), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    logger.info(f"LLM target {next(iter(running.values()))} slower than {timeout}s, hedging with {remaining[0]}")
+                    start_next()
+                    continue
+
+                for task in done:
+                    name = running.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        return ChatResult(generations=[ChatGeneration(message=task.result())])
+                    if not is_retryable_error(error):
+                        raise error
+                    logger.warning(f"LLM target {name} failed ({type(error).__name__}), failing over")
+                    last_error = error
+                    if not running:
+                        start_next()
+        finally:
+            for task in running:
+                task.cancel()
+
+        raise last_error
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 from typing import List, Optional, Type, Dict, Any, Union
-from app.utils.config.local import build_content_model
+from app.utils.config.local import build_content_model, cached_model
 from pydantic.main import create_model
 
 
@@ -16,7 +16,11 @@ def build_output_model(content_structure: Union[Dict, Any]) -> Type[BaseModel]:
     """
     Build the ScraperOutputList model dynamically based on the ScraperOutput model.
     This allows for handling multiple outputs from the scraper.
+    Models are cached by the shape of the content structure.
     """
+    return cached_model("output", content_structure, _build_output_model)
+
+def _build_output_model(content_structure: Union[Dict, Any]) -> Type[BaseModel]:
     output_model = _generate_scraper_output_structure(content_structure)
     # Define the fields for the ScraperOutputList model
     fields = {
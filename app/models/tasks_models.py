@@ -52,6 +52,12 @@ class Task(BaseModel):
                     filters= filter,
                     url=prompt["url"],
                 )
+            elif template_name == "pagination_discovery":
+                assert isinstance(prompt, dict), "Prompt must be a dictionary for pagination discovery template"
+                task_str = template["task_format"].format(
+                    data_category=prompt["data_category"],
+                    url=prompt["url"],
+                )
         except KeyError as e:
             raise ValueError(f"Missing key in Task Model Template: {e}")
         
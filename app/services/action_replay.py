@@ -0,0 +1,224 @@
+"""
+Compiled replay of the navigation of recurring browser-use profiles.
+
+After a successful run the navigation actions of the agent history (clicks, go_to_url and
+scrolls) are compiled to the `initial_actions` format of the profiles (clicks by index are
+saved as click_by_xpath with the xpath of the clicked element) together with a hash of the
+structure of the start page. On the next run of the same URL and task the actions are
+replayed with Playwright before the first agent step, without LLM calls. The agent takes
+over where the replay stopped: right away if the page structure changed, or at the first
+action that fails (e.g. a selector that is gone).
+"""
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from browser_use import ActionResult
+
+from app.utils.config.local import parse_initial_actions
+
+logger = logging.getLogger(__name__)
+
+# Actions that change the page in a way the recording can not reproduce, the recording stops there
+UNSUPPORTED_NAVIGATION_ACTIONS = {
+    "input_text",
+    "send_keys",
+    "select_dropdown_option",
+    "go_back",
+    "open_tab",
+    "switch_tab",
+    "close_tab",
+    "upload_file",
+}
+
+# Tag/id skeleton of the page: text, attributes and repeated siblings (e.g. table rows) are
+# ignored so the hash only changes with the page layout
+STRUCTURE_JS = """
+(maxDepth) => {
+    const skip = new Set(["SCRIPT", "STYLE", "NOSCRIPT", "SVG", "TEMPLATE"]);
+    const walk = (el, depth) => {
+        let id = el.id && !/\\d/.test(el.id) ? "#" + el.id : "";
+        let out = el.tagName + id;
+        if (depth >= maxDepth) return out;
+        const children = [];
+        for (const child of el.children) {
+            if (skip.has(child.tagName.toUpperCase())) continue;
+            const sig = walk(child, depth + 1);
+            if (children[children.length - 1] !== sig) children.push(sig);
+        }
+        return children.length ? out + "(" + children.join(",") + ")" : out;
+    };
+    return document.body ? walk(document.body, 0) : "";
+}
+"""
+STRUCTURE_MAX_DEPTH = 12
+
+# Timeout of a replayed action (ms)
+ACTION_TIMEOUT = 10000
+
+
+async def page_structure_hash(page) -> str:
+    """Hash of the structure of a Playwright page (see STRUCTURE_JS)."""
+    structure = await page.evaluate(STRUCTURE_JS, STRUCTURE_MAX_DEPTH)
+    return hashlib.sha256(structure.encode("utf-8")).hexdigest()
+
+
+def compile_actions(history) -> List[Dict[str, Any]]:
+    """
+    Compile the successful navigation actions of an agent history to profile initial
+    actions. Extraction actions are skipped, compilation stops at the first navigation
+    action that can not be replayed.
+
+    Args:
+        history: The AgentHistoryList of the run
+
+    Returns:
+        The actions as single-key {action: value} mappings (profile initial_actions format)
+    """
+    compiled = []
+    for item in history.history:
+        if not item.model_output:
+            continue
+        interacted = getattr(item.state, "interacted_element", None) or []
+        for index, action in enumerate(item.model_output.action):
+            name, params = next(iter(action.model_dump(exclude_unset=True).items()), (None, None))
+            if name is None:
+                continue
+            result = item.result[index] if index < len(item.result) else None
+            if result is not None and result.error:
+                continue
+
+            params = params or {}
+            if name == "click_element_by_index":
+                element = interacted[index] if index < len(interacted) else None
+                xpath = getattr(element, "xpath", None)
+                if not xpath:
+                    return compiled
+                compiled.append({"click_by_xpath": xpath if xpath.startswith(("/", "(")) else f"/{xpath}"})
+            elif name == "click_by_xpath":
+                compiled.append({"click_by_xpath": params.get("xpath")})
+            elif name == "go_to_url":
+                compiled.append({"go_to_url": params.get("url")})
+            elif name in ("scroll_down", "scroll_up"):
+                compiled.append({name: params.get("amount")})
+            elif name in UNSUPPORTED_NAVIGATION_ACTIONS:
+                return compiled
+    return compiled
+
+
+def default_replay_path() -> Optional[str]:
+    """Default recording file: replay.json next to the run directories of the profile."""
+    results_env = os.getenv("RESULTS_PATH")
+    if not results_env:
+        return None
+    return os.path.join(os.path.dirname(os.path.normpath(results_env)), "replay.json")
+
+
+class ActionReplay:
+    """
+    Records the navigation of a run and replays it on the next runs (on_step_start hook).
+    """
+
+    def __init__(self, url: str, task: str, path: Optional[str] = None):
+        """
+        Initialize the replay, loading the recording of the URL and task if there is one.
+
+        Args:
+            url: The start URL
+            task: The task string of the agent (recordings are only replayed for the same task)
+            path: File the recordings are saved to (default: default_replay_path())
+        """
+        self.path = path or default_replay_path()
+        self.key = hashlib.sha256(f"{url}\n{task}".encode("utf-8")).hexdigest()
+        self.url = url
+        self.recording = self._load().get(self.key)
+        self.start_hash: Optional[str] = None
+        # Recorded actions replayed successfully in this run
+        self.replayed: List[Dict[str, Any]] = []
+        self._started = False
+
+    async def on_step_start(self, agent) -> None:
+        """Hook replaying the recorded actions before the first agent step."""
+        if self._started:
+            return
+        self._started = True
+
+        page = await agent.browser_session.get_current_page()
+        try:
+            self.start_hash = await page_structure_hash(page)
+        except Exception as e:
+            logger.warning(f"Could not hash the page structure: {str(e)}")
+            return
+
+        if not self.recording:
+            return
+        if self.recording.get("structure_hash") != self.start_hash:
+            logger.info("The page structure changed since the actions were recorded, running the agent")
+            return
+
+        await self.replay(page)
+        if self.replayed:
+            agent.state.last_result = [ActionResult(
+                extracted_content=f"Replayed {len(self.replayed)} recorded navigation actions, the browser is now at {page.url}",
+                include_in_memory=True,
+            )]
+
+    async def replay(self, page) -> None:
+        """Run the recorded actions until one fails."""
+        actions = self.recording.get("actions", [])
+        for action, parsed in zip(actions, parse_initial_actions(actions)):
+            name, params = next(iter(parsed.items()))
+            try:
+                await _run_action(page, name, params)
+            except Exception as e:
+                logger.info(f"Replay stopped at {action}: {str(e)}. The agent takes over from here")
+                return
+            self.replayed.append(action)
+        logger.info(f"Replayed {len(self.replayed)} recorded actions without LLM calls")
+
+    def record(self, history) -> None:
+        """Save the replayed and compiled actions of a successful run for the next runs."""
+        if not self.path or not self.start_hash:
+            return
+        actions = self.replayed + compile_actions(history)
+        if not actions:
+            return
+        recordings = self._load()
+        recordings[self.key] = {
+            "url": self.url,
+            "structure_hash": self.start_hash,
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+            "actions": actions,
+        }
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(recordings, f, indent=2)
+        logger.info(f"Recorded {len(actions)} navigation actions to {self.path}")
+
+    def _load(self) -> Dict[str, Any]:
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Could not read the recorded actions at {self.path}: {str(e)}")
+            return {}
+
+
+async def _run_action(page, name: str, params: Dict[str, Any]) -> None:
+    """Run a recorded action on a Playwright page."""
+    if name == "click_by_xpath":
+        await page.locator(f"xpath={params['xpath']}").click(timeout=ACTION_TIMEOUT)
+    elif name == "go_to_url":
+        await page.goto(params["url"], timeout=ACTION_TIMEOUT)
+    elif name in ("scroll_down", "scroll_up"):
+        amount = params.get("amount") or await page.evaluate("window.innerHeight")
+        await page.evaluate("(y) => window.scrollBy(0, y)", amount if name == "scroll_down" else -amount)
+        return
+    else:
+        raise ValueError(f"Action {name} can not be replayed")
+    await page.wait_for_load_state(timeout=ACTION_TIMEOUT)
@@ -4,7 +4,11 @@ from app.models.tasks_models import Task
 from app.models.llm_models import get_llm_instance
 from app.utils.config.brightdata_mcp import define_mcp_server_params
 from app.templates.mcp_rule_templates import MCP_TEMPLATES  
-from app.services.hooks.brightdata_mcp_hooks import log_response
+from app.services.hooks.brightdata_mcp_hooks import get_mcp_logger
+from app.utils.config.local import build_content_model
+from app.utils.config_manager import config_manager
+from app.utils.page_cache import cache_page_tools, content_validator, get_page_cache
+from app.utils.table_extraction import extract_table_rows, table_fast_path_result, use_table_fast_path
 
 from mcp import ClientSession
 from mcp.client.stdio import stdio_client
@@ -12,6 +16,9 @@ from langchain_mcp_adapters.tools import load_mcp_tools
 from langgraph.prebuilt import create_react_agent
 import asyncio
 import json
+import logging
+
+logger = logging.getLogger(__name__)
 
 class BrightDataMCPScraper:
     """
@@ -54,6 +61,7 @@ class BrightDataMCPScraper:
         self.url = url
         self.prompt = prompt
         self.task_template = task_template
+        self.content_structure = output_format
         self.output_format = {
             content: [items] for content, items in output_format.items()
         }
@@ -72,6 +80,16 @@ class BrightDataMCPScraper:
             async with ClientSession(read, write) as session:
                 # Load the tools for the MCP agent
                 tools = await load_mcp_tools(session)
+                page_cache = get_page_cache()
+                if page_cache is not None:
+                    # serve the pages already scraped in this process from the page cache
+                    tools = cache_page_tools(tools, page_cache)
+
+                # Read well-formed HTML tables directly when they match the content structure
+                if use_table_fast_path(self.task_template, self.prompt) and any(tool.name == "scrape_as_html" for tool in tools):
+                    results = await self._table_fast_path(session)
+                    if results:
+                        return results
                 
                 # Create the MCP agent
                 agent = create_react_agent(
@@ -89,13 +107,20 @@ class BrightDataMCPScraper:
                     },
                 ]
                 
-                # Run the agent with the task string and URL
-                response = await agent.ainvoke({
-                    'messages': messages,
-                })
-                
-                # log response
-                log_response(response)
+                # Run the agent with the task string and URL, streaming the state so
+                # each message is logged as soon as it arrives
+                mcp_logger = get_mcp_logger()
+                response = None
+                try:
+                    async for state in agent.astream({
+                        'messages': messages,
+                    }, stream_mode="values"):
+                        response = state
+                        if mcp_logger:
+                            mcp_logger.log_messages(state.get('messages', []))
+                finally:
+                    if mcp_logger:
+                        mcp_logger.close()
                 
                 # return content only for now
                 results =  response['messages'][-1].content
@@ -104,6 +129,39 @@ class BrightDataMCPScraper:
                 results = json.loads(results)
                 return results
 
+    async def _table_fast_path(self, session: ClientSession) -> Optional[Dict[str, Any]]:
+        """
+        Extract the rows from the HTML tables of the page (scrape_as_html tool) without the agent.
+
+        Returns:
+            The result, or None if no table matched with enough confidence
+        """
+        try:
+            page_cache = get_page_cache()
+            snapshot = page_cache.get(self.url, key="html") if page_cache is not None else None
+            if snapshot is not None:
+                html = snapshot.data["html"]
+            else:
+                response = await session.call_tool("scrape_as_html", {"url": self.url})
+                html = "".join(getattr(content, "text", "") for content in response.content)
+                if page_cache is not None and not response.isError:
+                    page_cache.put(self.url, content_validator(content=html), html=html)
+            match = extract_table_rows(
+                html,
+                build_content_model(self.content_structure),
+                min_confidence=float(config_manager.get("local.table_fast_path.min_confidence", 0.8)),
+            )
+        except Exception as e:
+            logger.warning(f"Table fast path failed, running the agent: {str(e)}")
+            return None
+        if match is None or not match.rows:
+            logger.info("No table matched the content structure with enough confidence, running the agent")
+            return None
+
+        logger.info(f"Extracted {len(match.rows)} rows from the HTML tables without the agent")
+        content_key = f"{next(iter(self.content_structure.keys()), '')}-content"
+        return table_fast_path_result(match, content_key, self.url)
+
     def _init_content(self):
         """
         Initialize the content for the MCP scraper.
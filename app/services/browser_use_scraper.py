@@ -1,5 +1,5 @@
 from typing import Union, Dict, Any, Optional, List
-from pydantic import BaseModel, ValidationError
+from pydantic import BaseModel, Field, ValidationError, create_model
 import json
 from browser_use import Browser
 import os
@@ -10,9 +10,14 @@ from browser_use import Agent, Controller, ActionResult
 
 from app.models.tasks_models import Task
 from app.models.llm_models import get_llm_instance
-from app.utils.config.browser_use import define_browser_use_session
-from app.utils.config.browser_use_agent import RUN_MAX_STEPS, PLANNER_INTERVAL, USE_PLANNER_MODEL
+from app.utils.config.browser_use import compress_har, define_browser_use_session, get_browser_settings, har_record_path, replay_har
+from app.utils.config.browser_use_agent import get_agent_settings
+from app.utils.config_manager import config_manager
+from app.utils.page_cache import content_validator, get_page_cache
+from app.utils.row_accumulator import RowAccumulator
+from app.utils.table_extraction import extract_table_rows, table_fast_path_result, use_table_fast_path
 from app.services.hooks.browser_use_scraper_hooks import save_page_content
+from app.services.hooks.screenshot_policy import get_screenshot_policy
 
 logger = logging.getLogger(__name__)
 class WebScraper:
@@ -29,6 +34,8 @@ class WebScraper:
         task_template: str = "default",
         initial_actions: Optional[List[Dict[str, Any]]] = None,
         output_format: Optional[BaseModel] = None,  # Pydantic model for output format
+        results_dir: Optional[str] = None,  # Directory the committed rows are flushed to (default: RESULTS_PATH)
+        user_data_dir: Optional[str] = None,  # Browser profile directory of concurrent sessions (default: shared profile)
     ):
         """
         Initialize the WebScraper.
@@ -54,6 +61,20 @@ class WebScraper:
         self.prompt = prompt
         self.task_template = task_template
         self.output_format = output_format
+        self.results_dir = results_dir
+
+        # Rows committed page by page by the agent (commit_page_rows action), for tabular
+        # extractions with the output formats of build_output_model only
+        self.row_accumulator: Optional[RowAccumulator] = None
+        if task_template == "tabular_extraction":
+            try:
+                self.row_accumulator = RowAccumulator(output_format, results_dir=results_dir, metadata={
+                    "url": url,
+                    "task_template": task_template,
+                    "prompt": prompt,
+                })
+            except ValueError as e:
+                logger.info(f"Rows are not committed page by page: {str(e)}")
 
         # Set the initial actions to go to the URL provided and add from the given
         self.initial_actions = [
@@ -64,10 +85,71 @@ class WebScraper:
         # Get the LLM instance for browser-use
         self.llm = get_llm_instance()
         
-        self.planner_llm = get_llm_instance(planner=True) if USE_PLANNER_MODEL else None
+        self.agent_settings = get_agent_settings()
+        self.planner_llm = get_llm_instance(planner=True) if self.agent_settings.use_planner_model else None
+
+        self._browser_started = False
+
+        # Hooks called with the agent before/after every step
+        self.step_start_hooks = []
+        self.step_end_hooks = []
+
+        # Wait for the page to be quiet instead of a fixed minimum (browser_config.browser.wait_times.adaptive)
+        self.adaptive_wait = None
+        browser_settings = get_browser_settings()
+        if browser_settings.adaptive_wait:
+            from app.services.hooks.adaptive_wait import AdaptiveWait, PageLoadStats, default_stats_path
+            self.adaptive_wait = AdaptiveWait(
+                PageLoadStats(browser_settings.adaptive_wait_stats_path or default_stats_path()),
+                max_wait=browser_settings.max_wait_page_load_time,
+                quiet_ms=browser_settings.adaptive_wait_quiet_ms,
+                fallback_wait=browser_settings.min_wait_page_load_time,
+            )
+            self.step_start_hooks.append(self.adaptive_wait.on_step_start)
+
+        # Replay of the navigation recorded in the previous runs (agent_config.replay)
+        self.action_replay = None
+        if self.agent_settings.replay_actions:
+            from app.services.action_replay import ActionReplay
+            self.action_replay = ActionReplay(url, task_string, path=self.agent_settings.replay_path)
+            self.step_start_hooks.append(self.action_replay.on_step_start)
+
+        # Extraction from the JSON APIs behind the page (agent_config.json_capture)
+        self.json_capture = None
+        if self.agent_settings.json_capture and self.row_accumulator:
+            from app.services.hooks.json_capture_hooks import JSONCapture
+            self.json_capture = JSONCapture(
+                fields=list(self.row_accumulator.content_model.model_fields),
+                commit=self.row_accumulator.commit_next,
+                max_pages=self.agent_settings.json_capture_max_pages,
+                min_match=self.agent_settings.json_capture_min_match,
+                max_responses=self.agent_settings.json_capture_max_responses,
+                max_response_bytes=self.agent_settings.json_capture_max_response_bytes,
+            )
+            self.step_end_hooks.append(self.json_capture.on_step_end)
+
+        # Screenshots, PDFs and trace of the visited pages (browser_config.browser.page_content)
+        if browser_settings.save_page_content:
+            self.step_end_hooks.append(save_page_content)
+
+        # Stop runs stuck in loops or over budget early (agent_config.governor)
+        self.step_governor = None
+        if self.agent_settings.governor:
+            from app.services.hooks.step_governor import StepGovernor
+            self.step_governor = StepGovernor(
+                loop_window=self.agent_settings.governor_loop_window,
+                loop_repeats=self.agent_settings.governor_loop_repeats,
+                max_replans=self.agent_settings.governor_max_replans,
+                max_tokens=self.agent_settings.governor_max_tokens,
+                max_cost=self.agent_settings.governor_max_cost,
+                cost_per_1k_tokens=self.agent_settings.governor_cost_per_1k_tokens,
+                max_seconds=self.agent_settings.governor_max_seconds,
+                progress=lambda: self.row_accumulator.row_count if self.row_accumulator else 0,
+            )
+            self.step_end_hooks.append(self.step_governor.on_step_end)
 
         # create a browser-use browser config object
-        self.browser_session = define_browser_use_session()
+        self.browser_session = define_browser_use_session(results_dir=results_dir, user_data_dir=user_data_dir)
 
         # Create a controller with our output model
         self.controller = self._define_controller()
@@ -78,7 +160,8 @@ class WebScraper:
             # llm settings
             llm=self.llm,
             planner_llm=self.planner_llm,
-            planner_interval=PLANNER_INTERVAL,
+            planner_interval=self.agent_settings.planner_interval,
+            use_vision=self.agent_settings.use_vision,
             use_vision_for_planner=False,
             # Model output controller
             controller=self.controller,
@@ -89,6 +172,23 @@ class WebScraper:
             browser_session=self.browser_session,
         )
 
+        # Reuse the screenshots of the step states in the trace, kept before they are downscaled
+        if browser_settings.save_page_content and self.agent_settings.use_vision:
+            get_screenshot_policy(self.agent).attach(self.agent)
+
+        # Downscaled screenshots, only sent when the DOM text is not enough (agent_config.vision)
+        self.vision_controller = None
+        if self.agent_settings.use_vision and self.agent_settings.vision_control:
+            from app.services.hooks.vision_controller import VisionController
+            self.vision_controller = VisionController(
+                max_pixels=self.agent_settings.vision_max_pixels,
+                max_height=self.agent_settings.vision_max_height,
+                send_every=self.agent_settings.vision_send_every,
+                min_dom_chars=self.agent_settings.vision_min_dom_chars,
+                trace_dir=os.path.join(results_dir, "trace") if results_dir else None,
+            )
+            self.vision_controller.attach(self.agent)
+
     async def scrape(self) -> Dict[str, Any]:
         """
         Scrape a website for information based on a prompt.
@@ -96,17 +196,51 @@ class WebScraper:
         Returns:
             A structured result containing the extracted information with citations
         """
+        # Read well-formed HTML tables directly when they match the content structure
+        if self.row_accumulator and use_table_fast_path(self.task_template, self.prompt):
+            result_dict = await self._table_fast_path()
+            if result_dict:
+                return result_dict
+
         # Run the agent to collect information
-        history = await self.agent.run(max_steps=RUN_MAX_STEPS)
-                                    #    , on_step_start=save_page_content)
-                                    #    , on_step_end=save_page_content)
+        try:
+            await self._start_browser()
+            history = await self.agent.run(
+                max_steps=self.agent_settings.run_max_steps,
+                on_step_start=self._on_step_start,
+                on_step_end=self._on_step_end,
+            )
+        except Exception as e:
+            if self.row_accumulator:
+                self.row_accumulator.close(status="failed", error=str(e))
+            raise
+        finally:
+            await self._finish_har_recording()
+            if self.adaptive_wait is not None:
+                self.adaptive_wait.stats.save()
+        if self.vision_controller is not None:
+            sent = sum(record["sent"] for record in self.vision_controller.steps)
+            logger.info(
+                f"Sent screenshots on {sent}/{len(self.vision_controller.steps)} steps "
+                f"(~{self.vision_controller.total_image_tokens} image tokens)"
+            )
+        extracted_from_api = bool(self.json_capture and self.json_capture.extracted)
+        if self.row_accumulator:
+            self.row_accumulator.close(status="completed" if history.is_done() or extracted_from_api else "incomplete")
 
         # Get the final result using the browser-use Controller
         result = history.final_result()
 
         # build the output model
 
-        if result:
+        if extracted_from_api:
+            # The rows were read from the JSON API of the page and the agent was stopped
+            result_dict = self.row_accumulator.merge_into(None)
+            result_dict["outputs"][0]["summary"] = f"Extracted from {self.json_capture.source_url} ({self.json_capture.pages} pages)"
+            result_dict["task_template"] = self.task_template
+            result_dict["prompt"] = self.prompt
+            return result_dict
+        elif result:
             # Parse the result using our Pydantic model
             try:
                 # First try to parse as is (might already be a list)
@@ -129,8 +263,14 @@ class WebScraper:
                     # If both approaches fail, raise the original error
                     raise e
 
-            # add json to result_dict
+            # save the navigation of the successful run for the next runs
+            if self.action_replay and history.is_done():
+                self.action_replay.record(history)
+
+            # add json to result_dict, with the rows committed page by page
             result_dict = parsed.model_dump()
+            if self.row_accumulator and self.row_accumulator.pages:
+                result_dict = self.row_accumulator.merge_into(result_dict)
 
             # add template information to result_dict
             result_dict["task_template"] = self.task_template
@@ -142,9 +282,102 @@ class WebScraper:
             # processed_result = self._convert_to_scraped_result(structured_output)
 
             return result_dict
+        elif self.row_accumulator and self.row_accumulator.pages:
+            # The run was cut off (e.g. at max_steps) after some pages were committed
+            logger.warning(f"No final result, returning the {self.row_accumulator.row_count} committed rows")
+            result_dict = self.row_accumulator.merge_into(None)
+            result_dict["task_template"] = self.task_template
+            result_dict["prompt"] = self.prompt
+            result_dict["partial"] = True
+            if self.step_governor and self.step_governor.stop_reason:
+                result_dict["stop_reason"] = self.step_governor.stop_reason
+            return result_dict
         else:
             # Handle the case where no result was returned
-            return self._create_empty_result()
+            result_dict = self._create_empty_result()
+            if self.step_governor and self.step_governor.stop_reason:
+                # stopped by the step governor before any page was committed
+                result_dict["partial"] = True
+                result_dict["stop_reason"] = self.step_governor.stop_reason
+            return result_dict
+
+    async def _start_browser(self) -> None:
+        """
+        Start the browser session before the agent: the recorded network traffic is replayed
+        (browser_config.browser.har) and the JSON responses of the first page load are captured.
+        """
+        if self._browser_started:
+            return
+        self._browser_started = True
+        await self.browser_session.start()
+        await replay_har(self.browser_session)
+        if self.json_capture:
+            self.json_capture.attach(self.browser_session.browser_context)
+
+    async def _finish_har_recording(self) -> None:
+        """Compress the HAR recorded during the run (written when the browser is closed)."""
+        browser_settings = get_browser_settings()
+        results_env = os.getenv("RESULTS_PATH")
+        if browser_settings.har_mode != "record" or not results_env:
+            return
+        await self.browser_session.stop()
+        if self.results_dir:
+            compress_har(har_record_path(browser_settings, self.results_dir, worker=True))
+        else:
+            compress_har(har_record_path(browser_settings, results_env))
+
+    async def _table_fast_path(self) -> Optional[Dict[str, Any]]:
+        """
+        Extract the rows from the HTML tables of the page without the agent.
+
+        Returns:
+            The result, or None if no table matched with enough confidence
+        """
+        page_cache = get_page_cache()
+        try:
+            snapshot = page_cache.get(self.url, key="html") if page_cache is not None else None
+            if snapshot is not None:
+                # the page was rendered by another job of this process
+                html = snapshot.data["html"]
+            else:
+                await self._start_browser()
+                page = await self.browser_session.get_current_page()
+                response = await page.goto(self.url)
+                await page.wait_for_load_state()
+                html = await page.content()
+                if page_cache is not None:
+                    headers = response.headers if response is not None else None
+                    page_cache.put(self.url, content_validator(headers, html), html=html)
+            match = extract_table_rows(
+                html,
+                self.row_accumulator.content_model,
+                min_confidence=float(config_manager.get("local.table_fast_path.min_confidence", 0.8)),
+            )
+        except Exception as e:
+            logger.warning(f"Table fast path failed, running the agent: {str(e)}")
+            return None
+        if match is None or not match.rows:
+            logger.info("No table matched the content structure with enough confidence, running the agent")
+            return None
+
+        logger.info(f"Extracted {len(match.rows)} rows from the HTML tables without the agent")
+        if snapshot is None:
+            await self.browser_session.stop()
+            await self._finish_har_recording()
+        self.row_accumulator.commit(1, match.rows)
+        self.row_accumulator.close()
+        result_dict = table_fast_path_result(match, self.row_accumulator.content_key, self.url)
+        result_dict["task_template"] = self.task_template
+        result_dict["prompt"] = self.prompt
+        return result_dict
+
+    async def _on_step_start(self, agent: Agent) -> None:
+        for hook in self.step_start_hooks:
+            await hook(agent)
+
+    async def _on_step_end(self, agent: Agent) -> None:
+        for hook in self.step_end_hooks:
+            await hook(agent)
 
     def _convert_to_scraped_result(self, output):
         """
@@ -218,6 +451,65 @@ class WebScraper:
             logger.info(f"Clicked on element with XPath: {xpath}")
             
             
+        #######################################################
+        if self.row_accumulator is not None:
+            CommitPageRowsAction = create_model(
+                "CommitPageRowsAction",
+                page=(int, Field(..., description="Number of the page the rows were extracted from")),
+                rows=(List[self.row_accumulator.content_model], Field(..., description="All rows extracted from the page")), # type: ignore
+            )
+
+            @controller.action(
+                "Save all rows extracted from the current page (once per page). Committed rows do not need to be kept or repeated in the final output",
+                param_model=CommitPageRowsAction,
+            )
+            async def commit_page_rows(params: CommitPageRowsAction, browser: Browser): # type: ignore
+                rows = [row.model_dump() for row in params.rows]
+                try:
+                    committed, errors = self.row_accumulator.commit(params.page, rows)
+                except ValueError as e:
+                    return ActionResult(extracted_content=str(e), include_in_memory=True)
+                msg = f"Committed {committed} rows of page {params.page} ({self.row_accumulator.row_count} rows in total)."
+                if errors:
+                    msg = msg + f" Rejected {len(errors)} rows: {'; '.join(errors[:5])}"
+                return ActionResult(
+                    extracted_content=msg,
+                    include_in_memory=True,
+                )
+
+        #######################################################
+        if self.agent_settings.multi_tab:
+            class ExtractFromUrlsAction(BaseModel):
+                urls: List[str] = Field(..., description="URLs of the pages to extract from (e.g. the detail pages linked from the current page)")
+                prompt: str = Field(..., description="What to extract from every page")
+
+            @controller.action(
+                "Extract information from several pages at once: the URLs are opened in parallel tabs and the "
+                "information asked for by the prompt is returned for every page. Use it instead of visiting the pages one by one",
+                param_model=ExtractFromUrlsAction,
+            )
+            async def extract_from_urls(params: ExtractFromUrlsAction, browser: Browser):
+                from app.services.multi_tab_extraction import extract_pages
+
+                urls = params.urls[:self.agent_settings.multi_tab_max_urls]
+                results = await extract_pages(
+                    browser.browser_context,
+                    urls,
+                    params.prompt,
+                    self.llm,
+                    max_tabs=self.agent_settings.multi_tab_max_tabs,
+                    timeout=self.agent_settings.multi_tab_page_timeout,
+                    max_chars=self.agent_settings.multi_tab_max_chars,
+                    cache=get_page_cache(),
+                )
+                msg = f"Extracted from {len(results)} pages"
+                if len(params.urls) > len(urls):
+                    msg = msg + f" (only the first {len(urls)} of {len(params.urls)} URLs, call the action again for the rest)"
+                return ActionResult(
+                    extracted_content=msg + f":\n{json.dumps(results, indent=2, ensure_ascii=False)}",
+                    include_in_memory=True,
+                )
+
         #######################################################
         class ParsePDFAction(BaseModel):
             prompt: str
@@ -0,0 +1,246 @@
+"""
+Adaptive page-load waits.
+
+browser-use waits at least `min_page_load` seconds before reading every step state, even
+on static pages that settle in a few hundred milliseconds. With adaptive waits the fixed
+minimum is lowered to `floor` and the step start hook waits until the page is quiet
+instead: the network is idle and the DOM had no mutation for `quiet_ms`. The wait of every
+domain is bounded by its learned wait times (persisted across runs) and by the
+configured `max_page_load`. Only the waits after a navigation are recorded: a step that
+stays on the same page is quiet almost at once and would shrink the budget. Waits that
+time out are recorded above their budget so it grows for slow domains, and domains whose
+pages never get quiet (tickers, ads) are waited for the fixed `min_page_load` instead,
+with a full wait every `recheck_every` steps in case they got quiet since.
+"""
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+# Resolves true once the DOM had no mutation for quietMs, false after timeoutMs
+QUIESCENCE_JS = """
+([quietMs, timeoutMs]) => new Promise((resolve) => {
+    let quietTimer = null;
+    let limitTimer = null;
+    const observer = new MutationObserver(() => {
+        clearTimeout(quietTimer);
+        quietTimer = setTimeout(() => done(true), quietMs);
+    });
+    const done = (settled) => {
+        observer.disconnect();
+        clearTimeout(quietTimer);
+        clearTimeout(limitTimer);
+        resolve(settled);
+    };
+    observer.observe(document.documentElement || document, {
+        childList: true, subtree: true, attributes: true, characterData: true,
+    });
+    quietTimer = setTimeout(() => done(true), quietMs);
+    limitTimer = setTimeout(() => done(false), timeoutMs);
+})
+"""
+
+
+def default_stats_path() -> Optional[str]:
+    """Default statistics file: page_load_stats.json in the results directory of all profiles."""
+    results_env = os.getenv("RESULTS_PATH")
+    if not results_env:
+        return None
+    return os.path.join(os.path.dirname(os.path.dirname(os.path.normpath(results_env))), "page_load_stats.json")
+
+
+class PageLoadStats:
+    """
+    Wait times (in seconds) of the pages of a domain and whether they got quiet, by domain.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_samples: int = 20):
+        """
+        Args:
+            path: JSON file the wait times are loaded from and saved to (None to keep them in memory)
+            max_samples: Number of latest wait times kept per domain
+        """
+        self.path = path
+        self.max_samples = max_samples
+        # [seconds, settled] waits, by domain
+        self.samples: Dict[str, List[list]] = self._load() if path else {}
+        # wait times recorded since the statistics were loaded
+        self._new: Dict[str, List[list]] = {}
+
+    def record(self, domain: str, seconds: float, settled: bool = True) -> None:
+        """Record a wait: the time until the page was quiet, or the budget if it timed out."""
+        sample = [round(seconds, 3), settled]
+        self.samples.setdefault(domain, []).append(sample)
+        self.samples[domain] = self.samples[domain][-self.max_samples:]
+        self._new.setdefault(domain, []).append(sample)
+
+    def expected(self, domain: str, percentile: float = 0.9) -> Optional[float]:
+        """Percentile of the wait times of a domain (None for unknown domains)."""
+        samples = sorted(seconds for seconds, _ in self.samples.get(domain) or [])
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(percentile * len(samples)))]
+
+    def never_settles(self, domain: str, min_samples: int = 3) -> bool:
+        """Whether the latest min_samples (or more) waits of a domain all timed out."""
+        samples = self.samples.get(domain) or []
+        return len(samples) >= min_samples and not any(settled for _, settled in samples)
+
+    def save(self) -> None:
+        """Merge the new wait times into the statistics file (shared by concurrent runs)."""
+        if not self.path or not self._new:
+            return
+        with _stats_lock:
+            samples = self._load()
+            for domain, seconds in self._new.items():
+                samples[domain] = (samples.get(domain, []) + seconds)[-self.max_samples:]
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            # written aside and renamed so other runs never read a partly written file
+            temp_path = os.path.join(
+                os.path.dirname(self.path), f".{os.path.basename(self.path)}.{os.getpid()}.tmp"
+            )
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(samples, f, indent=2)
+            os.replace(temp_path, self.path)
+        self._new = {}
+
+    def _load(self) -> Dict[str, List[list]]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Could not read the page load statistics {self.path}: {str(e)}")
+            return {}
+        # files written before timed-out waits were recorded only hold the quiet waits
+        return {
+            domain: [sample if isinstance(sample, list) else [sample, True] for sample in samples]
+            for domain, samples in data.items()
+        }
+
+
+_stats_lock = threading.Lock()
+
+
+async def wait_for_quiescence(page, timeout: float, quiet_ms: int = 500) -> Tuple[float, bool]:
+    """
+    Wait until the network of a page is idle and its DOM had no mutation for quiet_ms.
+
+    Args:
+        page: The Playwright page
+        timeout: Maximum wait (in seconds)
+        quiet_ms: Time without DOM mutations for the page to be quiet
+
+    Returns:
+        The wait time and whether the page was quiet before the timeout
+    """
+    start = time.monotonic()
+    network_idle = page.wait_for_load_state("networkidle", timeout=timeout * 1000)
+    dom_quiet = page.evaluate(QUIESCENCE_JS, [quiet_ms, int(timeout * 1000)])
+    try:
+        results = await asyncio.wait_for(
+            asyncio.gather(network_idle, dom_quiet, return_exceptions=True), timeout + 1
+        )
+        settled = results[1] is True and not isinstance(results[0], Exception)
+    except asyncio.TimeoutError:
+        settled = False
+    return time.monotonic() - start, settled
+
+
+class AdaptiveWait:
+    """
+    Waits for the page to be quiet before every step (on_step_start hook).
+    """
+
+    def __init__(
+        self,
+        stats: PageLoadStats,
+        max_wait: float,
+        quiet_ms: int = 500,
+        headroom: float = 2.0,
+        min_budget: float = 1.0,
+        fallback_wait: float = 1.0,
+        recheck_every: int = 10,
+    ):
+        """
+        Args:
+            stats: The learned wait times
+            max_wait: Maximum wait (max_page_load)
+            quiet_ms: Time without DOM mutations for the page to be quiet
+            headroom: The wait of known domains is bounded by headroom x their 90th percentile wait
+            min_budget: Lower bound of the wait budget of known domains
+            fallback_wait: Fixed wait of the domains that never get quiet (min_page_load)
+            recheck_every: Steps between two full waits on the domains that never get quiet
+        """
+        self.stats = stats
+        self.max_wait = max_wait
+        self.fallback_wait = fallback_wait
+        self.quiet_ms = quiet_ms
+        self.headroom = headroom
+        self.min_budget = min_budget
+        self.recheck_every = recheck_every
+        self.waited = 0.0
+        # URL of the previous step and whether the page navigated since
+        self._last_url: Optional[str] = None
+        self._navigated = False
+        self._watched_pages: "weakref.WeakSet" = weakref.WeakSet()
+        # steps waited for with the fixed wait since the last full wait, by domain
+        self._fallback_steps: Dict[str, int] = {}
+
+    def budget(self, domain: str) -> float:
+        """Maximum wait for the pages of a domain."""
+        expected = self.stats.expected(domain)
+        if expected is None:
+            return self.max_wait
+        return min(self.max_wait, max(self.min_budget, self.headroom * expected))
+
+    async def on_step_start(self, agent) -> None:
+        try:
+            page = await agent.browser_session.get_current_page()
+        except Exception:
+            return
+        self._watch(page)
+        # the previous step left the page it was on (new URL, reload or form submission)
+        navigated = page.url != self._last_url or self._navigated
+        self._last_url, self._navigated = page.url, False
+        domain = urlsplit(page.url).hostname
+        if not domain:
+            # about:blank, data: and file: pages
+            return
+        if self.stats.never_settles(domain):
+            fallback_steps = self._fallback_steps.get(domain, 0) + 1
+            if fallback_steps < self.recheck_every or not navigated:
+                # waiting for quiescence would always run into the budget
+                self._fallback_steps[domain] = fallback_steps
+                await asyncio.sleep(self.fallback_wait)
+                self.waited += self.fallback_wait
+                return
+            # check from time to time whether the pages of the domain got quiet
+            self._fallback_steps[domain] = 0
+        budget = self.budget(domain)
+        waited, settled = await wait_for_quiescence(page, budget, self.quiet_ms)
+        self.waited += waited
+        if navigated:
+            # timed-out waits count above the budget so the budget of slow domains grows
+            self.stats.record(domain, waited if settled else min(self.max_wait, budget * self.headroom), settled)
+        logger.debug(f"Waited {waited:.2f}s for {domain} (budget {budget:.2f}s, {'quiet' if settled else 'timed out'})")
+
+    def _watch(self, page) -> None:
+        """Listen to the navigations of the main frame of a page (new tabs included)."""
+        if not hasattr(page, "on") or page in self._watched_pages:
+            return
+        self._watched_pages.add(page)
+
+        def on_frame_navigated(frame):
+            if frame == page.main_frame:
+                self._navigated = True
+
+        page.on("framenavigated", on_frame_navigated)
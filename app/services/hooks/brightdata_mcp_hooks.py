@@ -1,51 +1,145 @@
+import gzip
+import hashlib
 import json
 import os
+from datetime import datetime
+from typing import Any, Iterable, Optional
 
 import logging
 
+from app.utils.config_manager import config_manager
+
 logger = logging.getLogger(__name__)
 
 
-def log_response(reponse):
+class MCPMessageLogger:
     """
-    Log the response from the MCP.
+    Stream the MCP agent conversation to a JSONL file as messages arrive.
+
+    Every message is written as one line to `messages.jsonl`. Message content larger
+    than `max_inline_chars` (e.g. page markdown returned by a scraping tool) is truncated
+    in the log and the full payload is written gzip-compressed to `payloads/<sha256>.txt.gz`,
+    referenced from the log line by its hash. Identical payloads are only written once.
+    """
+
+    FILENAME = "messages.jsonl"
+    PAYLOAD_DIR = "payloads"
+
+    def __init__(self, logs_dir: str, max_inline_chars: int = 4000):
+        """
+        Initialize the logger.
+
+        Args:
+            logs_dir: Directory to write the JSONL log and payload side files to
+            max_inline_chars: Content longer than this is spilled into a side file
+        """
+        self.logs_dir = logs_dir
+        self.max_inline_chars = max_inline_chars
+        self.logged_count = 0
+
+        os.makedirs(os.path.join(logs_dir, self.PAYLOAD_DIR), exist_ok=True)
+        self.log_path = os.path.join(logs_dir, self.FILENAME)
+        # line buffered so every message is on disk as soon as it is logged
+        self._file = open(self.log_path, "a", encoding="utf-8", buffering=1)
+
+    def log_message(self, message: Any) -> None:
+        """
+        Append a single message to the log.
+
+        Args:
+            message: A langchain message (AIMessage, ToolMessage, ...)
+        """
+        record = {
+            "index": self.logged_count,
+            "timestamp": datetime.now().isoformat(),
+            "type": getattr(message, "type", type(message).__name__),
+            "name": getattr(message, "name", None),
+            "tool_call_id": getattr(message, "tool_call_id", None),
+            "tool_calls": getattr(message, "tool_calls", None) or None,
+        }
+        record.update(self._serialize_content(getattr(message, "content", message)))
+
+        self._file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        self.logged_count += 1
+
+    def log_messages(self, messages: Iterable[Any]) -> None:
+        """
+        Log the messages of a conversation that have not been logged yet.
+
+        Meant to be called with the growing message list of a streamed agent run,
+        so only the new tail of the list is written on each call.
+
+        Args:
+            messages: The full list of messages so far
+        """
+        messages = list(messages)
+        for message in messages[self.logged_count:]:
+            self.log_message(message)
+
+    def close(self) -> None:
+        """Close the log file."""
+        if not self._file.closed:
+            self._file.close()
+            logger.info(f"Saved {self.logged_count} MCP messages to {self.log_path}")
+
+    def __enter__(self) -> "MCPMessageLogger":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _serialize_content(self, content: Any) -> dict:
+        """
+        Inline small content, spill large content into a compressed side file.
+        """
+        text = content if isinstance(content, str) else json.dumps(content, ensure_ascii=False, default=str)
+        if len(text) <= self.max_inline_chars:
+            return {"content": content}
+
+        data = text.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        payload_ref = os.path.join(self.PAYLOAD_DIR, f"{digest}.txt.gz")
+        payload_path = os.path.join(self.logs_dir, payload_ref)
+        if not os.path.exists(payload_path):
+            with gzip.open(payload_path, "wb") as f:
+                f.write(data)
+
+        return {
+            "content": text[: self.max_inline_chars],
+            "truncated": True,
+            "content_length": len(text),
+            "content_sha256": digest,
+            "content_ref": payload_ref,
+        }
+
+
+def get_mcp_logger() -> Optional[MCPMessageLogger]:
+    """
+    Create a message logger in the results path of the current run.
+
+    Returns:
+        The logger, or None if the results path is not set
     """
-    # Setup the results path for logging
     results_env = os.getenv("RESULTS_PATH")
     if not results_env:
         logging.error(
-            "RESULTS_PATH environment variable is not set. Skipping page content saving."
+            "RESULTS_PATH environment variable is not set. Skipping MCP response logging."
         )
-        return
-    logs = os.path.join(results_env, "mcp_logs")
-    os.makedirs(logs, exist_ok=True)
-    
-    messages = reponse.get("messages", [])
-    mcp_log = {
-        'print_version': [],
-        'json_view': {},
-    }
-    for message in messages:
-        mcp_log['print_version'].append(message.pretty_repr())
-        mcp_log['json_view']['tool_calls'] = message.tool_calls
-        mcp_log['json_view']['content'] = message.content
-        
-    # Save the log to a file
-    print_version_path = os.path.join(
-        logs, "print_version.json"
-    )
-    json_view_path = os.path.join(
-        logs, "json_view.json"
+        return None
+
+    return MCPMessageLogger(
+        os.path.join(results_env, "mcp_logs"),
+        max_inline_chars=int(config_manager.get("mcp_config.logging.max_inline_chars", 4000)),
     )
-    os.makedirs(os.path.dirname(print_version_path), exist_ok=True)
-    os.makedirs(os.path.dirname(json_view_path), exist_ok=True)
-    with open(print_version_path, "w") as f:
-        json.dump(mcp_log['print_version'], f, indent=4)
-    with open(json_view_path, "w") as f:
-        json.dump(mcp_log['json_view'], f, indent=4)
-    logger.info(f"Saved MCP logs to {print_version_path} and {json_view_path}")
-    
-    
 
 
+def log_response(reponse):
+    """
+    Log the response from the MCP.
+    """
+    mcp_logger = get_mcp_logger()
+    if mcp_logger is None:
+        return
 
+    with mcp_logger:
+        mcp_logger.log_messages(reponse.get("messages", []))
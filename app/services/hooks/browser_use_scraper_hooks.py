@@ -4,8 +4,11 @@ from browser_use.agent.views import AgentHistoryList
 from typing import List, Tuple, Optional
 import os
 import logging
-import base64
+import shutil
 
+from app.services.hooks.screenshot_policy import get_screenshot_policy
+from app.services.hooks.step_content import step_content_hash
+from app.utils.page_cache import content_validator, get_page_cache
 from app.utils.scraper_utils import save_to_pdf
 import copy
 
@@ -61,13 +64,8 @@ async def save_page_content(agent: Agent) -> None:
         finalize_trace_logging(trace_path, step, None, None)
         return
 
-    # Capture the cuurent page content
-    # website_html = await browser_session.get_page_html()
-    website_screenshot = await browser_session.take_screenshot()
-    website_screenshot = base64.b64decode(website_screenshot)
-
     webpage_file_path = False  # Initialize the webpage file path to False
-    if not trace_json or current_url not in trace_json["urls"]:
+    if not trace_json or current_url not in trace_json.get("urls", []):
         # If the current url has not been scraped before, save the page content
         logger.info(f"New Webpage detected: {current_url}. Saving content.")
 
@@ -75,19 +73,14 @@ async def save_page_content(agent: Agent) -> None:
         if not os.path.exists(f"{results_path}/webpage-{webpage_number}"):
             os.makedirs(f"{results_path}/webpage-{webpage_number}/")
 
-        # save page as pdf
-        await save_to_pdf(current_url, page, results_path, webpage_number)
-        webpage_file_path = os.path.join(
-            results_path, f"webpage-{webpage_number}", f"webpage-{webpage_number}.pdf"
-        )
+        # save page as pdf (copied from the page cache if the same page version was already printed)
+        webpage_file_path = await _save_page_pdf(current_url, page, results_path, webpage_number, agent)
 
-    # save the screenshot of the page with the current step number
-    screenshot_path = os.path.join(
-        results_path, f"webpage-{webpage_number}", f"screenshot-step-{step}.png"
+    # save a screenshot if the screenshot policy asks for it (URL/content change, final step,
+    # sampling), otherwise the step points to the latest screenshot
+    screenshot_path = await get_screenshot_policy(agent).capture(
+        agent, page, step, os.path.join(results_path, f"webpage-{webpage_number}")
     )
-    os.makedirs(os.path.dirname(screenshot_path), exist_ok=True)
-    with open(screenshot_path, "wb") as f:
-        f.write(website_screenshot)
 
     # Update trace again with some local path data
     finalize_trace_logging(trace_path, step, screenshot_path, webpage_file_path)
@@ -95,55 +88,35 @@ async def save_page_content(agent: Agent) -> None:
     return
 
 
-# async def on_start_hook(agent: Agent) -> None:
-#     """Hook to be called at the start of the agent.
-
-#     Args:
-#         agent (_type_): _description_
-
-#     Returns:
-#         ActionResult: _description_
-#     """
-#     page = await agent.browser_context.get_current_page()
-    
-#     # define function to handle all the network requests
-#     async def handle_request(route):
-#         # Get the response
-#         logger.info(f"Intercepting request: {route.request.url}")
-#         response = await route.fetch()
-        
-#         try:
-#             # Get response data
-#             body = await response.text()
-#             # determine if the response is a API response that returns JSON that could contain information for the prompt
-#             for header in response.headers:
-#                 if 'application/json' in response.headers[header].lower():
-#                     # return the response as action result content to the agent with the url for the agent to inpect and possibly use to expose all the data we are interested in
-#                     content = f"""
-#                         Network request intercepted: {route.request.url} with possible JSON content related to the prompt.
-                        
-#                         Response: {body} 
-                        
-#                         Plan:
-#                             1. Determine if the content is useful for the prompt
-#                             2. If so, determine if the URL could be exploited to extract more data
-#                             3. If so, add the URL to the list of URLs to scrape and plan to scrape the data using the API call instead of the webpage
-#                             4. If not, ignore the response and continue with the next step.
-#                     """
-                    
-#                     # add the content as a new HumanMessage to the agent to process by using "add plan"
-#                     agent._message_manager.add_plan(content, position=-1)
-                    
-#             # else return nothing as there is no useful json content
-#         except Exception as e:
-#             print(f"Error processing response: {e}")
-            
-#         finally:
-#             # Continue the request
-#             await route.continue_()
-    
-#     # Route all network requests through handler
-#     await page.route("**/*", handle_request)
+async def _save_page_pdf(current_url: str, page, results_path: str, webpage_number: int, agent=None) -> str:
+    """Save the page as PDF, reusing the PDF of the same page version from the page cache.
+
+    Returns:
+        str: The path of the PDF
+    """
+    cache = get_page_cache()
+    validator = None
+    if cache is not None:
+        # the content hash of the step is shared with the other step hooks
+        validator = (
+            await step_content_hash(agent, page) if agent is not None else content_validator(content=await page.content())
+        )
+    snapshot = cache.get(current_url, validator, key="pdf_path") if cache is not None else None
+    if snapshot and os.path.exists(snapshot.data["pdf_path"]):
+        pdf_path = os.path.join(
+            results_path, f"webpage-{webpage_number}", os.path.basename(snapshot.data["pdf_path"])
+        )
+        if os.path.abspath(pdf_path) != os.path.abspath(snapshot.data["pdf_path"]):
+            os.makedirs(os.path.dirname(pdf_path), exist_ok=True)
+            shutil.copyfile(snapshot.data["pdf_path"], pdf_path)
+        logger.info(f"Reused the PDF of {current_url} from the page cache")
+        return pdf_path
+
+    pdf_path = await save_to_pdf(current_url, page, results_path, webpage_number)
+    if cache is not None:
+        cache.put(current_url, validator, pdf_path=pdf_path)
+    return pdf_path
+
 
 def _initialize_trace_logging(
     history: AgentHistoryList,
@@ -194,7 +167,7 @@ def _initialize_trace_logging(
                 )
 
         # Update the data with new URLs and current URL
-        data["urls"].append(current_url) if "urls" in data else [current_url]
+        data.setdefault("urls", []).append(current_url)
 
         # Update the history during the current step
         if "history" not in data:
@@ -247,7 +220,7 @@ def finalize_trace_logging(
         data["history"][str(step)]["webpage_file_path"] = (
             webpage_file_path
             if webpage_file_path
-            else data["history"][str(step - 1)].get("webpage_file_path", None)
+            else data["history"].get(str(step - 1), {}).get("webpage_file_path", None)
         )
 
         # Write the updated data back to the file
@@ -0,0 +1,198 @@
+"""
+Direct extraction from the JSON APIs behind a page.
+
+Single page apps load their tables from XHR/fetch JSON responses. The capture keeps the
+latest JSON responses of the browser context in a bounded buffer and looks for a list of
+records whose keys match the content_structure fields. When one is found, the rows are
+read from the JSON directly, the API is paged through by its page/offset URL parameter
+with the cookies of the browser, and the agent is stopped: a few HTTP requests replace
+the LLM steps reading the rendered table.
+"""
+import logging
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from app.utils.field_matching import match_fields
+
+logger = logging.getLogger(__name__)
+
+# URL parameters used to page through APIs (compared lowercase)
+PAGE_PARAMS = ("page", "p", "pg", "pagenumber", "page_number", "pageindex", "page_index", "pageno")
+OFFSET_PARAMS = ("offset", "start", "skip", "from")
+
+
+def find_records(data: Any, fields: List[str], min_match: float = 0.6) -> Optional[Tuple[List[Dict[str, Any]], float]]:
+    """
+    Find the list of records in a JSON document that best matches the fields.
+
+    Args:
+        data: The parsed JSON
+        fields: The content_structure field names
+        min_match: Minimum fraction of the fields found in the record keys
+
+    Returns:
+        The records mapped to the fields and the fraction of matched fields, or None
+    """
+    best = None
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            stack.extend(node.values())
+            continue
+        if not isinstance(node, list) or not node:
+            continue
+        records = [item for item in node if isinstance(item, dict)]
+        if len(records) != len(node):
+            stack.extend(item for item in node if isinstance(item, (dict, list)))
+            continue
+        keys = {key for record in records[:20] for key in record}
+        matches = match_fields(keys, fields)
+        score = len(matches) / len(fields) if fields else 0.0
+        if score >= min_match and (best is None or score > best[1]):
+            rows = [{field: record.get(key) for field, (key, _) in matches.items()} for record in records]
+            best = (rows, score)
+        # nested lists of records (e.g. {"data": [{"items": [...]}]})
+        for record in records[:1]:
+            stack.extend(value for value in record.values() if isinstance(value, (dict, list)))
+    return best
+
+
+def next_page_url(url: str, page_rows: int) -> Optional[str]:
+    """
+    URL of the next page of an API by its page or offset parameter (None if it has neither).
+
+    Args:
+        url: URL of the current page
+        page_rows: Number of rows of the current page (offset step)
+    """
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    for index, (key, value) in enumerate(query):
+        if not value.isdigit():
+            continue
+        if key.lower() in PAGE_PARAMS:
+            query[index] = (key, str(int(value) + 1))
+        elif key.lower() in OFFSET_PARAMS:
+            query[index] = (key, str(int(value) + page_rows))
+        else:
+            continue
+        return urlunsplit(parts._replace(query=urlencode(query)))
+    return None
+
+
+class JSONCapture:
+    """
+    Captures the JSON responses of a browser context and extracts matching records
+    (on_step_end hook).
+    """
+
+    def __init__(
+        self,
+        fields: List[str],
+        commit,
+        max_pages: int = 50,
+        min_match: float = 0.6,
+        max_responses: int = 50,
+        max_response_bytes: int = 5_000_000,
+    ):
+        """
+        Initialize the capture.
+
+        Args:
+            fields: The content_structure field names
+            commit: Function called with the rows of every API page, returning the number of
+                committed rows and the validation errors (e.g. RowAccumulator.commit_next)
+            max_pages: Maximum number of API pages fetched
+            min_match: Minimum fraction of the fields found in the record keys
+            max_responses: Number of JSON responses kept in the buffer
+            max_response_bytes: Larger responses are not captured
+        """
+        self.fields = fields
+        self.commit = commit
+        self.max_pages = max_pages
+        self.min_match = min_match
+        self.max_response_bytes = max_response_bytes
+        # (url, method, parsed JSON) of the latest responses
+        self.responses: Deque[Tuple[str, str, Any]] = deque(maxlen=max_responses)
+        self._captured = 0
+        self._checked = 0
+        self.source_url: Optional[str] = None
+        self.pages = 0
+
+    @property
+    def extracted(self) -> bool:
+        """Whether the rows were extracted from an API."""
+        return self.source_url is not None
+
+    def attach(self, browser_context) -> None:
+        """Listen to the responses of every page of a Playwright browser context."""
+        browser_context.on("response", self._on_response)
+
+    async def _on_response(self, response) -> None:
+        try:
+            if response.request.resource_type not in ("xhr", "fetch"):
+                return
+            if "json" not in (response.headers.get("content-type") or ""):
+                return
+            length = response.headers.get("content-length")
+            if length and length.isdigit() and int(length) > self.max_response_bytes:
+                return
+            data = await response.json()
+        except Exception:
+            # bodies of redirects, aborted or closed requests are not available
+            return
+        self.responses.append((response.url, response.request.method, data))
+        self._captured += 1
+
+    async def on_step_end(self, agent) -> None:
+        """Hook extracting the rows once a matching API response was captured, then stopping the agent."""
+        if self.extracted:
+            return
+        # only the responses captured since the last step (newest first)
+        new = min(self._captured - self._checked, len(self.responses))
+        self._checked = self._captured
+        new_responses = list(self.responses)[len(self.responses) - new:]
+        for url, method, data in reversed(new_responses):
+            match = find_records(data, self.fields, self.min_match)
+            if match is None:
+                continue
+            rows, score = match
+            logger.info(f"Found {len(rows)} records matching {score:.0%} of the fields in {url}")
+            await self._extract(agent, url, method, rows)
+            if self.extracted:
+                agent.stop()
+            return
+
+    async def _extract(self, agent, url: str, method: str, rows: List[Dict[str, Any]]) -> None:
+        """Commit the rows of the captured response and of the following API pages."""
+        committed, _ = self.commit(rows)
+        if not committed:
+            return
+        self.source_url = url
+        self.pages = 1
+        if method != "GET":
+            return
+
+        page = await agent.browser_session.get_current_page()
+        first_row = rows[0]
+        page_url = url
+        while self.pages < self.max_pages:
+            page_url = next_page_url(page_url, len(rows))
+            if page_url is None:
+                break
+            try:
+                response = await page.context.request.get(page_url)
+                match = find_records(await response.json(), self.fields, self.min_match) if response.ok else None
+            except Exception as e:
+                logger.warning(f"Failed to fetch {page_url}: {str(e)}")
+                break
+            if match is None or not match[0] or match[0][0] == first_row:
+                # no more records (or the API ignores the parameter)
+                break
+            rows = match[0]
+            first_row = rows[0]
+            self.pages += 1
+            self.commit(rows)
+        logger.info(f"Extracted {self.pages} API pages from {url}")
@@ -0,0 +1,191 @@
+"""
+Screenshot policy of the save_page_content hook.
+
+Instead of a full screenshot after every step, a screenshot is only taken when the page
+changed (new URL or new page content), on the final step and optionally every N steps.
+Steps in between point to the latest screenshot in the trace. When the agent runs with
+vision, the screenshot of the step state (taken before the actions of the step, kept
+before it is downscaled for the LLM) is reused if the page is still the same URL and
+content, instead of capturing the page a second time.
+"""
+import base64
+import io
+import logging
+import os
+import weakref
+from typing import Optional, Tuple
+
+from app.utils.config.browser_use import BrowserSettings, get_browser_settings
+from app.services.hooks.step_content import step_content_hash
+from app.utils.page_cache import content_validator
+
+logger = logging.getLogger(__name__)
+
+EXTENSIONS = {"png": "png", "jpeg": "jpg", "webp": "webp"}
+
+
+def encode_image(png: bytes, image_format: str, quality: int) -> Tuple[bytes, str]:
+    """
+    Re-encode a PNG screenshot.
+
+    Args:
+        png: The PNG image
+        image_format: png, jpeg or webp
+        quality: JPEG/WebP quality (1-100)
+
+    Returns:
+        The image and its format (png if Pillow is not installed)
+    """
+    if image_format == "png":
+        return png, "png"
+    try:
+        from PIL import Image
+    except ImportError:
+        logger.warning(f"Pillow is not installed, screenshots are saved as png instead of {image_format}")
+        return png, "png"
+    image = Image.open(io.BytesIO(png))
+    if image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format.upper(), quality=quality)
+    return buffer.getvalue(), image_format
+
+
+class ScreenshotPolicy:
+    """
+    Decides on which steps the page is captured and captures it.
+    """
+
+    def __init__(self, settings: BrowserSettings):
+        self.settings = settings
+        self.last_url: Optional[str] = None
+        self.last_dom_hash: Optional[str] = None
+        # (url, content hash, base64 screenshot) of the latest browser state
+        self.state_screenshot: Optional[Tuple[str, Optional[str], str]] = None
+        self.last_path: Optional[str] = None
+        self.last_step = 0
+        self.captured = 0
+        self.skipped = 0
+
+    def attach(self, agent) -> None:
+        """
+        Keep the screenshot of the browser states fetched by the agent with the page it
+        shows. Attach before the vision controller so the screenshot is kept at full size.
+        """
+        browser_session = agent.browser_session
+        # get_state_summary in browser-use 0.2, get_state in older versions
+        name = "get_state_summary" if hasattr(browser_session, "get_state_summary") else "get_state"
+        get_state = getattr(browser_session, name)
+
+        async def get_state_keeping_screenshot(*args, **kwargs):
+            state = await get_state(*args, **kwargs)
+            screenshot = getattr(state, "screenshot", None)
+            if screenshot:
+                try:
+                    page = await browser_session.get_current_page()
+                    self.state_screenshot = (page.url, content_validator(content=await page.content()), screenshot)
+                except Exception as e:
+                    logger.debug(f"Could not read the page of the browser state: {str(e)}")
+                    self.state_screenshot = None
+            return state
+
+        # the browser session is a pydantic model, bypass its attribute validation
+        object.__setattr__(browser_session, name, get_state_keeping_screenshot)
+
+    def reason(self, step: int, url: str, dom_hash: Optional[str], final: bool) -> Optional[str]:
+        """
+        Why the page should be captured on a step (None to skip the step).
+
+        Args:
+            step: The step number
+            url: The current page URL
+            dom_hash: Hash of the page content (None if not computed)
+            final: Whether this is the last step of the run
+        """
+        triggers = self.settings.screenshot_triggers
+        if self.last_path is None:
+            return "first"
+        if final and "final" in triggers:
+            return "final"
+        if url != self.last_url and "url_change" in triggers:
+            return "url_change"
+        if dom_hash is not None and dom_hash != self.last_dom_hash and "dom_change" in triggers:
+            return "dom_change"
+        sample_every = self.settings.screenshot_sample_every
+        if sample_every > 0 and step - self.last_step >= sample_every:
+            return "sample"
+        return None
+
+    async def capture(self, agent, page, step: int, directory: str) -> Optional[str]:
+        """
+        Capture the page if the policy asks for it.
+
+        Args:
+            agent: The browser-use agent
+            page: The current Playwright page
+            step: The step number
+            directory: Directory of the screenshots of the page
+
+        Returns:
+            The path of the screenshot of the step, or of the latest screenshot if the step
+            was skipped
+        """
+        url = page.url
+        # hashed once per step, shared with the other step hooks
+        dom_hash = await step_content_hash(agent, page)
+        final = _is_final_step(agent)
+
+        reason = self.reason(step, url, dom_hash, final)
+        if reason is None:
+            self.skipped += 1
+            return self.last_path
+
+        image, image_format = await self._screenshot(page, dom_hash)
+        path = os.path.join(directory, f"screenshot-step-{step}.{EXTENSIONS[image_format]}")
+        os.makedirs(directory, exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(image)
+
+        self.last_url, self.last_dom_hash = url, dom_hash
+        self.last_path, self.last_step = path, step
+        self.captured += 1
+        logger.debug(f"Screenshot of step {step} ({reason}), {self.skipped} steps skipped so far")
+        return path
+
+    async def _screenshot(self, page, dom_hash: Optional[str]) -> Tuple[bytes, str]:
+        """Screenshot of the page, reusing the screenshot of the browser state if it shows the same page."""
+        settings = self.settings
+        state_screenshot, self.state_screenshot = self.state_screenshot, None
+        if (
+            state_screenshot is not None
+            and not settings.screenshot_full_page
+            and dom_hash is not None
+            and state_screenshot[:2] == (page.url, dom_hash)
+        ):
+            return encode_image(base64.b64decode(state_screenshot[2]), settings.screenshot_format, settings.screenshot_quality)
+
+        if settings.screenshot_format == "jpeg":
+            image = await page.screenshot(
+                full_page=settings.screenshot_full_page, type="jpeg", quality=settings.screenshot_quality
+            )
+            return image, "jpeg"
+        image = await page.screenshot(full_page=settings.screenshot_full_page, type="png")
+        return encode_image(image, settings.screenshot_format, settings.screenshot_quality)
+
+
+def _is_final_step(agent) -> bool:
+    try:
+        return bool(agent.state.history.is_done() or agent.state.stopped)
+    except AttributeError:
+        return False
+
+
+_policies: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def get_screenshot_policy(agent) -> ScreenshotPolicy:
+    """Screenshot policy of an agent run (created with the browser settings on first use)."""
+    policy = _policies.get(agent)
+    if policy is None:
+        policy = _policies[agent] = ScreenshotPolicy(get_browser_settings())
+    return policy
@@ -0,0 +1,56 @@
+"""
+Page content hash of the current agent step.
+
+Several step hooks need a hash of the page content (the PDF page cache validator, the
+screenshot policy, the step governor). Reading the whole page and hashing it is done once
+per step: the hash is kept per agent for the step number and URL it was computed for.
+"""
+import logging
+import weakref
+from typing import Optional, Tuple
+
+from app.utils.page_cache import content_validator
+
+logger = logging.getLogger(__name__)
+
+_step_hashes: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def _step_number(agent) -> Optional[int]:
+    try:
+        return agent.state.n_steps
+    except AttributeError:
+        return None
+
+
+async def step_content_hash(agent, page) -> Optional[str]:
+    """
+    Hash of the page content of the current step of the agent, computed once per step.
+
+    Args:
+        agent: The browser-use agent
+        page: The current Playwright page
+
+    Returns:
+        The content validator of the page (None if the content could not be read)
+    """
+    step = _step_number(agent)
+    key: Tuple = (step, page.url)
+    try:
+        cached = _step_hashes.get(agent)
+    except TypeError:  # agent cannot be weakly referenced
+        cached = None
+    if step is not None and cached is not None and cached[0] == key:
+        return cached[1]
+
+    try:
+        dom_hash = content_validator(content=await page.content())
+    except Exception as e:
+        logger.debug(f"Could not hash the page content: {str(e)}")
+        dom_hash = None
+    if step is not None:
+        try:
+            _step_hashes[agent] = (key, dom_hash)
+        except TypeError:
+            pass
+    return dom_hash
@@ -0,0 +1,161 @@
+"""
+Step governor of the browser-use agent.
+
+max_steps is a single static cap: an agent stuck in a loop (same page, same action, the
+same error over and over) burns all of its steps. The governor (on_step_end hook) keeps a
+signature of every step (URL, actions and page content hash) and detects steps repeating
+without progress. On the first loop it asks the planner for a new plan (or adds a note to
+the messages when there is no planner), on the next one it stops the agent so the rows
+committed so far are returned as a partial result. Token, cost and wall-clock budgets of
+the job stop the agent the same way.
+"""
+import hashlib
+import json
+import logging
+import time
+from collections import Counter, deque
+from typing import Callable, Deque, Optional
+
+from app.services.hooks.step_content import step_content_hash
+
+logger = logging.getLogger(__name__)
+
+LOOP_NOTE = (
+    "The last steps repeated the same actions on the same page without any progress. "
+    "Do not repeat them: try a different approach (another element, search, URL or page), "
+    "or finish with the data extracted so far."
+)
+
+
+def step_signature(url: str, actions: list, dom_hash: Optional[str]) -> str:
+    """Signature of a step: its page URL, actions and page content hash."""
+    payload = json.dumps([url, actions, dom_hash], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class StepGovernor:
+    """
+    Detects no-progress loops and enforces the budgets of a job (on_step_end hook).
+    """
+
+    def __init__(
+        self,
+        loop_window: int = 6,
+        loop_repeats: int = 3,
+        max_replans: int = 1,
+        max_tokens: int = 0,
+        max_cost: float = 0.0,
+        cost_per_1k_tokens: float = 0.0,
+        max_seconds: float = 0.0,
+        progress: Optional[Callable[[], int]] = None,
+    ):
+        """
+        Initialize the governor.
+
+        Args:
+            loop_window: Number of latest steps checked for repetitions
+            loop_repeats: Number of identical steps (or failed steps) in the window making a loop
+            max_replans: Number of replans before a loop stops the agent
+            max_tokens: Budget of input tokens of the job (0 for no limit)
+            max_cost: Budget of the job in the currency of cost_per_1k_tokens (0 for no limit)
+            cost_per_1k_tokens: Price of 1000 input tokens
+            max_seconds: Wall-clock budget of the job (0 for no limit)
+            progress: Function returning a progress count (e.g. the committed rows), any
+                increase clears the loop window
+        """
+        self.loop_window = loop_window
+        self.loop_repeats = loop_repeats
+        self.max_replans = max_replans
+        self.max_tokens = max_tokens
+        self.max_cost = max_cost
+        self.cost_per_1k_tokens = cost_per_1k_tokens
+        self.max_seconds = max_seconds
+        self.progress = progress
+        self.signatures: Deque[str] = deque(maxlen=loop_window)
+        self.failures: Deque[bool] = deque(maxlen=loop_window)
+        self.replans = 0
+        self.stop_reason: Optional[str] = None
+        self._started = time.monotonic()
+        self._progress = progress() if progress else 0
+
+    async def on_step_end(self, agent) -> None:
+        if self.stop_reason is not None:
+            return
+        history = agent.state.history
+        item = history.history[-1] if history.history else None
+
+        url, dom_hash = None, None
+        try:
+            page = await agent.browser_session.get_current_page()
+            url = page.url
+            dom_hash = await step_content_hash(agent, page)
+        except Exception as e:
+            logger.debug(f"Could not read the page of the step: {str(e)}")
+        actions = []
+        if item is not None and item.model_output is not None:
+            actions = [action.model_dump(exclude_unset=True) for action in item.model_output.action]
+        failed = bool(item is not None and any(result.error for result in item.result))
+
+        reason = self.check(step_signature(url, actions, dom_hash), failed, self.tokens(history))
+        if reason is None:
+            return
+        if reason.startswith("loop") and self.replans < self.max_replans:
+            self.replans += 1
+            logger.warning(f"Step governor: {reason}, replanning ({self.replans}/{self.max_replans})")
+            await self._replan(agent)
+            return
+        self.stop_reason = reason
+        logger.warning(f"Step governor: {reason}, stopping the agent")
+        agent.stop()
+
+    def check(self, signature: str, failed: bool, tokens: int) -> Optional[str]:
+        """
+        Record a step and check the loops and budgets.
+
+        Returns:
+            Why the job should be replanned or stopped (None to go on)
+        """
+        progress = self.progress() if self.progress else 0
+        if progress > self._progress:
+            self._progress = progress
+            self.signatures.clear()
+            self.failures.clear()
+        self.signatures.append(signature)
+        self.failures.append(failed)
+
+        if self.max_seconds and time.monotonic() - self._started > self.max_seconds:
+            return f"wall-clock budget of {self.max_seconds:.0f}s exceeded"
+        if self.max_tokens and tokens > self.max_tokens:
+            return f"token budget of {self.max_tokens} exceeded ({tokens} tokens)"
+        cost = tokens / 1000 * self.cost_per_1k_tokens
+        if self.max_cost and cost > self.max_cost:
+            return f"cost budget of {self.max_cost} exceeded ({cost:.4f})"
+
+        signature, repeats = Counter(self.signatures).most_common(1)[0]
+        if repeats >= self.loop_repeats:
+            return f"loop: the same step was repeated {repeats} times in the last {len(self.signatures)} steps"
+        if sum(self.failures) >= self.loop_repeats:
+            return f"loop: {sum(self.failures)} of the last {len(self.failures)} steps failed"
+        return None
+
+    @staticmethod
+    def tokens(history) -> int:
+        try:
+            return int(history.total_input_tokens())
+        except Exception:
+            return 0
+
+    async def _replan(self, agent) -> None:
+        """Ask the planner for a new plan, or add a note to the messages if there is no planner."""
+        self.signatures.clear()
+        self.failures.clear()
+        plan = None
+        try:
+            if agent.settings.planner_llm is not None:
+                plan = await agent._run_planner()
+        except Exception as e:
+            logger.warning(f"Replanning failed: {str(e)}")
+        try:
+            agent._message_manager.add_plan(f"{LOOP_NOTE}\n{plan}" if plan else LOOP_NOTE, position=-1)
+        except Exception as e:
+            logger.warning(f"Could not add the replan to the messages: {str(e)}")
@@ -0,0 +1,163 @@
+"""
+Vision cost control of the browser-use agent.
+
+With use_vision every step state carries a full window screenshot, the largest part of the
+step prompt. The controller post-processes the screenshot of each step state before it
+is added to the messages: it is only kept when the DOM text of the page is too short for
+the LLM to act on, after a failed step or every `send_every` steps, and it is cropped to
+`max_height` and downscaled to `max_pixels`. The estimated image tokens of every step are
+appended to trace/vision.jsonl in the run results directory.
+"""
+import base64
+import io
+import json
+import logging
+import math
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def image_tokens(width: int, height: int) -> int:
+    """Estimated input tokens of an image (about 750 pixels per token)."""
+    return math.ceil(width * height / 750)
+
+
+def fit_image(screenshot: str, max_pixels: int, max_height: int) -> Tuple[str, Tuple[int, int], Tuple[int, int]]:
+    """
+    Crop a base64 PNG screenshot to a maximum height (keeping the top) and downscale it to
+    a pixel budget.
+
+    Returns:
+        The base64 PNG image, the original size and the new size
+    """
+    from PIL import Image
+
+    image = Image.open(io.BytesIO(base64.b64decode(screenshot)))
+    original_size = image.size
+    width, height = image.size
+    if max_height and height > max_height:
+        image = image.crop((0, 0, width, max_height))
+        height = max_height
+    if max_pixels and width * height > max_pixels:
+        scale = math.sqrt(max_pixels / (width * height))
+        image = image.resize((max(1, int(width * scale)), max(1, int(height * scale))), Image.LANCZOS)
+    if image.size == original_size:
+        return screenshot, original_size, original_size
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", optimize=True)
+    return base64.b64encode(buffer.getvalue()).decode("utf-8"), original_size, image.size
+
+
+def dom_text_length(state) -> Optional[int]:
+    """Length of the interactive elements text of a browser state (None if not available)."""
+    try:
+        return len(state.element_tree.clickable_elements_to_string())
+    except Exception:
+        return None
+
+
+class VisionController:
+    """
+    Decides which step screenshots are sent to the LLM and shrinks them.
+    """
+
+    def __init__(
+        self,
+        max_pixels: int = 800_000,
+        max_height: int = 1600,
+        send_every: int = 5,
+        min_dom_chars: int = 400,
+        trace_dir: Optional[str] = None,
+    ):
+        """
+        Initialize the controller.
+
+        Args:
+            max_pixels: Pixel budget of the images sent (0 for no downscaling)
+            max_height: Images are cropped to this height (0 for no cropping)
+            send_every: Send the screenshot every N steps regardless of the DOM text (0 = never)
+            min_dom_chars: Send the screenshot when the DOM text is shorter than this
+            trace_dir: Directory of vision.jsonl (default: RESULTS_PATH/trace)
+        """
+        self.max_pixels = max_pixels
+        self.max_height = max_height
+        self.send_every = send_every
+        self.min_dom_chars = min_dom_chars
+        if trace_dir is None and os.getenv("RESULTS_PATH"):
+            trace_dir = os.path.join(os.getenv("RESULTS_PATH"), "trace")
+        self.trace_dir = trace_dir
+        # vision record of every step
+        self.steps: List[Dict[str, Any]] = []
+        self._last_step: Optional[int] = None
+
+    @property
+    def total_image_tokens(self) -> int:
+        return sum(record["image_tokens"] for record in self.steps)
+
+    def attach(self, agent) -> None:
+        """Process the screenshots of the browser states fetched by the agent."""
+        browser_session = agent.browser_session
+        # get_state_summary in browser-use 0.2, get_state in older versions
+        name = "get_state_summary" if hasattr(browser_session, "get_state_summary") else "get_state"
+        get_state = getattr(browser_session, name)
+
+        async def get_state_with_vision_control(*args, **kwargs):
+            state = await get_state(*args, **kwargs)
+            step = getattr(agent.state, "n_steps", None)
+            if step != self._last_step:
+                # only the state of the step, not the ones fetched while acting
+                self._last_step = step
+                self.process(state, step, failed=bool(getattr(agent.state, "consecutive_failures", 0)))
+            return state
+
+        # the browser session is a pydantic model, bypass its attribute validation
+        object.__setattr__(browser_session, name, get_state_with_vision_control)
+
+    def reason(self, step: int, dom_chars: Optional[int], failed: bool) -> Optional[str]:
+        """Why the screenshot of a step is sent to the LLM (None to drop it)."""
+        if dom_chars is None or dom_chars < self.min_dom_chars:
+            return "dom_insufficient"
+        if failed:
+            return "after_failure"
+        if self.send_every > 0 and (step - 1) % self.send_every == 0:
+            return "cadence"
+        return None
+
+    def process(self, state, step: int, failed: bool = False) -> Dict[str, Any]:
+        """
+        Drop or shrink the screenshot of a step state and record the image tokens.
+
+        Returns:
+            The vision record of the step
+        """
+        record = {"step": step, "sent": False, "reason": None, "image_tokens": 0}
+        screenshot = getattr(state, "screenshot", None)
+        if screenshot:
+            dom_chars = dom_text_length(state)
+            reason = self.reason(step, dom_chars, failed)
+            record.update(reason=reason, dom_chars=dom_chars)
+            if reason is None:
+                state.screenshot = None
+            else:
+                try:
+                    state.screenshot, original_size, size = fit_image(screenshot, self.max_pixels, self.max_height)
+                except Exception as e:
+                    # Pillow missing or not a PNG: send the screenshot unchanged
+                    logger.debug(f"Could not resize the screenshot: {str(e)}")
+                    original_size = size = None
+                record.update(sent=True, original_size=original_size, size=size)
+                if size:
+                    record["image_tokens"] = image_tokens(*size)
+        self.steps.append(record)
+        self._write(record)
+        logger.debug(f"Vision step {step}: {record}")
+        return record
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        if not self.trace_dir:
+            return
+        os.makedirs(self.trace_dir, exist_ok=True)
+        with open(os.path.join(self.trace_dir, "vision.jsonl"), "a") as f:
+            f.write(json.dumps(record) + "\n")
@@ -0,0 +1,118 @@
+"""
+Concurrent extraction from several pages of one browser session.
+
+List-then-detail crawls (e.g. the film pages of a list page) take the agent a few steps
+per detail page. The `extract_from_urls` controller action hands the detail page URLs
+over at once: they are opened in parallel tabs of the browser context (bounded), every
+page is converted to markdown and a single LLM call extracts what the sub-prompt asks
+for. The per-page results are returned to the agent together.
+"""
+import asyncio
+import json
+import logging
+import re
+from typing import Any, Dict, List, Optional
+
+from app.utils.page_cache import PageSnapshotCache
+
+logger = logging.getLogger(__name__)
+
+EXTRACTION_PROMPT = """Extract the following information from the web page below.
+
+Instructions: {prompt}
+
+Only use information explicitly stated on the page. Answer with a single JSON object and
+nothing else; use null for information that is not on the page.
+
+Page URL: {url}
+Page content (markdown):
+{content}
+"""
+
+_JSON_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+
+def parse_llm_json(text: str) -> Any:
+    """Parse the JSON answer of an LLM (code fences removed), returning the text if it is not JSON."""
+    cleaned = _JSON_FENCE.sub("", text.strip())
+    try:
+        return json.loads(cleaned)
+    except json.JSONDecodeError:
+        return text
+
+
+def html_to_markdown(html: str, max_chars: int) -> str:
+    """Convert a page to markdown (scripts and styles dropped), truncated to max_chars."""
+    from bs4 import BeautifulSoup
+    from markdownify import markdownify
+
+    soup = BeautifulSoup(html, "html.parser")
+    for element in soup(["script", "style", "noscript", "svg", "template"]):
+        element.decompose()
+    markdown = markdownify(str(soup))
+    markdown = re.sub(r"\n{3,}", "\n\n", markdown).strip()
+    return markdown[:max_chars]
+
+
+async def _page_markdown(browser_context, url: str, timeout: float, max_chars: int, cache: Optional[PageSnapshotCache]) -> str:
+    snapshot = cache.get(url, key="markdown") if cache is not None else None
+    if snapshot is not None:
+        logger.info(f"Page cache hit for markdown {url}")
+        return snapshot.data["markdown"]
+
+    page = await browser_context.new_page()
+    try:
+        await page.goto(url, wait_until="domcontentloaded", timeout=timeout * 1000)
+        html = await page.content()
+    finally:
+        await page.close()
+    markdown = html_to_markdown(html, max_chars)
+    if cache is not None:
+        cache.put(url, None, markdown=markdown)
+    return markdown
+
+
+async def extract_pages(
+    browser_context,
+    urls: List[str],
+    prompt: str,
+    llm,
+    max_tabs: int = 4,
+    timeout: float = 30,
+    max_chars: int = 20000,
+    cache: Optional[PageSnapshotCache] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Extract information from several pages in parallel tabs.
+
+    Args:
+        browser_context: The Playwright browser context of the session
+        urls: The page URLs
+        prompt: What to extract from every page
+        llm: LangChain chat model used for the extraction
+        max_tabs: Maximum number of tabs open at the same time
+        timeout: Page load timeout (in seconds)
+        max_chars: The page markdown is truncated to this length
+        cache: Page cache the markdown of the pages is served from
+
+    Returns:
+        The result ({"url", "data"} or {"url", "error"}) of every URL, in order
+    """
+    semaphore = asyncio.Semaphore(max(1, max_tabs))
+
+    async def extract(url: str) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                content = await _page_markdown(browser_context, url, timeout, max_chars, cache)
+                response = await llm.ainvoke(EXTRACTION_PROMPT.format(prompt=prompt, url=url, content=content))
+                return {"url": url, "data": parse_llm_json(getattr(response, "content", str(response)))}
+            except Exception as e:
+                logger.warning(f"Extraction from {url} failed: {str(e)}")
+                return {"url": url, "error": str(e)}
+
+    # unique URLs, in the order given
+    urls = list(dict.fromkeys(urls))
+    results = await asyncio.gather(*(extract(url) for url in urls))
+    failed = sum("error" in result for result in results)
+    logger.info(f"Extracted {len(results) - failed}/{len(results)} pages in parallel tabs")
+    return list(results)
@@ -0,0 +1,254 @@
+"""
+Parallel extraction of paginated tables (tabular_extraction).
+
+A first agent pass only discovers how the pages are addressed (a URL template with the
+page number or row offset). The pages are then extracted concurrently by WebScrapers,
+each with its own browser session, at most `agent_config.pagination.max_concurrency` at
+a time, and the rows are merged in page order. Tables whose pages can not be opened by
+URL are walked sequentially by a single WebScraper as before.
+"""
+import asyncio
+import logging
+import os
+import shutil
+import tempfile
+from typing import Any, Dict, List, Optional, Union
+
+from pydantic import BaseModel, Field, ValidationError
+
+from browser_use import Agent, Controller
+
+from app.models.llm_models import get_llm_instance
+from app.models.tasks_models import Task
+from app.services.browser_use_scraper import WebScraper
+from app.utils.config.browser_use import define_browser_use_session
+from app.utils.config.browser_use_agent import get_agent_settings
+from app.utils.result_writer import content_rows
+from app.utils.row_accumulator import output_content_model
+
+logger = logging.getLogger(__name__)
+
+
+class PaginationInfo(BaseModel):
+    """Model for the pagination reported by the discovery agent"""
+    url_template: Optional[str] = Field(None, description="URL of a page with the page number replaced by {page} or the row offset by {offset}")
+    first_page: int = Field(1, description="Number of the first page (usually 0 or 1)")
+    page_size: Optional[int] = Field(None, description="Number of rows per page")
+    page_count: Optional[int] = Field(None, description="Total number of pages, if shown")
+
+
+def page_urls(info: PaginationInfo, no_pages: Union[int, str], max_pages: int) -> List[str]:
+    """
+    Build the URLs of the pages to extract.
+
+    Args:
+        info: The discovered pagination
+        no_pages: Number of pages to extract, or "all"
+        max_pages: Maximum number of pages (used when the page count is unknown)
+
+    Returns:
+        The page URLs in page order (empty if the pages can not be addressed by URL)
+    """
+    template = info.url_template or ""
+    if "{page}" not in template and "{offset}" not in template:
+        return []
+    if "{offset}" in template and not info.page_size:
+        return []
+
+    count = info.page_count or max_pages
+    if isinstance(no_pages, int):
+        count = min(count, no_pages)
+    count = min(count, max_pages)
+
+    urls = []
+    for index in range(count):
+        urls.append(template.replace("{page}", str(info.first_page + index)).replace("{offset}", str(index * (info.page_size or 0))))
+    return urls
+
+
+def merge_page_results(results: List[Optional[Dict[str, Any]]], content_key: str) -> Dict[str, Any]:
+    """
+    Merge the results of the pages (in page order) into a single output.
+
+    Args:
+        results: The WebScraper result of every page (None for failed pages)
+        content_key: Name of the content field ("<name>-content")
+    """
+    rows = []
+    failed = []
+    summaries = []
+    for page, result in enumerate(results, start=1):
+        if result is None:
+            failed.append(page)
+            continue
+        rows.extend(content_rows(result))
+        for output in result.get("outputs") or []:
+            if output.get("summary"):
+                summaries.append(output["summary"])
+                break
+
+    return {
+        "outputs": [{
+            content_key: rows,
+            "format_type": "table",
+            "summary": summaries[0] if summaries else None,
+        }],
+        "pages": {"extracted": len(results) - len(failed), "failed": failed},
+    }
+
+
+class PaginatedWebScraper:
+    """
+    Extracts the pages of a paginated table concurrently with one WebScraper per page.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        prompt: Dict[str, Any],
+        additional_context: Optional[Dict[str, Any]] = None,
+        initial_actions: Optional[List[Dict[str, Any]]] = None,
+        output_format: Optional[BaseModel] = None,
+    ):
+        """
+        Initialize the PaginatedWebScraper.
+
+        Args:
+            url: URL of the first page
+            prompt: The tabular_extraction prompt (website, data_category, data_points, no_pages, filters)
+            additional_context: Optional additional context to help with scraping
+            initial_actions: Actions run on every page before the agent starts
+            output_format: Output model built by build_output_model
+        """
+        assert output_format, "Output format model is required"
+        assert url, "URL is required"
+
+        self.url = url
+        self.prompt = prompt
+        self.additional_context = additional_context
+        self.initial_actions = initial_actions or []
+        self.output_format = output_format
+        self.agent_settings = get_agent_settings()
+        self.content_key, _ = output_content_model(output_format) # type: ignore
+        # First page found without rows when the page count is unknown, later pages are skipped
+        self._last_page: Optional[int] = None
+        self._detect_end = False
+
+    async def discover(self) -> Optional[PaginationInfo]:
+        """
+        Run the discovery agent.
+
+        Returns:
+            The pagination, or None if it could not be discovered
+        """
+        task_string = Task.from_template(
+            template_name="pagination_discovery",
+            prompt={"data_category": self.prompt.get("data_category"), "url": self.url},
+        ).get_task_string()
+        browser_session = define_browser_use_session()
+        agent = Agent(
+            task=task_string,
+            llm=get_llm_instance(),
+            controller=Controller(output_model=PaginationInfo),
+            message_context=str(self.additional_context) if self.additional_context else "None provided",
+            initial_actions=[{"open_tab": {"url": self.url}}] + self.initial_actions,
+            browser_session=browser_session,
+        )
+        try:
+            history = await agent.run(max_steps=self.agent_settings.discovery_max_steps)
+        finally:
+            # the page sessions are started next, do not keep the discovery browser open
+            await browser_session.stop()
+        result = history.final_result()
+        if not result:
+            return None
+        try:
+            info = PaginationInfo.model_validate_json(result)
+        except ValidationError as e:
+            logger.warning(f"Invalid pagination returned by the discovery agent: {str(e)}")
+            return None
+        logger.info(f"Discovered pagination: {info.model_dump()}")
+        return info
+
+    async def scrape(self) -> Dict[str, Any]:
+        """
+        Discover the pagination and extract the pages concurrently.
+
+        Returns:
+            The merged result, with the rows of all pages in page order
+        """
+        urls = []
+        if self.prompt.get("filters"):
+            # filters are applied on the page and are usually not part of the page URLs
+            logger.info("Filters are set, extracting the pages sequentially")
+        else:
+            info = await self.discover()
+            if info is not None:
+                urls = page_urls(info, self.prompt.get("no_pages"), self.agent_settings.max_parallel_pages) # type: ignore
+                # without a page count, the end of the table is the first page without rows
+                self._detect_end = info.page_count is None
+
+        if len(urls) < 2:
+            logger.info("Pages can not be opened by URL, extracting the pages sequentially")
+            scraper = WebScraper(
+                url=self.url,
+                prompt=self.prompt,
+                additional_context=self.additional_context,
+                task_template="tabular_extraction",
+                initial_actions=self.initial_actions,
+                output_format=self.output_format,
+            )
+            return await scraper.scrape()
+
+        logger.info(f"Extracting {len(urls)} pages with up to {self.agent_settings.page_concurrency} browser sessions")
+        semaphore = asyncio.Semaphore(self.agent_settings.page_concurrency)
+        results = await asyncio.gather(*[
+            self._scrape_page(page, page_url, semaphore) for page, page_url in enumerate(urls, start=1)
+        ])
+        if self._last_page is not None:
+            # drop the pages skipped past the end of the table, pages that returned rows are kept
+            results = [
+                result for page, result in enumerate(results, start=1)
+                if page <= self._last_page or _has_rows(result)
+            ]
+
+        result_dict = merge_page_results(results, self.content_key)
+        result_dict["task_template"] = "tabular_extraction"
+        result_dict["prompt"] = self.prompt
+        return result_dict
+
+    async def _scrape_page(self, page: int, url: str, semaphore: asyncio.Semaphore) -> Optional[Dict[str, Any]]:
+        """Extract a single page (None if it failed)."""
+        async with semaphore:
+            if self._last_page is not None and page > self._last_page:
+                return {}
+
+            results_dir = os.getenv("RESULTS_PATH")
+            # Chrome locks its profile directory, every concurrent session gets its own
+            profile_dir = tempfile.mkdtemp(prefix=f"browseruse-page-{page:04d}-")
+            try:
+                scraper = WebScraper(
+                    url=url,
+                    prompt={**self.prompt, "url": url, "no_pages": None, "filters": None},
+                    additional_context=self.additional_context,
+                    task_template="tabular_extraction",
+                    initial_actions=self.initial_actions,
+                    output_format=self.output_format,
+                    results_dir=os.path.join(results_dir, "pages", f"page-{page:04d}") if results_dir else None,
+                    user_data_dir=profile_dir,
+                )
+                result = await scraper.scrape()
+            except Exception as e:
+                logger.error(f"Failed to extract page {page} ({url}): {str(e)}")
+                return None
+            finally:
+                shutil.rmtree(profile_dir, ignore_errors=True)
+
+            if self._detect_end and not _has_rows(result):
+                logger.info(f"No rows found on page {page}, skipping the following pages")
+                self._last_page = page if self._last_page is None else min(self._last_page, page)
+            return result
+
+
+def _has_rows(result: Optional[Dict[str, Any]]) -> bool:
+    return bool(result) and any(True for _ in content_rows(result))
@@ -4,7 +4,6 @@ import logging
 from typing import Dict, Any, Optional, List, Union
 
 import pymupdf4llm
-from langchain_openai import ChatOpenAI
 from langchain.schema import Document
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_community.vectorstores import FAISS
@@ -79,7 +78,7 @@ class PDFScraper:
         self.chunk_overlap = chunk_overlap
         
         # Get the LLM instance
-        self.llm = get_llm_instance()
+        self.llm = get_llm_instance(priority="pdf_qa")
         
         # Initialize QA chain
         self._init_qa_chain()
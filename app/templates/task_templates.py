@@ -26,7 +26,25 @@ TASK_TEMPLATES = {
         {no_pages}
         {filters}
 
-        Format the extracted data in JSON format with appropriate headers following AgentOutput Format. If any data points are missing, mark them as a null value rather than leaving them blank.
+        After extracting the rows of a page, save them with the commit_page_rows action (with the page number) before moving to the next page.
+        Committed rows are kept by the scraper, do not carry them in your memory or repeat them in the final output.
+
+        Format the extracted data in JSON format with appropriate headers following AgentOutput Format. Only include the rows that were not committed (an empty list if all pages were committed).
+        If any data points are missing, mark them as a null value rather than leaving them blank.
+        """
+    },
+    "pagination_discovery": {
+        "task_format": """
+        Find how the pages of the table or list about {data_category} on {url} are addressed.
+
+        1. Navigate to {url}
+        2. Identify the table or structured data containing information about {data_category}
+        3. Go to the second page of the table and compare its URL with the URL of the first page
+        4. Do not extract any rows
+
+        Return the URL of a page as url_template with the page number replaced by {{page}} (or the row offset by {{offset}}),
+        the number of the first page, the number of rows per page and the total number of pages if it is shown.
+        If the pages can not be opened by URL (e.g. they are loaded without the URL changing), return url_template as null.
         """
     },
     "pdf_default": {
@@ -40,6 +58,9 @@ TASK_TEMPLATES = {
     },
 }
 
+# Templates only used internally (not selectable as the task_template of a prompt)
+INTERNAL_TEMPLATES = {"pagination_discovery"}
+
 def get_task_template(template_name: str = "default") -> Dict[str, str]:
     """
     Get a task template by name.
@@ -54,9 +75,9 @@ def get_task_template(template_name: str = "default") -> Dict[str, str]:
 
 def get_available_templates() -> list:
     """
-    Get a list of all available template names.
+    Get a list of all available template names (internal templates excluded).
     
     Returns:
         A list of template names
     """
-    return list(TASK_TEMPLATES.keys())
\ No newline at end of file
+    return [name for name in TASK_TEMPLATES if name not in INTERNAL_TEMPLATES]
\ No newline at end of file
@@ -0,0 +1,279 @@
+"""
+Columnar (Parquet/Feather) export of the extracted content rows.
+
+The Arrow schema is derived from the profile's content_structure (the str/int/float/bool
+types of build_content_model), rows are written in row groups as they come in, and
+repetitive string columns are dictionary encoded. With append enabled every run is
+written as a new part of a dataset directory (output_path/<profile>/dataset), which can
+be read at once with e.g. `pyarrow.dataset.dataset(path)` or `pandas.read_parquet(path)`.
+
+Requires pyarrow (optional dependency).
+"""
+import logging
+import os
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# content_structure type names to Arrow type names (see build_content_model)
+ARROW_TYPES = {
+    "str": "string",
+    "int": "int64",
+    "float": "float64",
+    "bool": "bool_",
+}
+
+# Column added to every row to tell apart the runs appended to a dataset
+RUN_ID_COLUMN = "_run_id"
+
+FILE_EXTENSIONS = {"parquet": "parquet", "feather": "feather"}
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError("Columnar output requires pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+
+def arrow_schema(content_structure: Optional[Dict[str, Any]]):
+    """
+    Map a content structure to an Arrow schema (all fields nullable, like the content model)
+    with the run id column appended.
+    """
+    pa = _import_pyarrow()
+    if content_structure:
+        _, fields = next(iter(content_structure.items()))
+    else:
+        fields = {"text": "str"}
+    return pa.schema(
+        [pa.field(name, getattr(pa, ARROW_TYPES[type_name])()) for name, type_name in fields.items()]
+        + [pa.field(RUN_ID_COLUMN, pa.string())]
+    )
+
+
+class ColumnarResultWriter:
+    """
+    Writes content rows to a Parquet or Feather file in row groups of `row_group_size` rows.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        content_structure: Optional[Dict[str, Any]],
+        run_id: str,
+        file_format: str = "parquet",
+        row_group_size: int = 10000,
+        dictionary_columns: Union[str, List[str]] = "auto",
+        max_dictionary_ratio: float = 0.5,
+        compression: Optional[str] = "zstd",
+    ):
+        """
+        Initialize the writer. The rows are written to a hidden temporary file (created
+        with the first row group) which is moved to `path` once the writer is closed, so a
+        failed run never leaves a partial part in a dataset.
+
+        Args:
+            path: Path of the output file
+            content_structure: The profile content structure the schema is built from
+            run_id: Value of the run id column
+            file_format: "parquet" or "feather"
+            row_group_size: Number of rows buffered before a row group is written
+            dictionary_columns: String columns to dictionary encode, or "auto" to encode the
+                string columns of the first row group with few distinct values
+            max_dictionary_ratio: "auto" encodes columns with distinct/total values at most this ratio
+            compression: Compression codec (zstd, lz4, snappy, gzip or None)
+        """
+        if file_format not in FILE_EXTENSIONS:
+            raise ValueError(f"Unsupported columnar format: {file_format}. Supported formats are: {', '.join(FILE_EXTENSIONS)}")
+        self.pa = _import_pyarrow()
+        self.path = path
+        # hidden files are skipped by pyarrow datasets and dataset_schema
+        self.temp_path = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.tmp")
+        self.schema = arrow_schema(content_structure)
+        self.run_id = run_id
+        self.file_format = file_format
+        self.row_group_size = row_group_size
+        self.dictionary_columns = dictionary_columns
+        self.max_dictionary_ratio = max_dictionary_ratio
+        self.compression = compression
+        self.rows = 0
+        self._buffer: List[Dict[str, Any]] = []
+        self._writer = None
+        # Feather dictionaries only grow (written as deltas), values -> index per column
+        self._dictionaries: Dict[str, Dict[str, int]] = {}
+
+    def write_rows(self, rows: Iterable[Dict[str, Any]]) -> None:
+        """Buffer validated content rows, writing a row group every `row_group_size` rows."""
+        for row in rows:
+            self._buffer.append(row)
+            if len(self._buffer) >= self.row_group_size:
+                self.flush()
+
+    def flush(self) -> None:
+        """Write the buffered rows as a row group."""
+        if not self._buffer:
+            return
+        columns = {
+            field.name: [row.get(field.name) for row in self._buffer]
+            for field in self.schema
+            if field.name != RUN_ID_COLUMN
+        }
+        columns[RUN_ID_COLUMN] = [self.run_id] * len(self._buffer)
+        if self._writer is None:
+            self._open(columns)
+
+        if self.file_format == "parquet":
+            table = self.pa.table(columns, schema=self.schema)
+            self._writer.write_table(table, row_group_size=len(self._buffer))
+        else:
+            self._writer.write_batch(self._feather_batch(columns))
+        self.rows += len(self._buffer)
+        self._buffer = []
+
+    def close(self) -> None:
+        """Write the remaining rows, close the file and move it into place."""
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            os.replace(self.temp_path, self.path)
+
+    def abort(self) -> None:
+        """Close the file and delete it (the rows written so far are discarded)."""
+        if self._writer is not None:
+            try:
+                self._writer.close()
+            except Exception as e:
+                logger.debug(f"Failed to close {self.temp_path}: {str(e)}")
+            self._writer = None
+        self._buffer = []
+        if os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+
+    def _select_dictionary_columns(self, columns: Dict[str, list]) -> List[str]:
+        string_columns = [field.name for field in self.schema if self.pa.types.is_string(field.type)]
+        if self.dictionary_columns != "auto":
+            return [name for name in self.dictionary_columns if name in string_columns]
+        selected = []
+        for name in string_columns:
+            values = [value for value in columns[name] if value is not None]
+            if values and len(set(values)) / len(values) <= self.max_dictionary_ratio:
+                selected.append(name)
+        return selected
+
+    def _open(self, columns: Dict[str, list]) -> None:
+        dictionary_columns = self._select_dictionary_columns(columns)
+        logger.debug(f"Dictionary encoding columns: {dictionary_columns}")
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+        if self.file_format == "parquet":
+            import pyarrow.parquet as pq
+            self._writer = pq.ParquetWriter(
+                self.temp_path,
+                self.schema,
+                compression=self.compression or "none",
+                use_dictionary=dictionary_columns or False,
+            )
+        else:
+            import pyarrow.ipc as ipc
+            for name in dictionary_columns:
+                index = self.schema.get_field_index(name)
+                self.schema = self.schema.set(index, self.pa.field(name, self.pa.dictionary(self.pa.int32(), self.pa.string())))
+                self._dictionaries[name] = {}
+            options = ipc.IpcWriteOptions(
+                compression=self.compression if self.compression in ("zstd", "lz4") else None,
+                emit_dictionary_deltas=True,
+            )
+            self._writer = ipc.new_file(self.temp_path, self.schema, options=options)
+
+    def _feather_batch(self, columns: Dict[str, list]):
+        """Build a record batch, encoding the dictionary columns against their growing dictionaries."""
+        arrays = []
+        for field in self.schema:
+            values = columns[field.name]
+            if field.name in self._dictionaries:
+                dictionary = self._dictionaries[field.name]
+                indices = [None if value is None else dictionary.setdefault(value, len(dictionary)) for value in values]
+                arrays.append(self.pa.DictionaryArray.from_arrays(
+                    self.pa.array(indices, self.pa.int32()),
+                    self.pa.array(list(dictionary), self.pa.string()),
+                ))
+            else:
+                arrays.append(self.pa.array(values, field.type))
+        return self.pa.record_batch(arrays, schema=self.schema)
+
+    def __enter__(self) -> "ColumnarResultWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            self.abort()
+            return
+        try:
+            self.close()
+        except BaseException:
+            self.abort()
+            raise
+
+
+def dataset_schema(dataset_dir: str, file_format: str):
+    """Schema of the latest readable part of a dataset directory (None if there is none)."""
+    pa = _import_pyarrow()
+    extension = FILE_EXTENSIONS[file_format]
+    if not os.path.isdir(dataset_dir):
+        return None
+    parts = sorted(
+        name for name in os.listdir(dataset_dir) if name.endswith(f".{extension}") and not name.startswith((".", "_"))
+    )
+    for part in reversed(parts):
+        part_path = os.path.join(dataset_dir, part)
+        try:
+            if file_format == "parquet":
+                import pyarrow.parquet as pq
+                return pq.read_schema(part_path)
+            import pyarrow.ipc as ipc
+            with pa.memory_map(part_path) as source:
+                return ipc.open_file(source).schema
+        except (OSError, pa.ArrowException) as e:
+            logger.warning(f"Skipping unreadable dataset part {part_path}: {str(e)}")
+    return None
+
+
+def _same_columns(schema, other) -> bool:
+    """Compare column names and value types (ignoring dictionary encoding and metadata)."""
+    pa = _import_pyarrow()
+
+    def value_type(field):
+        return field.type.value_type if pa.types.is_dictionary(field.type) else field.type
+
+    return schema.names == other.names and all(value_type(a) == value_type(b) for a, b in zip(schema, other))
+
+
+def columnar_output_path(
+    results_dir: str,
+    content_structure: Optional[Dict[str, Any]],
+    run_id: str,
+    file_format: str = "parquet",
+    append: bool = True,
+) -> str:
+    """
+    Path of the columnar output of a run: a new part of the profile dataset directory
+    (next to the run directories) when appending, or a file in the run directory.
+    Runs whose content structure differs from the existing dataset are written to the
+    run directory.
+    """
+    extension = FILE_EXTENSIONS[file_format]
+    run_path = os.path.join(results_dir, f"output.{extension}")
+    if not append:
+        return run_path
+
+    dataset_dir = os.path.join(os.path.dirname(os.path.normpath(results_dir)), "dataset")
+    existing = dataset_schema(dataset_dir, file_format)
+    if existing is not None and not _same_columns(arrow_schema(content_structure), existing):
+        logger.warning(
+            f"The content structure differs from the dataset at {dataset_dir}, writing {run_path} instead"
+        )
+        return run_path
+    return os.path.join(dataset_dir, f"part-{run_id}.{extension}")
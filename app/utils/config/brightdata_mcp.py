@@ -1,6 +1,12 @@
-from mcp import StdioServerParameters
 from ..config_manager import config_manager
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Optional
+from pydantic import BaseModel, ConfigDict
 import logging
+import sys
+
+if TYPE_CHECKING:
+    from mcp import StdioServerParameters
 
 logger = logging.getLogger(__name__)
 
@@ -8,26 +14,94 @@ logger = logging.getLogger(__name__)
     MCP configuration for Bright Data
 """
 
-WEB_UNLOCKER_ZONE = config_manager.get("mcp_config.brightdata_mcp.web_unlocker_zone", None)
-BROWSER_AUTH = config_manager.get("mcp_config.brightdata_mcp.browser_auth", None)
-BRIGHTDATA_API_KEY = config_manager.get_secret("secrets.mcp.brightdata_api_key", None)
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+
+
+class MCPSettings(BaseModel):
+    """
+    MCP server settings resolved from mcp_config.yaml and the secrets.
+    Built on first use and rebuilt after the configuration is reloaded.
+    """
+    model_config = ConfigDict(frozen=True)
+
+    web_unlocker_zone: Optional[str] = None
+    browser_auth: Optional[str] = None
+    brightdata_api_key: Optional[str] = None
+
+    # "brightdata" for the Bright Data network, "local" for the fixture-backed stand-in server
+    server: str = "brightdata"
+    local_mcp: Dict[str, Any] = {}
+
+
+def _build_mcp_settings() -> MCPSettings:
+    return MCPSettings(
+        web_unlocker_zone=config_manager.get("mcp_config.brightdata_mcp.web_unlocker_zone", None),
+        browser_auth=config_manager.get("mcp_config.brightdata_mcp.browser_auth", None),
+        brightdata_api_key=config_manager.get_secret("secrets.mcp.brightdata_api_key", None),
+        server=config_manager.get("mcp_config.server", "brightdata"),
+        local_mcp=config_manager.get("mcp_config.local_mcp", {}) or {},
+    )
+
+
+def get_mcp_settings() -> MCPSettings:
+    """Get the (cached) MCP server settings."""
+    return config_manager.cached("brightdata_mcp", _build_mcp_settings)
 
 
-def define_mcp_server_params() -> StdioServerParameters:
+def define_mcp_server_params() -> "StdioServerParameters":
     """
     Define the server parameters for the MCP server.
     """
-    assert WEB_UNLOCKER_ZONE, "WEB_UNLOCKER_ZONE is not set in the configuration"
-    assert BROWSER_AUTH, "BROWSER_AUTH is not set in the configuration"
-    assert BRIGHTDATA_API_KEY, "BRIGHTDATA_API_KEY is not set in the configuration"
+    from mcp import StdioServerParameters
+
+    settings = get_mcp_settings()
+    if settings.server == "local":
+        return define_local_mcp_server_params()
+
+    assert settings.web_unlocker_zone, "WEB_UNLOCKER_ZONE is not set in the configuration"
+    assert settings.browser_auth, "BROWSER_AUTH is not set in the configuration"
+    assert settings.brightdata_api_key, "BRIGHTDATA_API_KEY is not set in the configuration"
     logger.debug("MCP server parameters are set correctly.")
 
     return StdioServerParameters(
         command="npx",
         env={
-            "API_TOKEN": BRIGHTDATA_API_KEY,
-            "BROWSER_AUTH": BROWSER_AUTH,
-            "WEB_UNLOCKER_ZONE": WEB_UNLOCKER_ZONE,
+            "API_TOKEN": settings.brightdata_api_key,
+            "BROWSER_AUTH": settings.browser_auth,
+            "WEB_UNLOCKER_ZONE": settings.web_unlocker_zone,
         },
         args=["@brightdata/mcp"],
-    )
\ No newline at end of file
+    )
+
+
+def define_local_mcp_server_params() -> "StdioServerParameters":
+    """
+    Define the server parameters for the local stand-in MCP server
+    (app/utils/mcp_tools/local_mcp_server.py) used for offline load testing.
+    """
+    from mcp import StdioServerParameters
+
+    local_config = get_mcp_settings().local_mcp
+
+    fixture_dir = Path(local_config.get("fixture_dir") or "data/mcp_fixtures")
+    if not fixture_dir.is_absolute():
+        fixture_dir = PROJECT_ROOT / fixture_dir
+    assert fixture_dir.exists(), f"Local MCP fixture directory not found at {fixture_dir}"
+    logger.info(f"Using local MCP server with fixtures from {fixture_dir}")
+
+    env = {
+        "LOCAL_MCP_FIXTURE_DIR": str(fixture_dir),
+        "LOCAL_MCP_LATENCY_MS": str(local_config.get("latency_ms") or 0),
+        "LOCAL_MCP_LATENCY_JITTER_MS": str(local_config.get("latency_jitter_ms") or 0),
+        "LOCAL_MCP_ERROR_RATE": str(local_config.get("error_rate") or 0),
+        "LOCAL_MCP_PAYLOAD_SIZE": str(local_config.get("payload_size") or 0),
+    }
+    if local_config.get("seed") is not None:
+        env["LOCAL_MCP_SEED"] = str(local_config["seed"])
+
+    return StdioServerParameters(
+        command=sys.executable,
+        args=["-m", "app.utils.mcp_tools.local_mcp_server"],
+        env=env,
+        cwd=str(PROJECT_ROOT),
+    )
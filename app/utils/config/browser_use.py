@@ -1,6 +1,6 @@
-# Import updated configuration
-from browser_use import BrowserSession, BrowserProfile
 import logging
+from typing import Dict, List, Literal, Optional
+from pydantic import BaseModel, ConfigDict, Field
 from ..config_manager import config_manager
 import os
 
@@ -9,48 +9,110 @@ Browser configuration settings for browser-use.
 """
 logger = logging.getLogger(__name__)
 
-# Browser-use configuration using ConfigManager - no env var fallbacks
-BROWSERUSE_HEADLESS = config_manager.get("browser_config.browser.headless", True)
 
-# Convert time values to milliseconds as needed
-BROWSERUSE_MIN_WAIT_PAGE_LOAD_TIME = int(
-    config_manager.get("browser_config.browser.wait_times.min_page_load", 1)
-)
 
-BROWSERUSE_MAX_WAIT_PAGE_LOAD_TIME = int(
-    config_manager.get("browser_config.browser.wait_times.max_page_load", 5)
-)
+class BrowserSettings(BaseModel):
+    """
+    Browser settings resolved from browser_config.yaml.
+    Built on first use and rebuilt after the configuration is reloaded.
+    """
+    model_config = ConfigDict(frozen=True)
+
+    headless: bool = True
+
+    # Page load wait times and timeout (in seconds)
+    min_wait_page_load_time: int = 1
+    max_wait_page_load_time: int = 5
+    timeout: int = 30
+
+    # Adaptive page-load waits (network idle + DOM quiescence, learned per domain)
+    adaptive_wait: bool = False
+    adaptive_wait_floor: float = 0.25
+    adaptive_wait_quiet_ms: int = 500
+    adaptive_wait_stats_path: Optional[str] = None
 
-BROWSER_TIMEOUT = int(
-    config_manager.get("browser_config.browser.wait_times.timeout", 30)
-)
+    # Window size configuration
+    window_size: Dict[str, int] = {"width": 1920, "height": 1080}
 
-# Window size configuration
-window_width = config_manager.get("browser_config.browser.window.width", 1920)
-window_height = config_manager.get("browser_config.browser.window.height", 1080)
-BROWSERUSE_WINDOW_SIZE = {"width": window_width, "height": window_height}
+    # Debug settings
+    highlight_elements: bool = True
 
-# Debug settings
-BROWSERUSE_HIGHLIGHT_ELEMENTS = config_manager.get(
-    "browser_config.browser.debug.highlight_elements", True
-)
+    # Recording paths
+    save_recording_path: bool = False
+    trace_path: bool = False
+
+    # Page content saved after every step (save_page_content) and its screenshot policy
+    save_page_content: bool = False
+    screenshot_triggers: List[Literal["url_change", "dom_change", "final"]] = ["url_change", "dom_change", "final"]
+    screenshot_sample_every: int = 0
+    screenshot_full_page: bool = False
+    screenshot_format: Literal["png", "jpeg", "webp"] = "jpeg"
+    screenshot_quality: int = Field(70, ge=1, le=100)
+
+    # Network recording (HAR)
+    har_mode: Literal["off", "record", "replay"] = "off"
+    har_path: Optional[str] = None
+    har_content: Literal["embed", "attach", "omit"] = "embed"
+    har_url_filter: Optional[str] = None
+    har_not_found: Literal["abort", "fallback"] = "fallback"
+    har_compress: Literal["zstd", "none"] = "zstd"
+
+
+def _build_browser_settings() -> BrowserSettings:
+    # Browser-use configuration using ConfigManager - no env var fallbacks
+    return BrowserSettings(
+        headless=config_manager.get("browser_config.browser.headless", True),
+        min_wait_page_load_time=int(config_manager.get("browser_config.browser.wait_times.min_page_load", 1)),
+        max_wait_page_load_time=int(config_manager.get("browser_config.browser.wait_times.max_page_load", 5)),
+        timeout=int(config_manager.get("browser_config.browser.wait_times.timeout", 30)),
+        adaptive_wait=bool(config_manager.get("browser_config.browser.wait_times.adaptive.enabled", False)),
+        adaptive_wait_floor=float(config_manager.get("browser_config.browser.wait_times.adaptive.floor", 0.25)),
+        adaptive_wait_quiet_ms=int(config_manager.get("browser_config.browser.wait_times.adaptive.quiet_ms", 500)),
+        adaptive_wait_stats_path=config_manager.get("browser_config.browser.wait_times.adaptive.stats_path", None),
+        window_size={
+            "width": config_manager.get("browser_config.browser.window.width", 1920),
+            "height": config_manager.get("browser_config.browser.window.height", 1080),
+        },
+        highlight_elements=config_manager.get("browser_config.browser.debug.highlight_elements", True),
+        save_recording_path=bool(config_manager.get("browser_config.browser.recordings.save_path", False)),
+        trace_path=bool(config_manager.get("browser_config.browser.recordings.trace_path", False)),
+        save_page_content=bool(config_manager.get("browser_config.browser.page_content.enabled", False)),
+        screenshot_triggers=list(config_manager.get(
+            "browser_config.browser.page_content.screenshots.triggers", ["url_change", "dom_change", "final"]
+        ) or []),
+        screenshot_sample_every=int(config_manager.get("browser_config.browser.page_content.screenshots.sample_every", 0) or 0),
+        screenshot_full_page=bool(config_manager.get("browser_config.browser.page_content.screenshots.full_page", False)),
+        screenshot_format=config_manager.get("browser_config.browser.page_content.screenshots.format", "jpeg"),
+        screenshot_quality=int(config_manager.get("browser_config.browser.page_content.screenshots.quality", 70)),
+        har_mode=str(config_manager.get("browser_config.browser.har.mode", "off") or "off"),
+        har_path=config_manager.get("browser_config.browser.har.path", None),
+        har_content=config_manager.get("browser_config.browser.har.content", "embed"),
+        har_url_filter=config_manager.get("browser_config.browser.har.url_filter", None),
+        har_not_found=config_manager.get("browser_config.browser.har.not_found", "fallback"),
+        har_compress=str(config_manager.get("browser_config.browser.har.compress", "zstd") or "none"),
+    )
 
-# Recording paths
-BROWSERUSE_SAVE_RECORDING_PATH = config_manager.get(
-    "browser_config.browser.recordings.save_path", False
-)
 
-BROWSERUSE_TRACE_PATH = config_manager.get(
-    "browser_config.browser.recordings.trace_path", False
-)
+def get_browser_settings() -> BrowserSettings:
+    """Get the (cached) browser-use browser settings."""
+    return config_manager.cached("browser_use", _build_browser_settings)
 
 
-def define_browser_use_session():
+def define_browser_use_session(results_dir: Optional[str] = None, user_data_dir: Optional[str] = None):
     """
     Define the browser-use configuration using the BrowserConfig class.
 
     This function initializes the browser configuration with the specified parameters.
+
+    Args:
+        results_dir: Results directory of a worker of the run (e.g. pages/page-0001), its
+            recordings and HAR are written there instead of RESULTS_PATH
+        user_data_dir: Browser profile directory (default: the shared browser-use profile),
+            concurrent sessions need their own since Chrome locks the profile
     """
+    from browser_use import BrowserSession, BrowserProfile
+
+    settings = get_browser_settings()
 
     # append main results path to recording paths
     results_env = os.getenv("RESULTS_PATH")
@@ -59,6 +121,7 @@ def define_browser_use_session():
             "RESULTS_PATH environment variable is not set. Skipping PDF response logging."
         )
         return
+    results_env = results_dir or results_env
 
     # set the recording paths to the main results path
     browser_use_recording_path = (
@@ -66,7 +129,7 @@ def define_browser_use_session():
             results_env,
             "recordings",
         )
-        if BROWSERUSE_SAVE_RECORDING_PATH
+        if settings.save_recording_path
         else None
     )
 
@@ -75,7 +138,7 @@ def define_browser_use_session():
             results_env,
             "traces",
         )
-        if BROWSERUSE_TRACE_PATH
+        if settings.trace_path
         else None
     )
 
@@ -85,24 +148,30 @@ def define_browser_use_session():
             results_env,
             "downloads",
         )
-        if BROWSERUSE_SAVE_RECORDING_PATH
+        if settings.save_recording_path
         else "downloads"
     )
 
     # Create browser context config with properly formatted parameters
     # Updated to match the current browser-use API
     browser_profile = BrowserProfile(
-        minimum_wait_page_load_time=BROWSERUSE_MIN_WAIT_PAGE_LOAD_TIME,
-        maximum_wait_page_load_time=BROWSERUSE_MAX_WAIT_PAGE_LOAD_TIME,
-        highlight_elements=BROWSERUSE_HIGHLIGHT_ELEMENTS,
+        # the adaptive wait hook waits for the page to be quiet before every step instead
+        minimum_wait_page_load_time=(
+            min(settings.adaptive_wait_floor, settings.min_wait_page_load_time)
+            if settings.adaptive_wait
+            else settings.min_wait_page_load_time
+        ),
+        maximum_wait_page_load_time=settings.max_wait_page_load_time,
+        highlight_elements=settings.highlight_elements,
         locale="en-US",
         user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/85.0.4183.102 Safari/537.36",
         allowed_domains=None,
-        headless=BROWSERUSE_HEADLESS,
+        headless=settings.headless,
         disable_security=True,
-        user_data_dir='~/.config/browseruse/profiles/default',
+        user_data_dir=user_data_dir or '~/.config/browseruse/profiles/default',
         save_recording_path= browser_use_recording_path,
         trace_path=browser_use_trace_path,
+        **_har_record_options(settings, results_env, worker=results_dir is not None),
     )
 
     browser_session = BrowserSession(
@@ -111,3 +180,100 @@ def define_browser_use_session():
     )
 
     return browser_session
+
+
+def _har_record_options(settings: BrowserSettings, results_env: str, worker: bool = False) -> Dict:
+    """BrowserProfile options recording the network traffic of the run (har.mode: record)."""
+    from browser_use import BrowserProfile
+
+    if settings.har_mode != "record":
+        return {}
+    options = {
+        "record_har_path": har_record_path(settings, results_env, worker=worker),
+        "record_har_content": settings.har_content,
+        "record_har_mode": "full",
+    }
+    if settings.har_url_filter and "record_har_url_filter" in BrowserProfile.model_fields:
+        options["record_har_url_filter"] = settings.har_url_filter
+    logger.info(f"Recording the network traffic to {options['record_har_path']}")
+    return options
+
+
+def har_record_path(settings: BrowserSettings, results_env: str, worker: bool = False) -> str:
+    """
+    Path the HAR of a run is recorded to (a .zip when the bodies are attached as files).
+    The HAR of a worker (results_env is its own results directory) is always recorded
+    in that directory so concurrent sessions do not share the file.
+    """
+    if worker:
+        path = os.path.join(results_env, os.path.basename(settings.har_path or "network.har"))
+    else:
+        path = settings.har_path or os.path.join(results_env, "network.har")
+    if settings.har_content == "attach" and not path.endswith(".zip"):
+        path = os.path.splitext(path)[0] + ".zip"
+    return path
+
+
+async def replay_har(browser_session) -> None:
+    """
+    Serve the requests of a started browser session from the recorded HAR (har.mode: replay).
+    Requests missing from the HAR are aborted or sent to the network (har.not_found).
+    """
+    settings = get_browser_settings()
+    if settings.har_mode != "replay":
+        return
+    if not settings.har_path or not os.path.exists(settings.har_path):
+        raise FileNotFoundError(f"HAR file to replay not found: {settings.har_path}")
+
+    har_path = settings.har_path
+    if har_path.endswith(".zst"):
+        # Playwright reads .har/.zip archives, decompress next to the run results
+        har_path = decompress_har(har_path, os.path.join(os.getenv("RESULTS_PATH") or ".", "replay.har"))
+
+    await browser_session.browser_context.route_from_har(
+        har_path,
+        not_found=settings.har_not_found,
+        url=settings.har_url_filter,
+    )
+    logger.info(f"Replaying the network traffic from {settings.har_path} (not found: {settings.har_not_found})")
+
+
+def _import_zstandard():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError("zstd compressed HAR files require zstandard: pip install zstandard") from e
+    return zstandard
+
+
+def compress_har(path: str) -> Optional[str]:
+    """
+    Compress a recorded HAR with zstd (har.compress) once the browser is closed.
+
+    Returns:
+        The path of the compressed file, or the HAR path if it was not compressed
+    """
+    settings = get_browser_settings()
+    if not os.path.exists(path) or path.endswith(".zip") or settings.har_compress != "zstd":
+        return path if os.path.exists(path) else None
+    try:
+        zstandard = _import_zstandard()
+    except ImportError as e:
+        logger.warning(f"{str(e)}. Keeping the uncompressed HAR.")
+        return path
+
+    compressed_path = f"{path}.zst"
+    with open(path, "rb") as source, open(compressed_path, "wb") as target:
+        zstandard.ZstdCompressor(level=10).copy_stream(source, target)
+    os.remove(path)
+    logger.info(f"Saved the network recording to {compressed_path}")
+    return compressed_path
+
+
+def decompress_har(path: str, target_path: str) -> str:
+    """Decompress a .har.zst recording, returning the path of the HAR."""
+    zstandard = _import_zstandard()
+    os.makedirs(os.path.dirname(target_path) or ".", exist_ok=True)
+    with open(path, "rb") as source, open(target_path, "wb") as target:
+        zstandard.ZstdDecompressor().copy_stream(source, target)
+    return target_path
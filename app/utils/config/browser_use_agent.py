@@ -2,26 +2,114 @@
 Agent configuration settings for browser-use.
 """
 import logging
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict
+
 from ..config_manager import config_manager
 
 logger = logging.getLogger(__name__)
 
-# Agent configuration
-USE_VISION = config_manager.get("agent_config.agent.use_vision", False)
 
-SAVE_CONVERSATION_PATH = config_manager.get(
-    "agent_config.agent.save_conversation_path", None
-)
+class AgentSettings(BaseModel):
+    """
+    Agent settings resolved from agent_config.yaml (and the debug mode from browser_config.yaml).
+    Built on first use and rebuilt after the configuration is reloaded.
+    """
+    model_config = ConfigDict(frozen=True)
+
+    # Agent configuration
+    use_vision: bool = False
+    save_conversation_path: Optional[str] = None
+    run_max_steps: int = 100
+    use_planner_model: bool = False
+    planner_interval: int = 10
+
+    # Parallel pagination
+    parallel_pages: bool = False
+    page_concurrency: int = 4
+    max_parallel_pages: int = 50
+    discovery_max_steps: int = 10
+
+    # Action replay
+    replay_actions: bool = False
+    replay_path: Optional[str] = None
+
+    # JSON API capture
+    json_capture: bool = False
+    json_capture_min_match: float = 0.6
+    json_capture_max_responses: int = 50
+    json_capture_max_response_bytes: int = 5_000_000
+    json_capture_max_pages: int = 50
+
+    # Vision cost control
+    vision_control: bool = False
+    vision_max_pixels: int = 800_000
+    vision_max_height: int = 1600
+    vision_send_every: int = 5
+    vision_min_dom_chars: int = 400
+
+    # Step governor
+    governor: bool = False
+    governor_loop_window: int = 6
+    governor_loop_repeats: int = 3
+    governor_max_replans: int = 1
+    governor_max_tokens: int = 0
+    governor_max_cost: float = 0.0
+    governor_cost_per_1k_tokens: float = 0.0
+    governor_max_seconds: float = 0.0
+
+    # Multi-tab extraction
+    multi_tab: bool = False
+    multi_tab_max_tabs: int = 4
+    multi_tab_max_urls: int = 20
+    multi_tab_page_timeout: float = 30
+    multi_tab_max_chars: int = 20000
+
+    # Debug mode
+    debug_mode: bool = False
 
-RUN_MAX_STEPS = int(config_manager.get("agent_config.agent_run.max_steps", 100))
 
-USE_PLANNER_MODEL = config_manager.get(
-    "agent_config.agent.use_planner_model", False
-)
+def _build_agent_settings() -> AgentSettings:
+    return AgentSettings(
+        use_vision=config_manager.get("agent_config.agent.use_vision", False),
+        save_conversation_path=config_manager.get("agent_config.agent.save_conversation_path", None),
+        run_max_steps=int(config_manager.get("agent_config.agent_run.max_steps", 100)),
+        use_planner_model=config_manager.get("agent_config.agent.use_planner_model", False),
+        planner_interval=int(config_manager.get("agent_config.agent_run.planner_interval", 10)),
+        parallel_pages=config_manager.get("agent_config.pagination.parallel", False),
+        page_concurrency=int(config_manager.get("agent_config.pagination.max_concurrency", 4)),
+        max_parallel_pages=int(config_manager.get("agent_config.pagination.max_pages", 50)),
+        discovery_max_steps=int(config_manager.get("agent_config.pagination.discovery_max_steps", 10)),
+        replay_actions=config_manager.get("agent_config.replay.enabled", False),
+        replay_path=config_manager.get("agent_config.replay.path", None),
+        json_capture=config_manager.get("agent_config.json_capture.enabled", False),
+        json_capture_min_match=float(config_manager.get("agent_config.json_capture.min_match", 0.6)),
+        json_capture_max_responses=int(config_manager.get("agent_config.json_capture.max_responses", 50)),
+        json_capture_max_response_bytes=int(config_manager.get("agent_config.json_capture.max_response_bytes", 5_000_000)),
+        json_capture_max_pages=int(config_manager.get("agent_config.json_capture.max_pages", 50)),
+        vision_control=config_manager.get("agent_config.vision.adaptive", False),
+        vision_max_pixels=int(config_manager.get("agent_config.vision.max_pixels", 800_000) or 0),
+        vision_max_height=int(config_manager.get("agent_config.vision.max_height", 1600) or 0),
+        vision_send_every=int(config_manager.get("agent_config.vision.send_every", 5) or 0),
+        vision_min_dom_chars=int(config_manager.get("agent_config.vision.min_dom_chars", 400)),
+        governor=config_manager.get("agent_config.governor.enabled", False),
+        governor_loop_window=int(config_manager.get("agent_config.governor.loop_window", 6)),
+        governor_loop_repeats=int(config_manager.get("agent_config.governor.loop_repeats", 3)),
+        governor_max_replans=int(config_manager.get("agent_config.governor.max_replans", 1)),
+        governor_max_tokens=int(config_manager.get("agent_config.governor.max_tokens", 0) or 0),
+        governor_max_cost=float(config_manager.get("agent_config.governor.max_cost", 0) or 0),
+        governor_cost_per_1k_tokens=float(config_manager.get("agent_config.governor.cost_per_1k_tokens", 0) or 0),
+        governor_max_seconds=float(config_manager.get("agent_config.governor.max_seconds", 0) or 0),
+        multi_tab=config_manager.get("agent_config.multi_tab.enabled", False),
+        multi_tab_max_tabs=int(config_manager.get("agent_config.multi_tab.max_tabs", 4)),
+        multi_tab_max_urls=int(config_manager.get("agent_config.multi_tab.max_urls", 20)),
+        multi_tab_page_timeout=float(config_manager.get("agent_config.multi_tab.page_timeout", 30)),
+        multi_tab_max_chars=int(config_manager.get("agent_config.multi_tab.max_chars", 20000)),
+        debug_mode=config_manager.get("browser_config.debug_mode", False),
+    )
 
-PLANNER_INTERVAL = int(config_manager.get(
-    "agent_config.agent_run.planner_interval", 10
-))
 
-# Debug mode
-DEBUG_MODE = config_manager.get("browser_config.debug_mode", False)
\ No newline at end of file
+def get_agent_settings() -> AgentSettings:
+    """Get the (cached) browser-use agent settings."""
+    return config_manager.cached("browser_use_agent", _build_agent_settings)
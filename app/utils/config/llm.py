@@ -2,82 +2,140 @@
 LLM configuration settings for language models.
 """
 import logging
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel, ConfigDict
+
 from ..config_manager import config_manager
 
 logger = logging.getLogger(__name__)
 
-def _validate_llm_provider(provider):
-    if provider == 'openai' and not OPENAI_API_KEY:
+
+class LLMSettings(BaseModel):
+    """
+    LLM settings resolved from llm_config.yaml and the secrets.
+    Built on first use and rebuilt after the configuration is reloaded.
+    """
+    model_config = ConfigDict(frozen=True)
+
+    # LLM provider and model
+    provider: Optional[str] = None
+    model: Optional[str] = None
+    planner_provider: Optional[str] = None
+    planner_model: Optional[str] = None
+
+    # Optional routing across several provider/model targets
+    routing: Optional[Dict[str, Any]] = None
+    planner_routing: Optional[Dict[str, Any]] = None
+
+    # Hyperparameters
+    temperature: float = 0.7
+    max_tokens: int = 1000
+    top_p: float = 1.0
+    frequency_penalty: float = 0.0
+    presence_penalty: float = 0.0
+
+    # HTTP connection pool shared by all requests of an LLM client
+    connection_pool: Dict[str, Any] = {}
+
+    # LLM API Keys
+    openai_api_key: Optional[str] = None
+    anthropic_api_key: Optional[str] = None
+    google_api_key: Optional[str] = None
+    deepseek_api_key: Optional[str] = None
+    azure_api_key: Optional[str] = None
+    azure_endpoint: Optional[str] = None
+
+
+def _build_llm_settings() -> LLMSettings:
+    return LLMSettings(
+        provider=config_manager.get("llm_config.llm.provider"),
+        model=config_manager.get("llm_config.llm.model"),
+        planner_provider=config_manager.get("llm_config.planner_llm.provider", None),
+        planner_model=config_manager.get("llm_config.planner_llm.model", None),
+        routing=config_manager.get("llm_config.llm.routing", None),
+        planner_routing=config_manager.get("llm_config.planner_llm.routing", None),
+        temperature=config_manager.get("llm_config.hyperparameters.temperature", 0.7),
+        max_tokens=config_manager.get("llm_config.hyperparameters.max_tokens", 1000),
+        top_p=config_manager.get("llm_config.hyperparameters.top_p", 1.0),
+        frequency_penalty=config_manager.get("llm_config.hyperparameters.frequency_penalty", 0.0),
+        presence_penalty=config_manager.get("llm_config.hyperparameters.presence_penalty", 0.0),
+        connection_pool=config_manager.get("llm_config.connection_pool", {}) or {},
+        openai_api_key=config_manager.get_secret("secrets.llm.openai.api_key"),
+        anthropic_api_key=config_manager.get_secret("secrets.llm.anthropic.api_key"),
+        google_api_key=config_manager.get_secret("secrets.llm.google.api_key"),
+        deepseek_api_key=config_manager.get_secret("secrets.llm.deepseek.api_key"),
+        azure_api_key=config_manager.get_secret("secrets.llm.azure.api_key"),
+        azure_endpoint=config_manager.get_secret("secrets.llm.azure.endpoint"),
+    )
+
+
+def get_llm_settings() -> LLMSettings:
+    """Get the (cached) LLM settings."""
+    return config_manager.cached("llm", _build_llm_settings)
+
+
+def _validate_llm_provider(settings: LLMSettings, provider):
+    if provider == 'openai' and not settings.openai_api_key:
         raise ValueError("OpenAI API key is required when using OpenAI as provider")
-    elif provider == 'deepseek' and not DEEPSEEK_API_KEY:
+    elif provider == 'deepseek' and not settings.deepseek_api_key:
         raise ValueError("DeepSeek API key is required when using DeepSeek as provider")
-    elif provider == 'anthropic' and not ANTHROPIC_API_KEY:
+    elif provider == 'anthropic' and not settings.anthropic_api_key:
         raise ValueError("Anthropic API key is required when using Anthropic as provider")
-    elif provider == 'azure_openai' and not AZURE_API_KEY and not AZURE_ENDPOINT:
+    elif provider == 'azure_openai' and not settings.azure_api_key and not settings.azure_endpoint:
         raise ValueError("Azure OpenAI API key and endpoint are required when using Azure OpenAI as provider")
-    elif provider == 'google' and not GOOGLE_API_KEY:
+    elif provider == 'google' and not settings.google_api_key:
         raise ValueError("Google API key is required when using Google as provider")
 
-# LLM provider and model
-LLM_PROVIDER = config_manager.get("llm_config.llm.provider")
-PLANNER_LLM_PROVIDER = config_manager.get("llm_config.planner_llm.provider", None)
-if not LLM_PROVIDER:
-    raise ValueError("LLM_PROVIDER must be specified in the configuration.")
-
-LLM_MODEL = config_manager.get("llm_config.llm.model")
-PLANNER_LLM_MODEL = config_manager.get("llm_config.planner_llm.model", None)
-if not LLM_MODEL:
-    raise ValueError("LLM_MODEL must be specified in the configuration.")
-
-# Hyperparameters
-LLM_TEMPERATURE = config_manager.get("llm_config.hyperparameters.temperature", 0.7)
-LLM_MAX_TOKENS = config_manager.get("llm_config.hyperparameters.max_tokens", 1000)
-LLM_TOP_P = config_manager.get("llm_config.hyperparameters.top_p", 1.0)
-LLM_FREQUENCY_PENALTY = config_manager.get(
-    "llm_config.hyperparameters.frequency_penalty", 0.0
-)
-LLM_PRESENCE_PENALTY = config_manager.get(
-    "llm_config.hyperparameters.presence_penalty", 0.0
-)
-
-# LLM API Keys
-OPENAI_API_KEY = config_manager.get_secret("secrets.llm.openai.api_key")
-ANTHROPIC_API_KEY = config_manager.get_secret("secrets.llm.anthropic.api_key")
-GOOGLE_API_KEY = config_manager.get_secret("secrets.llm.google.api_key")
-DEEPSEEK_API_KEY = config_manager.get_secret("secrets.llm.deepseek.api_key")
-AZURE_API_KEY = config_manager.get_secret("secrets.llm.azure.api_key")
-AZURE_ENDPOINT = config_manager.get_secret("secrets.llm.azure.endpoint")
-
-# Validate API keys
-_validate_llm_provider(LLM_PROVIDER)
-_validate_llm_provider(PLANNER_LLM_PROVIDER)
 
 def get_llm_config(planner=False):
     """Get the LLM configuration based on the provider."""
-    provider = PLANNER_LLM_PROVIDER if planner else LLM_PROVIDER
-    model = PLANNER_LLM_MODEL if planner else LLM_MODEL
+    settings = get_llm_settings()
+    if not settings.provider:
+        raise ValueError("LLM_PROVIDER must be specified in the configuration.")
+    if not settings.model:
+        raise ValueError("LLM_MODEL must be specified in the configuration.")
+
+    provider = settings.planner_provider if planner else settings.provider
+    model = settings.planner_model if planner else settings.model
+    _validate_llm_provider(settings, provider)
+
+    config = get_llm_target_config(provider, model)
+
+    routing = settings.planner_routing if planner else settings.routing
+    if routing:
+        for target in routing.get("targets") or []:
+            _validate_llm_provider(settings, target["provider"])
+    config["routing"] = routing
+
+    return config
+
 
+def get_llm_target_config(provider, model):
+    """Get the LLM configuration for a single provider/model, including its credentials."""
+    settings = get_llm_settings()
     config = {
         "provider": provider,
         "model": model,
-        "temperature": LLM_TEMPERATURE,
-        "max_tokens": LLM_MAX_TOKENS,
-        "top_p": LLM_TOP_P,
-        "frequency_penalty": LLM_FREQUENCY_PENALTY,
-        "presence_penalty": LLM_PRESENCE_PENALTY,
+        "temperature": settings.temperature,
+        "max_tokens": settings.max_tokens,
+        "top_p": settings.top_p,
+        "frequency_penalty": settings.frequency_penalty,
+        "presence_penalty": settings.presence_penalty,
+        "connection_pool": settings.connection_pool,
     }
 
     if provider == "openai":
-        config["api_key"] = OPENAI_API_KEY
+        config["api_key"] = settings.openai_api_key
     elif provider == "deepseek":
-        config["api_key"] = DEEPSEEK_API_KEY
+        config["api_key"] = settings.deepseek_api_key
     elif provider == "anthropic":
-        config["api_key"] = ANTHROPIC_API_KEY
+        config["api_key"] = settings.anthropic_api_key
     elif provider == "azure_openai":
-        config["api_key"] = AZURE_API_KEY
-        config["endpoint"] = AZURE_ENDPOINT
+        config["api_key"] = settings.azure_api_key
+        config["endpoint"] = settings.azure_endpoint
     elif provider == "google":
-        config["api_key"] = GOOGLE_API_KEY
+        config["api_key"] = settings.google_api_key
     else:
         raise ValueError(f"Unsupported LLM provider: {provider}")
 
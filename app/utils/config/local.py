@@ -5,6 +5,8 @@ import os
 import sys
 import json
 import logging
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from pydantic import BaseModel, create_model, Field
 from typing import Type, Optional
@@ -53,10 +55,61 @@ def load_profile_config() -> bool:
     return True
 
 
+# Bounded cache of the models generated from content structures (see cached_model)
+MODEL_CACHE_SIZE = 128
+_model_cache: "OrderedDict[tuple, Type[BaseModel]]" = OrderedDict()
+_model_cache_lock = threading.Lock()
+
+
+def content_structure_key(content_structure) -> tuple:
+    """
+    Build a hashable key describing the shape of a content structure. Field order is
+    kept, since it is the order of the fields in the generated models and schemas.
+    """
+    if isinstance(content_structure, dict):
+        return ("dict",) + tuple((k, content_structure_key(v)) for k, v in content_structure.items())
+    if isinstance(content_structure, (list, tuple)):
+        return ("list",) + tuple(content_structure_key(v) for v in content_structure)
+    return content_structure
+
+
+def cached_model(kind: str, content_structure, build) -> Type[BaseModel]:
+    """
+    Get the model built from a content structure, building it with `build(content_structure)`
+    on a cache miss. Identical structures return the same class, so its validator and JSON
+    schema are only generated once. The least recently used models are evicted above
+    MODEL_CACHE_SIZE.
+
+    Args:
+        kind: Kind of model (part of the cache key)
+        content_structure: The content structure the model is built from
+        build: Function building the model
+    """
+    key = (kind, content_structure_key(content_structure))
+    with _model_cache_lock:
+        model = _model_cache.get(key)
+        if model is not None:
+            _model_cache.move_to_end(key)
+            return model
+
+    model = build(content_structure)
+    with _model_cache_lock:
+        model = _model_cache.setdefault(key, model)
+        _model_cache.move_to_end(key)
+        while len(_model_cache) > MODEL_CACHE_SIZE:
+            _model_cache.popitem(last=False)
+    return model
+
+
 def build_content_model(content_structure) -> Type[BaseModel]:
     """
     Parse the content format from the configuration and return the corresponding model.
+    Models are cached by the shape of the content structure.
     """
+    return cached_model("content", content_structure, _build_content_model)
+
+
+def _build_content_model(content_structure) -> Type[BaseModel]:
     # Fall back to basic content structure if content_structure is not provided
     if not content_structure:
         return create_model(
@@ -82,6 +135,37 @@ def build_content_model(content_structure) -> Type[BaseModel]:
     return content_model
 
 
+def parse_initial_actions(initial_actions: list) -> list:
+    """
+    Convert the initial actions of a profile (e.g. `- click_by_xpath: <xpath>`) to
+    browser-use action parameters. Unknown actions are skipped.
+
+    Args:
+        initial_actions: List of single-key {action: value} mappings
+
+    Returns:
+        The list of {action: parameters} mappings
+    """
+    parsed_initial_actions = []
+    for initial_action in initial_actions:
+        action, value = list(initial_action.items())[0]
+        if "scroll" in action:
+            parsed_initial_actions.append({action: {"amount": value}})
+        elif "go_to_url" == action:
+            parsed_initial_actions.append({action: {"url": value}})
+        elif "click_element_by_index" == action:
+            parsed_initial_actions.append({action: {
+                "index": value.get("index"),
+                "xpath": value.get("xpath"),
+            }})
+        elif "click_by_xpath" == action:
+            parsed_initial_actions.append({action: {"xpath": value}})
+        else:
+            logger.warning(f"Unknown action: {action}. Skipping.")
+            continue
+    return parsed_initial_actions
+
+
 def parse_local_config(available_templates: list) -> dict:
     """
     Parse the configuration from profile and/or local configs and set up the environment.
@@ -92,7 +176,7 @@ def parse_local_config(available_templates: list) -> dict:
     Returns:
         dict: Dictionary of configuration values
     """
-    from .browser_use_agent import DEBUG_MODE
+    from .browser_use_agent import get_agent_settings
 
     # Helper function to get config with profile fallback
     def get_config(key, default=None):
@@ -170,24 +254,7 @@ def parse_local_config(available_templates: list) -> dict:
     # Handle initial actions
     initial_actions = get_config("initial_actions", [])
     if initial_actions:
-        parsed_initial_actions = []
-        for initial_action in initial_actions:
-            action, value = list(initial_action.items())[0]
-            if "scroll" in action:
-                parsed_initial_actions.append({action: {"amount": value}})
-            elif "go_to_url" == action:
-                parsed_initial_actions.append({action: {"url": value}})
-            elif "click_element_by_index" == action:
-                parsed_initial_actions.append({action: {
-                    "index": value.get("index"),
-                    "xpath": value.get("xpath"),
-                }})
-            elif "click_by_xpath" == action:
-                parsed_initial_actions.append({action: {"xpath": value}})
-            else:
-                logger.warning(f"Unknown action: {action}. Skipping.")
-                continue
-        initial_actions = parsed_initial_actions
+        initial_actions = parse_initial_actions(initial_actions)
 
 
     # Get output path
@@ -207,5 +274,5 @@ def parse_local_config(available_templates: list) -> dict:
         "initial_actions": initial_actions,
         "profile_name": profile_name,
         "output_path": output_path,
-        "debug_mode": DEBUG_MODE,
+        "debug_mode": get_agent_settings().debug_mode,
     }
\ No newline at end of file
@@ -1,22 +1,245 @@
 import yaml
 import os
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
 from pathlib import Path
-from typing import Any, Dict
-import logging 
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import logging
 
 logger = logging.getLogger(__name__)
 
+# Markers for config paths that do not exist (so the default is returned) and paths not resolved yet
+_MISSING = object()
+_UNRESOLVED = object()
+
+
+class FrozenDict(dict):
+    """
+    Read-only dict used for the configuration values of a snapshot. It is still a dict,
+    so it can be serialized to JSON or formatted into prompts like the parsed YAML.
+    """
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Configuration snapshots are read-only, use config_manager.load_specific_config or reload")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+
+class FrozenList(list):
+    """Read-only list used for the configuration values of a snapshot."""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Configuration snapshots are read-only, use config_manager.load_specific_config or reload")
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _readonly
+    append = extend = insert = remove = pop = clear = sort = reverse = _readonly
+
+    def __reduce__(self):
+        return (FrozenList, (list(self),))
+
+
+def freeze(value: Any) -> Any:
+    """Recursively convert parsed YAML into FrozenDict/FrozenList values."""
+    if isinstance(value, dict):
+        return FrozenDict({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return FrozenList(freeze(item) for item in value)
+    return value
+
+
+class ConfigSnapshot:
+    """
+    An immutable version of the configuration.
+
+    The text of every config file is read when the snapshot is captured (before it is
+    published or pinned, or on its first access), so all reads of a snapshot see the files
+    as they were at that moment. The files are parsed on first access (once per snapshot),
+    and every resolved dot path and settings object is cached on the snapshot, so repeated
+    reads are a dictionary lookup.
+    """
+
+    def __init__(
+        self,
+        version: int,
+        config_dir: Path,
+        configs: Optional[Dict[str, Any]] = None,
+        sources: Optional[Dict[str, Path]] = None,
+        texts: Optional[Dict[str, Tuple[Path, str]]] = None,
+    ):
+        """
+        Args:
+            version: Version number of the snapshot (increases with every published snapshot)
+            config_dir: Directory the config files not loaded yet are read from
+            configs: Configurations already loaded (frozen)
+            sources: Files the loaded configurations were parsed from
+            texts: (file, text) of the config files not parsed yet, None to read them from
+                config_dir when the snapshot is captured
+        """
+        self.version = version
+        self.config_dir = config_dir
+        self._configs = dict(configs or {})
+        self._sources = dict(sources or {})
+        self._texts = dict(texts) if texts is not None else None
+        self._missing = set()
+        self._resolved = {}
+        self._settings = {}
+        self._lock = threading.RLock()
+
+    @property
+    def configs(self) -> Dict[str, Any]:
+        """The configurations loaded in this snapshot."""
+        return FrozenDict(self._configs)
+
+    @property
+    def sources(self) -> Dict[str, Path]:
+        """The files the loaded configurations were parsed from."""
+        return dict(self._sources)
+
+    def capture(self) -> None:
+        """
+        Read the text of every config file of the config directory not loaded yet (once per
+        snapshot). The disk is not read again for this snapshot afterwards.
+        """
+        if self._texts is not None:
+            return
+        with self._lock:
+            if self._texts is not None:
+                return
+            texts = {}
+            if not self.config_dir.exists():
+                logger.warning(f"Warning: Config directory not found at {self.config_dir}")
+            else:
+                for config_file in sorted(self.config_dir.glob("*.yaml")):
+                    if config_file.stem in self._configs:
+                        continue
+                    try:
+                        texts[config_file.stem] = (config_file, config_file.read_text(encoding="utf-8"))
+                    except OSError as e:
+                        logger.error(f"Error loading {config_file}: {str(e)}")
+            self._texts = texts
+
+    @property
+    def texts(self) -> Dict[str, Tuple[Path, str]]:
+        """(file, text) of the captured config files not parsed yet."""
+        self.capture()
+        return dict(self._texts)
+
+    def load_all(self) -> None:
+        """Parse every captured config file not loaded yet."""
+        self.capture()
+        for config_name in list(self._texts):
+            self.ensure_loaded(config_name)
+
+    def ensure_loaded(self, config_name: str) -> bool:
+        """
+        Parse the captured config file for a config name if it was not loaded yet.
+
+        Returns:
+            True if the configuration is available
+        """
+        if config_name in self._configs:
+            return True
+        self.capture()
+        with self._lock:
+            if config_name in self._configs:
+                return True
+            if config_name in self._missing or config_name not in self._texts:
+                self._missing.add(config_name)
+                return False
+
+            config_file, text = self._texts.pop(config_name)
+            self._configs[config_name] = freeze(parse_yaml(text, config_file))
+            self._sources[config_name] = config_file
+            logger.info(f"Loaded configuration from {config_file}")
+            return True
+
+    def get(self, path: str, default: Any = None) -> Any:
+        """Get a configuration value using a dot notation path (see ConfigManager.get)."""
+        value = self._resolved.get(path, _UNRESOLVED)
+        if value is _UNRESOLVED:
+            value = self._resolve(path)
+            self._resolved[path] = value
+        return default if value is _MISSING else value
+
+    def _resolve(self, path: str) -> Any:
+        parts = path.split('.')
+        # First part should be the config file name
+        if not self.ensure_loaded(parts[0]):
+            return _MISSING
+
+        current = self._configs[parts[0]]
+
+        # Navigate through the nested structure
+        for part in parts[1:]:
+            if isinstance(current, dict) and part in current:
+                current = current[part]
+            else:
+                return _MISSING
+
+        return current
+
+    def cached(self, name: str, factory: Callable[[], Any]) -> Any:
+        """Get a settings object built from this snapshot, building it on first use."""
+        settings = self._settings.get(name)
+        if settings is None:
+            with self._lock:
+                settings = self._settings.get(name)
+                if settings is None:
+                    settings = factory()
+                    self._settings[name] = settings
+        return settings
+
+
+def load_yaml(config_file: Path, strict: bool = False) -> Any:
+    """
+    Parse a YAML file, logging errors and returning an empty config for invalid files.
+
+    Args:
+        config_file: Path of the YAML file
+        strict: Raise parse errors instead of returning an empty config
+    """
+    try:
+        with open(config_file, 'r', encoding='utf-8') as f:
+            return yaml.safe_load(f)
+    except Exception as e:
+        if strict:
+            raise
+        logger.error(f"Error loading {config_file}: {str(e)}")
+        return {}
+
+
+def parse_yaml(text: str, config_file: Path) -> Any:
+    """Parse the text of a YAML file, logging errors and returning an empty config for invalid files."""
+    try:
+        return yaml.safe_load(text)
+    except Exception as e:
+        logger.error(f"Error loading {config_file}: {str(e)}")
+        return {}
+
 
 class ConfigManager:
     """
     A class to manage YAML configuration files with support for reloading
     and hierarchical access.
+
+    Files are parsed lazily: a config file is only read the first time one of its
+    values is requested, so a scraper only pays for the sections it uses.
+
+    The configuration is held in immutable, versioned snapshots. Changes (reload,
+    load_specific_config) publish a new snapshot atomically, and a job can pin the
+    snapshot it started with (see pin) so its reads stay consistent while the
+    configuration changes.
     """
 
     def __init__(self, config_dir: str = None):
         """
         Initialize the ConfigManager.
-        
+
         Args:
             config_dir: Directory containing configuration files (default: app/config)
         """
@@ -25,100 +248,181 @@ class ConfigManager:
         else:
             # Default to app/config relative to the current file
             self.config_dir = Path(__file__).parent.parent / "config"
-        
-        self.configs = {}
-        self._load_configs()
-    
-    def _load_configs(self) -> None:
-        """Load all YAML files from the config directory."""
-        if not self.config_dir.exists():
-            logger.warning(f"Warning: Config directory not found at {self.config_dir}")
-            return
-        
-        for config_file in self.config_dir.glob("*.yaml"):
-            config_name = config_file.stem
-            try:
-                with open(config_file, 'r') as f:
-                    self.configs[config_name] = yaml.safe_load(f)
-                logger.info(f"Loaded configuration from {config_file}")
-            except Exception as e:
-                logger.error(f"Error loading {config_file}: {str(e)}")
-                self.configs[config_name] = {}
-    
+
+        self._lock = threading.Lock()
+        self._snapshot = ConfigSnapshot(1, self.config_dir)
+        # (config names, callback) pairs notified when a new snapshot changes one of the configs
+        self._subscribers: List[Tuple[Optional[frozenset], Callable]] = []
+        # Snapshot pinned by the current job (context variables are inherited by the asyncio tasks it creates)
+        self._pinned: ContextVar[Optional[ConfigSnapshot]] = ContextVar(f"pinned_config_{id(self)}", default=None)
+
+    @property
+    def configs(self) -> Dict[str, Any]:
+        """All configurations, parsing every YAML file of the config directory not loaded yet."""
+        snapshot = self.snapshot()
+        snapshot.load_all()
+        return snapshot.configs
+
+    @property
+    def version(self) -> int:
+        """Version of the snapshot used by the current job."""
+        return self.snapshot().version
+
+    def snapshot(self) -> ConfigSnapshot:
+        """The snapshot pinned by the current job, or the latest snapshot."""
+        return self._pinned.get() or self._snapshot
+
+    @contextmanager
+    def pin(self, snapshot: Optional[ConfigSnapshot] = None) -> Iterator[ConfigSnapshot]:
+        """
+        Pin a snapshot (default: the latest) for the current job. All reads inside the
+        block, including those of asyncio tasks started from it, use this snapshot.
+
+        Args:
+            snapshot: Snapshot to pin (default: the latest published snapshot)
+        """
+        snapshot = snapshot or self._snapshot
+        snapshot.capture()
+        token = self._pinned.set(snapshot)
+        try:
+            yield snapshot
+        finally:
+            self._pinned.reset(token)
+
+    def latest(self) -> ConfigSnapshot:
+        """The latest published snapshot, ignoring the snapshot pinned by the current job."""
+        return self._snapshot
+
+    def subscribe(self, config_names: Optional[Iterable[str]], callback: Callable[[ConfigSnapshot, ConfigSnapshot], None]) -> None:
+        """
+        Call `callback(old_snapshot, new_snapshot)` when a published snapshot changes one
+        of the given configs (e.g. to recycle the clients built from them).
+
+        Args:
+            config_names: Config names to watch (None for every change)
+            callback: Function called with the previous and the new snapshot
+        """
+        self._subscribers.append((frozenset(config_names) if config_names is not None else None, callback))
+
+    def _publish(
+        self,
+        configs: Dict[str, Any],
+        sources: Dict[str, Path],
+        changed: Iterable[str],
+        texts: Optional[Dict[str, Tuple[Path, str]]] = None,
+    ) -> ConfigSnapshot:
+        """
+        Publish a new snapshot with the given (already loaded) configurations and notify the
+        subscribers. The snapshot is captured (see ConfigSnapshot.capture) before it is published.
+        """
+        with self._lock:
+            previous = self._snapshot
+            snapshot = ConfigSnapshot(previous.version + 1, self.config_dir, configs, sources, texts)
+            snapshot.capture()
+            self._snapshot = snapshot
+        logger.debug(f"Published configuration snapshot version {snapshot.version}")
+
+        changed = set(changed)
+        for config_names, callback in list(self._subscribers):
+            if config_names is None or config_names & changed:
+                try:
+                    callback(previous, snapshot)
+                except Exception as e:
+                    logger.error(f"Error notifying configuration subscriber {callback}: {str(e)}")
+        return snapshot
+
     def reload(self) -> None:
-        """Reload all configuration files."""
-        self.configs = {}
-        self._load_configs()
-        
+        """
+        Reload all configuration files (parsed again on next access) by publishing a new
+        snapshot. Jobs that pinned a snapshot keep using it.
+        """
+        self._publish({}, {}, self._snapshot._configs.keys())
+
+    def update_configs(self, configs: Dict[str, Any], sources: Optional[Dict[str, Path]] = None) -> ConfigSnapshot:
+        """
+        Publish a new snapshot replacing some configurations, keeping the others loaded.
+
+        Args:
+            configs: Parsed configurations by config name
+            sources: Files the configurations were parsed from
+
+        Returns:
+            The published snapshot
+        """
+        previous = self._snapshot
+        # the files of the previous snapshot not parsed yet are kept as they were captured
+        texts = {name: text for name, text in previous.texts.items() if name not in configs}
+        with self._lock:
+            merged = {**previous._configs, **{name: freeze(config) for name, config in configs.items()}}
+            merged_sources = {**previous._sources, **(sources or {})}
+        return self._publish(merged, merged_sources, configs.keys(), texts)
+
+    def cached(self, name: str, factory: Callable[[], Any]) -> Any:
+        """
+        Get a settings object built from the configuration, building it on first use.
+        The object is cached on the snapshot, so it is rebuilt after the configuration
+        is reloaded or changed.
+
+        Args:
+            name: Name of the settings object
+            factory: Function building the settings object from this config manager
+
+        Returns:
+            The cached settings object
+        """
+        return self.snapshot().cached(name, factory)
+
     def load_specific_config(self, config_name: str, file_path: str) -> None:
         """
         Load a specific configuration file and assign it to a config key.
-        
+
         Args:
             config_name: The name to use for the configuration in the configs dictionary
             file_path: Path to the configuration file to load
         """
-        try:
-            file_path = Path(file_path)
-            if not file_path.exists():
-                print(f"Warning: Config file not found at {file_path}")
-                return
-                
-            with open(file_path, 'r', encoding='utf-8') as f:
-                self.configs[config_name] = yaml.safe_load(f)
-            logger.info(f"Loaded specific configuration from {file_path} as {config_name}")
-        except Exception as e:
-            logger.error(f"Error loading specific config {file_path}: {str(e)}")
-            self.configs[config_name] = {}
-    
+        file_path = Path(file_path)
+        if not file_path.exists():
+            print(f"Warning: Config file not found at {file_path}")
+            return
+
+        config = load_yaml(file_path)
+        logger.info(f"Loaded specific configuration from {file_path} as {config_name}")
+        self.update_configs({config_name: config}, {config_name: file_path})
+
     def get(self, path: str, default: Any = None) -> Any:
         """
         Get a configuration value using dot notation path.
-        
+
         Args:
             path: Dot-notation path to the config value (e.g., "browser_config.browser.wait_times.timeout")
             default: Default value if the path doesn't exist
-            
+
         Returns:
             The configuration value or the default if not found
         """
-        parts = path.split('.')
-        # First part should be the config file name
-        if parts[0] not in self.configs:
-            return default
-        
-        current = self.configs[parts[0]]
-        
-        # Navigate through the nested structure
-        for part in parts[1:]:
-            if isinstance(current, dict) and part in current:
-                current = current[part]
-            else:
-                return default
-        
-        return current
-    
+        return self.snapshot().get(path, default)
+
     def get_all(self, config_name: str) -> Dict:
         """
         Get an entire configuration section.
-        
+
         Args:
             config_name: Name of the configuration file (without extension)
-            
+
         Returns:
             The entire configuration dictionary or empty dict if not found
         """
-        return self.configs.get(config_name, {})
+        return self.snapshot().get(config_name, {})
 
     def get_secret(self, path: str, env_var: str = None) -> Any:
         """
         Get a secret from the secrets file or environment variable.
         Environment variables take precedence over secrets file.
-        
+
         Args:
             path: Dot-notation path to the secret in secrets.yaml
             env_var: Environment variable name that would override this setting
-            
+
         Returns:
             The secret value or None if not found
         """
@@ -130,4 +434,4 @@ class ConfigManager:
 
 
 # Create a singleton instance
-config_manager = ConfigManager()
\ No newline at end of file
+config_manager = ConfigManager()
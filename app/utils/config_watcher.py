@@ -0,0 +1,190 @@
+"""
+Hot reload of the configuration for long-running processes.
+
+The watcher polls the files the current configuration snapshot was parsed from
+(app/config/*.yaml and the loaded profile in app/config/profiles), re-parses only the
+files that changed, validates the candidate configuration and publishes it as a new
+snapshot. Subscribers of the config manager (e.g. the LLM client registry) are notified
+and recycle only what was built from the changed settings. Jobs that pinned a snapshot
+keep running with their configuration.
+"""
+import logging
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.utils.config_manager import ConfigManager, ConfigSnapshot, config_manager, freeze, load_yaml
+
+logger = logging.getLogger(__name__)
+
+
+def _validate_profile() -> None:
+    """Validate the local/profile config with the same logic as a scraper run."""
+    from app.models.output_format_models import build_output_model
+    from app.models.tasks_models import Task
+    from app.utils.config.local import parse_local_config
+
+    if not config_manager.get("profile"):
+        return
+    parse_local_config(Task.get_available_templates())
+    build_output_model(config_manager.get("profile.content_structure"))
+
+
+def _validate_llm_settings() -> None:
+    from app.utils.config.llm import get_llm_settings
+    get_llm_settings()
+
+
+def _validate_agent_settings() -> None:
+    from app.utils.config.browser_use import get_browser_settings
+    from app.utils.config.browser_use_agent import get_agent_settings
+    get_browser_settings()
+    get_agent_settings()
+
+
+def _validate_mcp_settings() -> None:
+    from app.utils.config.brightdata_mcp import get_mcp_settings
+    get_mcp_settings()
+
+
+# Validators run (with the candidate snapshot pinned) before changed configs are published
+DEFAULT_VALIDATORS: Dict[str, List[Callable[[], None]]] = {
+    "local": [_validate_profile],
+    "profile": [_validate_profile],
+    "llm_config": [_validate_llm_settings],
+    "secrets": [_validate_llm_settings, _validate_mcp_settings],
+    "browser_config": [_validate_agent_settings],
+    "agent_config": [_validate_agent_settings],
+    "mcp_config": [_validate_mcp_settings],
+}
+
+
+class ConfigWatcher:
+    """
+    Polls the loaded config files and publishes validated changes as new snapshots.
+    """
+
+    def __init__(
+        self,
+        manager: ConfigManager = config_manager,
+        interval_seconds: float = 1.0,
+        validators: Optional[Dict[str, List[Callable[[], None]]]] = None,
+    ):
+        """
+        Initialize the watcher.
+
+        Args:
+            manager: Config manager to publish the changes to
+            interval_seconds: Polling interval of the background thread
+            validators: Validation functions by config name (default: DEFAULT_VALIDATORS),
+                run with the candidate snapshot pinned and raising on invalid configs
+        """
+        self.manager = manager
+        self.interval_seconds = interval_seconds
+        self.validators = DEFAULT_VALIDATORS if validators is None else validators
+        # (mtime, size) of every watched file when it was last parsed
+        self._file_states: Dict[Path, Tuple[int, int]] = {}
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start polling in a background thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._record_file_states()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="config-watcher", daemon=True)
+        self._thread.start()
+        logger.info(f"Watching {self.manager.config_dir} for configuration changes")
+
+    def stop(self) -> None:
+        """Stop the background thread."""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def check(self) -> List[str]:
+        """
+        Check the watched files once, publishing a new snapshot if valid changes were found.
+
+        Returns:
+            The names of the configs that were reloaded
+        """
+        snapshot = self.manager.latest()
+        changed = {}
+        for config_name, path in snapshot.sources.items():
+            state = _file_state(path)
+            if path not in self._file_states:
+                # first time seen (loaded lazily since the last check)
+                self._file_states[path] = state
+            elif state != self._file_states[path]:
+                self._file_states[path] = state
+                changed[config_name] = path
+        if not changed:
+            return []
+
+        try:
+            updates = {name: load_yaml(path, strict=True) for name, path in changed.items()}
+            sources = dict(changed)
+            self._switch_profile(snapshot, updates, sources)
+            self._validate(snapshot, updates, sources)
+        except Exception as e:
+            logger.error(f"Invalid configuration change in {', '.join(str(p) for p in changed.values())}, keeping the current configuration: {str(e)}")
+            return []
+
+        new_snapshot = self.manager.update_configs(updates, sources)
+        logger.info(f"Reloaded {', '.join(sorted(updates))} (configuration version {new_snapshot.version})")
+        return sorted(updates)
+
+    def _switch_profile(self, snapshot: ConfigSnapshot, updates: Dict, sources: Dict) -> None:
+        """Load the new profile when the profile referenced in local.yaml changed."""
+        if "local" not in updates or "profile" not in snapshot.sources:
+            return
+        profile_name = (updates["local"] or {}).get("profile")
+        if not profile_name or profile_name == snapshot.get("local.profile"):
+            return
+        profile_path = Path(self.manager.config_dir) / "profiles" / f"{profile_name}.yaml"
+        if not profile_path.exists():
+            raise FileNotFoundError(f"Profile not found: {profile_path}")
+        updates["profile"] = load_yaml(profile_path, strict=True)
+        sources["profile"] = profile_path
+        self._file_states[profile_path] = _file_state(profile_path)
+
+    def _validate(self, snapshot: ConfigSnapshot, updates: Dict, sources: Dict) -> None:
+        """Run the validators of the changed configs against the candidate snapshot."""
+        candidate = ConfigSnapshot(
+            snapshot.version,
+            snapshot.config_dir,
+            {**snapshot.configs, **{name: freeze(config) for name, config in updates.items()}},
+            {**snapshot.sources, **sources},
+            {name: text for name, text in snapshot.texts.items() if name not in updates},
+        )
+        validators = []
+        for config_name in updates:
+            if updates[config_name] is not None and not isinstance(updates[config_name], dict):
+                raise ValueError(f"{config_name} must contain a mapping")
+            validators += [v for v in self.validators.get(config_name, []) if v not in validators]
+        with self.manager.pin(candidate):
+            for validator in validators:
+                validator()
+
+    def _record_file_states(self) -> None:
+        for path in self.manager.latest().sources.values():
+            self._file_states[path] = _file_state(path)
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.interval_seconds):
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"Error checking for configuration changes: {str(e)}")
+
+
+def _file_state(path: Path) -> Tuple[int, int]:
+    """Modification time and size of a file ((0, 0) if it was removed)."""
+    try:
+        stat = Path(path).stat()
+    except FileNotFoundError:
+        return (0, 0)
+    return (stat.st_mtime_ns, stat.st_size)
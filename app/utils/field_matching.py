@@ -0,0 +1,55 @@
+"""
+Fuzzy matching of source names (JSON keys, table headers) to content_structure field names.
+"""
+import re
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, Tuple
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase a name and drop everything but letters and digits ("Release Year" -> "releaseyear")."""
+    return re.sub(r"[^a-z0-9]", "", str(name).lower())
+
+
+def name_similarity(a: str, b: str) -> float:
+    """
+    Similarity of two names between 0 and 1: 1 for equal normalized names, 0.9 when one
+    contains the other (e.g. "year" and "release_year"), the difflib ratio otherwise.
+    """
+    a, b = normalize_name(a), normalize_name(b)
+    if not a or not b:
+        return 0.0
+    if a == b:
+        return 1.0
+    if min(len(a), len(b)) >= 3 and (a in b or b in a):
+        return 0.9
+    return SequenceMatcher(None, a, b).ratio()
+
+
+def match_fields(names: Iterable[str], fields: Iterable[str], cutoff: float = 0.8) -> Dict[str, Tuple[str, float]]:
+    """
+    Match source names to fields, each name used at most once (best pairs first).
+
+    Args:
+        names: The source names
+        fields: The content_structure field names
+        cutoff: Minimum similarity of a match
+
+    Returns:
+        The matched source name and similarity by field name
+    """
+    names = list(dict.fromkeys(names))
+    pairs = sorted(
+        ((name_similarity(name, field), field, name) for field in fields for name in names),
+        key=lambda pair: -pair[0],
+    )
+    matches: Dict[str, Tuple[str, float]] = {}
+    used = set()
+    for score, field, name in pairs:
+        if score < cutoff:
+            break
+        if field in matches or name in used:
+            continue
+        matches[field] = (name, score)
+        used.add(name)
+    return matches
@@ -0,0 +1,325 @@
+"""
+Disk-backed response cache for the LLMs returned by get_llm_instance.
+
+Plugs into langchain's chat model cache hook (`cache=` on the model), so every call made
+by browser-use, the MCP agent or the PDF QA chain is looked up before hitting the provider.
+
+Two tiers:
+    - exact: sha256 of the model configuration (llm_string) and the serialized messages
+    - semantic (optional): cosine similarity of prompt embeddings for the same model
+      configuration, reusing the answer of a near-identical prompt above a threshold.
+      The embeddings are kept in memory (numpy) once loaded and updated on insert.
+"""
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+from langchain_core.outputs import Generation
+
+from app.utils.config_manager import config_manager
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# Strip inline base64 payloads (screenshots) before embedding a prompt
+_BASE64_PATTERN = re.compile(r"data:[\w/+.-]+;base64,[A-Za-z0-9+/=]+")
+
+
+class LLMResponseCache(BaseCache):
+    """
+    SQLite-backed LLM response cache with TTL and size based (least recently used) eviction.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        max_size_mb: Optional[float] = None,
+        embeddings: Optional[Any] = None,
+        similarity_threshold: float = 0.97,
+        max_embedding_chars: int = 8000,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            path: Path of the SQLite database file (":memory:" for an in-memory cache)
+            ttl_seconds: Entries older than this are ignored and evicted (None = never expire)
+            max_entries: Maximum number of cached responses (None = unlimited)
+            max_size_mb: Maximum total size of the cached responses (None = unlimited)
+            embeddings: Langchain embeddings model, enables the semantic tier when set
+            similarity_threshold: Minimum cosine similarity for a semantic hit
+            max_embedding_chars: Only the last N characters of a prompt are embedded
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_size_bytes = max_size_mb * 1024 * 1024 if max_size_mb else None
+        self.embeddings = embeddings
+        self.similarity_threshold = similarity_threshold
+        self.max_embedding_chars = max_embedding_chars
+        self.metrics = {"exact_hits": 0, "semantic_hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+        # unit prompt embeddings by llm_string hash and key, loaded from the database on first use
+        self._vectors: Dict[str, Dict[str, Any]] = {}
+        # (keys, matrix) of the vectors of an llm_string hash, rebuilt after they changed
+        self._matrices: Dict[str, Tuple[List[str], Any]] = {}
+
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_responses (
+                key TEXT PRIMARY KEY,
+                llm_string_hash TEXT NOT NULL,
+                response TEXT NOT NULL,
+                embedding TEXT,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_llm_responses_llm ON llm_responses (llm_string_hash)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_llm_responses_accessed ON llm_responses (accessed_at)"
+        )
+        self._conn.commit()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Generation]]:
+        """Look up a cached response, first by exact key then by prompt similarity."""
+        key = _hash(llm_string, prompt)
+        now = time.time()
+        with self._lock:
+            self._delete_expired(now)
+            row = self._conn.execute(
+                "SELECT response FROM llm_responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row:
+                self._touch(key, now)
+                self.metrics["exact_hits"] += 1
+                logger.debug("LLM response cache exact hit")
+                return _deserialize(row[0])
+
+        if self.embeddings is not None:
+            embedding = self._embed(prompt)
+            with self._lock:
+                match = self._most_similar(_hash(llm_string), embedding)
+                if match and match[1] >= self.similarity_threshold:
+                    self._touch(match[0], now)
+                    self.metrics["semantic_hits"] += 1
+                    logger.debug(f"LLM response cache semantic hit (similarity {match[1]:.3f})")
+                    return _deserialize(match[2])
+
+        with self._lock:
+            self.metrics["misses"] += 1
+        return None
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Generation]) -> None:
+        """Store a response and evict entries over the size limits."""
+        embedding = self._embed(prompt) if self.embeddings is not None else None
+        key, llm_string_hash = _hash(llm_string, prompt), _hash(llm_string)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_responses VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    llm_string_hash,
+                    json.dumps([dumps(generation) for generation in return_val]),
+                    json.dumps(embedding) if embedding is not None else None,
+                    now,
+                    now,
+                ),
+            )
+            self.metrics["writes"] += 1
+            if embedding is not None and llm_string_hash in self._vectors:
+                self._vectors[llm_string_hash][key] = _unit_vector(embedding)
+                self._matrices.pop(llm_string_hash, None)
+            self._evict()
+            self._conn.commit()
+
+    def clear(self, **kwargs: Any) -> None:
+        """Remove all cached responses."""
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_responses")
+            self._conn.commit()
+            self._vectors.clear()
+            self._matrices.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss metrics and the current size of the cache."""
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(response)), 0) FROM llm_responses"
+            ).fetchone()
+        lookups = self.metrics["exact_hits"] + self.metrics["semantic_hits"] + self.metrics["misses"]
+        hits = self.metrics["exact_hits"] + self.metrics["semantic_hits"]
+        return {
+            **self.metrics,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "size_bytes": size,
+        }
+
+    def _touch(self, key: str, now: float) -> None:
+        self._conn.execute("UPDATE llm_responses SET accessed_at = ? WHERE key = ?", (now, key))
+        self._conn.commit()
+
+    def _delete_expired(self, now: float) -> None:
+        if not self.ttl_seconds:
+            return
+        deleted = self._conn.execute(
+            "DELETE FROM llm_responses WHERE created_at < ?", (now - self.ttl_seconds,)
+        ).rowcount
+        if deleted:
+            self.metrics["evictions"] += deleted
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """Evict the least recently used entries until the cache is within its limits."""
+        self._delete_expired(time.time())
+        while True:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(response)), 0) FROM llm_responses"
+            ).fetchone()
+            over_entries = self.max_entries is not None and entries > self.max_entries
+            over_size = self.max_size_bytes is not None and size > self.max_size_bytes
+            if not entries or not (over_entries or over_size):
+                return
+            # drop the excess entries, or ~10% of the entries at a time when over the size limit
+            batch = max(1, entries - self.max_entries if over_entries else entries // 10)
+            self._conn.execute(
+                "DELETE FROM llm_responses WHERE key IN "
+                "(SELECT key FROM llm_responses ORDER BY accessed_at ASC LIMIT ?)",
+                (batch,),
+            )
+            self.metrics["evictions"] += batch
+
+    def _embed(self, prompt: str) -> List[float]:
+        text = _BASE64_PATTERN.sub("", prompt)[-self.max_embedding_chars:]
+        return self.embeddings.embed_query(text)
+
+    def _most_similar(self, llm_string_hash: str, embedding: List[float]):
+        """Find the cached response with the most similar prompt for the same model configuration."""
+        import numpy as np
+
+        keys, matrix = self._matrix(llm_string_hash)
+        if not keys:
+            return None
+        similarities = matrix @ _unit_vector(embedding)
+        for index in np.argsort(-similarities):
+            key = keys[index]
+            row = self._conn.execute("SELECT response FROM llm_responses WHERE key = ?", (key,)).fetchone()
+            if row:
+                return key, float(similarities[index]), row[0]
+            # evicted or expired since it was loaded
+            self._vectors[llm_string_hash].pop(key, None)
+            self._matrices.pop(llm_string_hash, None)
+        return None
+
+    def _matrix(self, llm_string_hash: str) -> Tuple[List[str], Any]:
+        """Keys and stacked unit embeddings of the cached prompts of a model configuration."""
+        import numpy as np
+
+        if llm_string_hash not in self._vectors:
+            rows = self._conn.execute(
+                "SELECT key, embedding FROM llm_responses WHERE llm_string_hash = ? AND embedding IS NOT NULL",
+                (llm_string_hash,),
+            )
+            self._vectors[llm_string_hash] = {key: _unit_vector(json.loads(stored)) for key, stored in rows}
+        if llm_string_hash not in self._matrices:
+            vectors = self._vectors[llm_string_hash]
+            keys = list(vectors)
+            self._matrices[llm_string_hash] = (keys, np.stack([vectors[key] for key in keys]) if keys else None)
+        return self._matrices[llm_string_hash]
+
+
+def _hash(*parts: str) -> str:
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def _deserialize(response: str) -> List[Generation]:
+    return [loads(generation) for generation in json.loads(response)]
+
+
+def _unit_vector(embedding: List[float]):
+    import numpy as np
+
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+_response_cache: Optional[LLMResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def is_response_cache_enabled() -> bool:
+    """
+    Whether the response cache is enabled for the current profile
+    (llm_config.response_cache.profiles overrides llm_config.response_cache.enabled).
+    """
+    cache_config = config_manager.get("llm_config.response_cache", {}) or {}
+    profile_overrides = cache_config.get("profiles") or {}
+    profile_name = config_manager.get("profile.name")
+    return bool(profile_overrides.get(profile_name, cache_config.get("enabled", False)))
+
+
+def get_response_cache() -> Optional[LLMResponseCache]:
+    """
+    Get the shared response cache, or None if it is disabled for the current profile.
+    """
+    global _response_cache
+    if not is_response_cache_enabled():
+        return None
+
+    with _response_cache_lock:
+        if _response_cache is None:
+            cache_config = config_manager.get("llm_config.response_cache", {}) or {}
+            semantic_config = cache_config.get("semantic") or {}
+
+            path = Path(cache_config.get("path") or ".cache/llm_responses.sqlite")
+            if not path.is_absolute():
+                path = PROJECT_ROOT / path
+
+            embeddings = None
+            if semantic_config.get("enabled", False):
+                from langchain_openai import OpenAIEmbeddings
+                embeddings = OpenAIEmbeddings(model=semantic_config.get("embedding_model", "text-embedding-3-small"))
+
+            _response_cache = LLMResponseCache(
+                path=str(path),
+                ttl_seconds=cache_config.get("ttl_seconds"),
+                max_entries=cache_config.get("max_entries"),
+                max_size_mb=cache_config.get("max_size_mb"),
+                embeddings=embeddings,
+                similarity_threshold=semantic_config.get("similarity_threshold", 0.97),
+            )
+            logger.info(f"LLM response cache enabled at {path}")
+    return _response_cache
+
+
+def reset_response_cache() -> None:
+    """Drop the shared response cache (e.g. after its configuration changed), it is recreated on next use."""
+    global _response_cache
+    with _response_cache_lock:
+        _response_cache = None
+
+
+def log_response_cache_stats() -> None:
+    """Log the hit/miss metrics of the response cache if it was used in this run."""
+    if _response_cache is not None:
+        logger.info(f"LLM response cache stats: {_response_cache.stats()}")
@@ -0,0 +1,163 @@
+"""
+Local stand-in for the Bright Data MCP server.
+
+Implements the same tool names as `@brightdata/mcp` but serves pages from a fixture
+directory instead of the Bright Data network, with configurable artificial latency,
+error rate and payload size. Used to benchmark the bright_data_mcp scraper without
+network access. Started over stdio by `define_mcp_server_params` when
+`mcp_config.server` is set to "local":
+
+    python -m app.utils.mcp_tools.local_mcp_server
+
+Settings are read from environment variables (set from `mcp_config.local_mcp`):
+    LOCAL_MCP_FIXTURE_DIR: Directory with <slug>.md / <slug>.html page fixtures
+    LOCAL_MCP_LATENCY_MS: Mean artificial latency per tool call in milliseconds
+    LOCAL_MCP_LATENCY_JITTER_MS: Uniform jitter added to/subtracted from the latency
+    LOCAL_MCP_ERROR_RATE: Probability (0-1) that a tool call fails
+    LOCAL_MCP_PAYLOAD_SIZE: Pad/truncate every page to this many characters (0 = as-is)
+    LOCAL_MCP_SEED: Seed for the latency/error random generator (reproducible runs)
+"""
+import asyncio
+import os
+import random
+import re
+from pathlib import Path
+
+from mcp.server.fastmcp import FastMCP
+
+FIXTURE_DIR = Path(os.getenv("LOCAL_MCP_FIXTURE_DIR", "data/mcp_fixtures"))
+LATENCY_MS = float(os.getenv("LOCAL_MCP_LATENCY_MS", 0))
+LATENCY_JITTER_MS = float(os.getenv("LOCAL_MCP_LATENCY_JITTER_MS", 0))
+ERROR_RATE = float(os.getenv("LOCAL_MCP_ERROR_RATE", 0))
+PAYLOAD_SIZE = int(os.getenv("LOCAL_MCP_PAYLOAD_SIZE", 0))
+SEED = os.getenv("LOCAL_MCP_SEED")
+
+_random = random.Random(int(SEED) if SEED else None)
+_stats = {"calls": 0, "errors": 0}
+_browser = {"url": None}
+
+mcp = FastMCP("local_mcp")
+
+
+def fixture_slug(url: str) -> str:
+    """
+    Convert a URL into the fixture file name (without extension).
+    e.g "https://en.wikipedia.org/wiki/Apple" -> "en-wikipedia-org-wiki-apple"
+    """
+    short_url = re.sub(r"^https?://(?:www\.)?|/$", "", url.strip())
+    return re.sub(r"[^a-zA-Z0-9]+", "-", short_url).strip("-").lower()
+
+
+def _load_fixture(url: str, extension: str) -> str:
+    """
+    Load the fixture for a URL, falling back to the other format and then to `default`.
+    """
+    other = ".html" if extension == ".md" else ".md"
+    for name in (fixture_slug(url), "default"):
+        for ext in (extension, other):
+            path = FIXTURE_DIR / f"{name}{ext}"
+            if path.exists():
+                content = path.read_text(encoding="utf-8")
+                if ext == ".html" and extension == ".md":
+                    # crude html -> text conversion, good enough for load testing
+                    content = re.sub(r"<[^>]+>", " ", content)
+                return _resize(content)
+    raise ValueError(f"No fixture found for {url} in {FIXTURE_DIR}")
+
+
+def _resize(content: str) -> str:
+    """Pad or truncate the content to the configured payload size."""
+    if PAYLOAD_SIZE <= 0 or not content:
+        return content
+    repeats = PAYLOAD_SIZE // len(content) + 1
+    return (content * repeats)[:PAYLOAD_SIZE]
+
+
+async def _simulate_network() -> None:
+    """Apply the artificial latency and error rate to a tool call."""
+    _stats["calls"] += 1
+    delay = LATENCY_MS + _random.uniform(-LATENCY_JITTER_MS, LATENCY_JITTER_MS)
+    if delay > 0:
+        await asyncio.sleep(delay / 1000)
+    if _random.random() < ERROR_RATE:
+        _stats["errors"] += 1
+        raise RuntimeError("Simulated upstream error from local MCP server")
+
+
+@mcp.tool()
+async def search_engine(query: str, engine: str = "google") -> str:
+    """
+    Scrape search results from a search engine. Returns the names of the fixture pages
+    mentioning the query, which can be passed as the url to the scrape tools.
+    """
+    await _simulate_network()
+    words = [w.lower() for w in query.split()]
+    results = []
+    for path in sorted(FIXTURE_DIR.glob("*.md")):
+        text = path.read_text(encoding="utf-8").lower()
+        if any(word in text for word in words):
+            results.append(f"- {path.stem}")
+    return f"# {engine} results for: {query}\n\n" + ("\n".join(results) or "No results found")
+
+
+@mcp.tool()
+async def scrape_as_markdown(url: str) -> str:
+    """Scrape a single webpage and return its content as Markdown."""
+    await _simulate_network()
+    return _load_fixture(url, ".md")
+
+
+@mcp.tool()
+async def scrape_as_html(url: str) -> str:
+    """Scrape a single webpage and return its content as HTML."""
+    await _simulate_network()
+    return _load_fixture(url, ".html")
+
+
+@mcp.tool()
+async def session_stats() -> str:
+    """Tell the user about the tool usage during this session."""
+    await _simulate_network()
+    return f"Tool calls: {_stats['calls']}, simulated errors: {_stats['errors']}"
+
+
+@mcp.tool()
+async def scraping_browser_navigate(url: str) -> str:
+    """Navigate a scraping browser session to a new URL."""
+    await _simulate_network()
+    _load_fixture(url, ".html")
+    _browser["url"] = url
+    return f"Successfully navigated to {url}"
+
+
+@mcp.tool()
+async def scraping_browser_get_text() -> str:
+    """Get the text content of the current page."""
+    await _simulate_network()
+    return _load_fixture(_current_url(), ".md")
+
+
+@mcp.tool()
+async def scraping_browser_get_html(full_page: bool = False) -> str:
+    """Get the HTML content of the current page."""
+    await _simulate_network()
+    return _load_fixture(_current_url(), ".html")
+
+
+@mcp.tool()
+async def scraping_browser_links() -> str:
+    """Get all links on the current page."""
+    await _simulate_network()
+    html = _load_fixture(_current_url(), ".html")
+    links = re.findall(r"<a[^>]+href=[\"']([^\"']+)[\"'][^>]*>(.*?)</a>", html, flags=re.S)
+    return "\n".join(f"{re.sub(r'<[^>]+>', '', text).strip()}: {href}" for href, text in links)
+
+
+def _current_url() -> str:
+    if not _browser["url"]:
+        raise ValueError("No page loaded, call scraping_browser_navigate first")
+    return _browser["url"]
+
+
+if __name__ == "__main__":
+    mcp.run(transport="stdio")
@@ -0,0 +1,204 @@
+"""
+Per-process cache of page snapshots.
+
+Snapshots of a page (HTML, markdown returned by the MCP scraping tools, the path of the
+saved PDF, ...) are stored by normalized URL and validator: the ETag/Last-Modified of the
+response or a hash of the page content. Jobs of the same process visiting the same page
+(e.g. the page workers of a paginated table or overlapping profiles of a batch) reuse the
+snapshot instead of fetching, converting or printing the page again. Entries expire after
+`ttl_seconds` and the least recently used entries are evicted above `max_entries`.
+"""
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Mapping, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from app.utils.config_manager import config_manager
+
+logger = logging.getLogger(__name__)
+
+# Query parameters that do not change the page content
+IGNORED_QUERY_PARAMS = ("utm_", "fbclid", "gclid", "mc_cid", "mc_eid")
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalize a URL for the cache key: lowercase scheme and host, default ports, trailing
+    slash and fragment removed, tracking parameters dropped and the query sorted.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and not ((scheme == "http" and parts.port == 80) or (scheme == "https" and parts.port == 443)):
+        host = f"{host}:{parts.port}"
+    path = parts.path.rstrip("/") or "/"
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith(IGNORED_QUERY_PARAMS)
+    )
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+def content_validator(headers: Optional[Mapping[str, str]] = None, content: Optional[str] = None) -> Optional[str]:
+    """
+    Validator of a page version: the ETag or Last-Modified response header, or a hash of
+    the content (None if neither is available).
+    """
+    headers = {key.lower(): value for key, value in (headers or {}).items()}
+    if headers.get("etag"):
+        return f"etag:{headers['etag']}"
+    if headers.get("last-modified"):
+        return f"last-modified:{headers['last-modified']}"
+    if content is not None:
+        return f"sha256:{hashlib.sha256(content.encode('utf-8')).hexdigest()}"
+    return None
+
+
+@dataclass
+class PageSnapshot:
+    """Cached data of a page version"""
+    url: str
+    validator: Optional[str]
+    created_at: float = field(default_factory=time.monotonic)
+    # e.g. html, markdown, pdf_path, mcp:<tool name>
+    data: Dict[str, Any] = field(default_factory=dict)
+
+
+class PageSnapshotCache:
+    """
+    TTL + LRU cache of page snapshots keyed by normalized URL and validator.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 600):
+        """
+        Args:
+            max_entries: Maximum number of snapshots (least recently used evicted first)
+            ttl_seconds: Time after which a snapshot expires
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, Optional[str]], PageSnapshot]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, url: str, validator: Optional[str] = None, key: Optional[str] = None) -> Optional[PageSnapshot]:
+        """
+        Get a fresh snapshot of a page.
+
+        Args:
+            url: The page URL
+            validator: The page version (None for the latest snapshot of the URL)
+            key: Only return snapshots holding this data key
+
+        Returns:
+            The snapshot, or None on a miss
+        """
+        normalized = normalize_url(url)
+        now = time.monotonic()
+        with self._lock:
+            if validator is not None:
+                candidates = [(normalized, validator)]
+            else:
+                # newest snapshot first
+                candidates = sorted(
+                    (entry_key for entry_key in self._entries if entry_key[0] == normalized),
+                    key=lambda entry_key: -self._entries[entry_key].created_at,
+                )
+            for entry_key in candidates:
+                snapshot = self._entries.get(entry_key)
+                if snapshot is None:
+                    continue
+                if now - snapshot.created_at > self.ttl_seconds:
+                    del self._entries[entry_key]
+                    continue
+                if key is not None and key not in snapshot.data:
+                    continue
+                self._entries.move_to_end(entry_key)
+                self.hits += 1
+                return snapshot
+            self.misses += 1
+            return None
+
+    def put(self, url: str, validator: Optional[str] = None, **data: Any) -> PageSnapshot:
+        """
+        Store data of a page version, adding it to the snapshot of that version if there is one.
+
+        Returns:
+            The snapshot
+        """
+        entry_key = (normalize_url(url), validator)
+        with self._lock:
+            snapshot = self._entries.get(entry_key)
+            if snapshot is None or time.monotonic() - snapshot.created_at > self.ttl_seconds:
+                snapshot = PageSnapshot(url=url, validator=validator)
+                self._entries[entry_key] = snapshot
+            snapshot.data.update(data)
+            self._entries.move_to_end(entry_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return snapshot
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_page_cache: Optional[PageSnapshotCache] = None
+_page_cache_lock = threading.Lock()
+
+
+def get_page_cache() -> Optional[PageSnapshotCache]:
+    """Get the process page cache configured in local.yaml (None if disabled)."""
+    global _page_cache
+    if not config_manager.get("local.page_cache.enabled", True):
+        return None
+    with _page_cache_lock:
+        if _page_cache is None:
+            _page_cache = PageSnapshotCache(
+                max_entries=int(config_manager.get("local.page_cache.max_entries", 256)),
+                ttl_seconds=float(config_manager.get("local.page_cache.ttl_seconds", 600)),
+            )
+    return _page_cache
+
+
+def cache_page_tools(tools, cache: PageSnapshotCache, tool_names=("scrape_as_markdown", "scrape_as_html")):
+    """
+    Serve the results of the MCP page scraping tools (called with a url) from the page cache.
+
+    Args:
+        tools: The LangChain tools loaded from the MCP session
+        cache: The page cache
+        tool_names: Names of the tools returning the content of a page
+
+    Returns:
+        The tools
+    """
+    for tool in tools:
+        if tool.name not in tool_names or getattr(tool, "coroutine", None) is None:
+            continue
+
+        def wrap(coroutine, data_key):
+            async def cached_coroutine(*args, **kwargs):
+                url = kwargs.get("url")
+                if not url:
+                    return await coroutine(*args, **kwargs)
+                snapshot = cache.get(url, key=data_key)
+                if snapshot is not None:
+                    logger.info(f"Page cache hit for {data_key} {url}")
+                    return snapshot.data[data_key]
+                result = await coroutine(*args, **kwargs)
+                cache.put(url, None, **{data_key: result})
+                return result
+            return cached_coroutine
+
+        tool.coroutine = wrap(tool.coroutine, f"mcp:{tool.name}")
+    return tools
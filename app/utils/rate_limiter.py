@@ -0,0 +1,333 @@
+"""
+Process-wide rate limiting for the LLMs returned by get_llm_instance.
+
+Every provider+model pair gets one shared governor with two token buckets, one for
+requests per minute and one for tokens per minute. Each model instance holds a
+`PriorityRateLimiter` (langchain's `rate_limiter=` hook) that waits for the governor
+before every API request, and a `RateLimitCallbackHandler` that debits the tokens
+actually used and backs off when the provider answers with a 429.
+
+Waiting requests are admitted in priority order (planner before executor before PDF QA).
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.rate_limiters import BaseRateLimiter
+
+from app.utils.config_manager import config_manager
+
+logger = logging.getLogger(__name__)
+
+# Lower value is admitted first when requests are queued
+PRIORITIES = {
+    "planner": 0,
+    "executor": 1,
+    "pdf_qa": 2,
+}
+
+
+class LLMRateGovernor:
+    """
+    Token-bucket governor for the requests and tokens per minute of one provider+model.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        max_burst: float = 10,
+        check_every_n_seconds: float = 0.05,
+        max_backoff_seconds: float = 60,
+    ):
+        """
+        Initialize the governor.
+
+        Args:
+            name: Name used in logs (provider/model)
+            requests_per_minute: Request budget (None = unlimited)
+            tokens_per_minute: Token budget (None = unlimited)
+            max_burst: Maximum number of requests admitted at once after an idle period
+            check_every_n_seconds: Polling interval of waiting requests
+            max_backoff_seconds: Upper bound of the exponential backoff after a 429
+        """
+        self.name = name
+        self.requests_per_second = requests_per_minute / 60 if requests_per_minute else None
+        self.tokens_per_second = tokens_per_minute / 60 if tokens_per_minute else None
+        self.max_burst = max_burst
+        self.check_every_n_seconds = check_every_n_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+
+        self._lock = threading.Lock()
+        self._request_bucket = float(max_burst)
+        self._token_bucket = float(tokens_per_minute) if tokens_per_minute else 0.0
+        self._last_refill = time.monotonic()
+        self._blocked_until = 0.0
+        self._consecutive_rate_limits = 0
+        self._queue = []
+        self._sequence = itertools.count()
+        self._metrics = {
+            "requests": 0,
+            "rate_limited": 0,
+            "tokens": 0,
+            "total_wait_seconds": 0.0,
+            "max_wait_seconds": 0.0,
+            "wait_by_priority": {},
+        }
+
+    def acquire(self, priority: int = PRIORITIES["executor"], blocking: bool = True) -> bool:
+        """Wait until a request may be sent."""
+        ticket = self._enqueue(priority)
+        try:
+            while True:
+                if self._try_admit(ticket):
+                    return True
+                if not blocking:
+                    self._dequeue(ticket)
+                    return False
+                time.sleep(self.check_every_n_seconds)
+        except BaseException:
+            # a ticket left in the queue would block every later request
+            self._dequeue(ticket)
+            raise
+
+    async def aacquire(self, priority: int = PRIORITIES["executor"], blocking: bool = True) -> bool:
+        """Wait (asynchronously) until a request may be sent."""
+        ticket = self._enqueue(priority)
+        try:
+            while True:
+                if self._try_admit(ticket):
+                    return True
+                if not blocking:
+                    self._dequeue(ticket)
+                    return False
+                await asyncio.sleep(self.check_every_n_seconds)
+        except asyncio.CancelledError:
+            self._dequeue(ticket)
+            raise
+
+    def consume_tokens(self, tokens: int) -> None:
+        """Debit the tokens used by a finished request (the bucket may go negative)."""
+        with self._lock:
+            self._metrics["tokens"] += tokens
+            if self.tokens_per_second:
+                self._token_bucket -= tokens
+            self._consecutive_rate_limits = 0
+
+    def report_rate_limited(self, retry_after: Optional[float] = None) -> None:
+        """
+        Pause all requests after a rate limit response, for `retry_after` seconds if the
+        provider sent it, otherwise with exponential backoff.
+        """
+        with self._lock:
+            self._metrics["rate_limited"] += 1
+            self._consecutive_rate_limits += 1
+            if retry_after is None:
+                retry_after = min(self.max_backoff_seconds, 2 ** (self._consecutive_rate_limits - 1))
+            self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+        logger.warning(f"Rate limited by {self.name}, pausing requests for {retry_after:.1f}s")
+
+    def metrics(self) -> Dict[str, Any]:
+        """Queueing delay and usage metrics."""
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics["wait_by_priority"] = dict(self._metrics["wait_by_priority"])
+            metrics["queued"] = len(self._queue)
+        metrics["mean_wait_seconds"] = (
+            metrics["total_wait_seconds"] / metrics["requests"] if metrics["requests"] else 0.0
+        )
+        return metrics
+
+    def _enqueue(self, priority: int) -> Tuple[int, int, float]:
+        ticket = (priority, next(self._sequence), time.monotonic())
+        with self._lock:
+            heapq.heappush(self._queue, ticket)
+        return ticket
+
+    def _dequeue(self, ticket) -> None:
+        with self._lock:
+            if ticket in self._queue:
+                self._queue.remove(ticket)
+                heapq.heapify(self._queue)
+
+    def _try_admit(self, ticket) -> bool:
+        """Admit the ticket if it is first in line and the budgets allow a request."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if self._queue[0] != ticket or now < self._blocked_until:
+                return False
+            if self.requests_per_second and self._request_bucket < 1:
+                return False
+            if self.tokens_per_second and self._token_bucket <= 0:
+                return False
+
+            heapq.heappop(self._queue)
+            if self.requests_per_second:
+                self._request_bucket -= 1
+
+            wait = now - ticket[2]
+            self._metrics["requests"] += 1
+            self._metrics["total_wait_seconds"] += wait
+            self._metrics["max_wait_seconds"] = max(self._metrics["max_wait_seconds"], wait)
+            by_priority = self._metrics["wait_by_priority"]
+            by_priority[ticket[0]] = by_priority.get(ticket[0], 0.0) + wait
+            return True
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        if self.requests_per_second:
+            self._request_bucket = min(self.max_burst, self._request_bucket + elapsed * self.requests_per_second)
+        if self.tokens_per_second:
+            self._token_bucket = min(self.tokens_per_second * 60, self._token_bucket + elapsed * self.tokens_per_second)
+
+
+class PriorityRateLimiter(BaseRateLimiter):
+    """
+    Langchain rate limiter that waits for a shared governor with a fixed priority.
+    """
+
+    def __init__(self, governor: LLMRateGovernor, priority: int):
+        self.governor = governor
+        self.priority = priority
+
+    def acquire(self, *, blocking: bool = True) -> bool:
+        return self.governor.acquire(self.priority, blocking=blocking)
+
+    async def aacquire(self, *, blocking: bool = True) -> bool:
+        return await self.governor.aacquire(self.priority, blocking=blocking)
+
+
+class RateLimitCallbackHandler(BaseCallbackHandler):
+    """
+    Feed the token usage and rate limit errors of finished requests back to the governor.
+    """
+
+    def __init__(self, governor: LLMRateGovernor):
+        self.governor = governor
+
+    def on_llm_end(self, response, **kwargs: Any) -> None:
+        self.governor.consume_tokens(_total_tokens(response))
+
+    def on_llm_error(self, error: BaseException, **kwargs: Any) -> None:
+        response = getattr(error, "response", None)
+        status_code = getattr(error, "status_code", None) or getattr(response, "status_code", None)
+        if status_code == 429:
+            headers = getattr(response, "headers", None) or {}
+            self.governor.report_rate_limited(retry_after_from_headers(headers))
+
+
+def _total_tokens(response) -> int:
+    """Get the total tokens used from a langchain LLMResult."""
+    token_usage = (response.llm_output or {}).get("token_usage") or {}
+    if token_usage.get("total_tokens"):
+        return int(token_usage["total_tokens"])
+
+    total = 0
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+            total += usage.get("total_tokens", 0)
+    return total
+
+
+def retry_after_from_headers(headers) -> Optional[float]:
+    """
+    Get the number of seconds to wait from the rate limit headers of a 429 response
+    (retry-after, openai x-ratelimit-reset-* and anthropic anthropic-ratelimit-*-reset).
+    """
+    headers = {k.lower(): v for k, v in dict(headers).items()}
+    if "retry-after-ms" in headers:
+        return float(headers["retry-after-ms"]) / 1000
+    if "retry-after" in headers:
+        try:
+            return float(headers["retry-after"])
+        except ValueError:
+            pass
+
+    waits = []
+    for header in ("x-ratelimit-reset-requests", "x-ratelimit-reset-tokens"):
+        if header in headers:
+            waits.append(_parse_duration(headers[header]))
+    for header in ("anthropic-ratelimit-requests-reset", "anthropic-ratelimit-tokens-reset"):
+        if header in headers:
+            waits.append(_seconds_until(headers[header]))
+    waits = [w for w in waits if w is not None]
+    return max(waits) if waits else None
+
+
+def _parse_duration(value: str) -> Optional[float]:
+    """Parse durations like "1s", "6m0s", "20ms" or "1h2m3.5s" into seconds."""
+    parts = re.findall(r"([\d.]+)(ms|h|m|s)", value)
+    if not parts:
+        return None
+    units = {"h": 3600, "m": 60, "s": 1, "ms": 0.001}
+    return sum(float(number) * units[unit] for number, unit in parts)
+
+
+def _seconds_until(timestamp: str) -> Optional[float]:
+    """Seconds until an RFC 3339 timestamp."""
+    try:
+        reset = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return max(0.0, (reset - datetime.now(timezone.utc)).total_seconds())
+
+
+_governors: Dict[str, LLMRateGovernor] = {}
+_limiters: Dict[Tuple[str, int], Tuple[PriorityRateLimiter, RateLimitCallbackHandler]] = {}
+_registry_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str, model: str, priority: str = "executor") -> Optional[Tuple[PriorityRateLimiter, RateLimitCallbackHandler]]:
+    """
+    Get the rate limiter and callback handler for a provider/model and priority class.
+    All models for the same provider/model share one governor.
+
+    Returns:
+        (rate_limiter, callback_handler), or None if rate limiting is disabled
+    """
+    rate_config = config_manager.get("llm_config.rate_limits", {}) or {}
+    if not rate_config.get("enabled", False):
+        return None
+
+    name = f"{provider}/{model}"
+    with _registry_lock:
+        governor = _governors.get(name)
+        if governor is None:
+            limits = {**(rate_config.get("default") or {}), **((rate_config.get("overrides") or {}).get(name) or {})}
+            governor = LLMRateGovernor(
+                name=name,
+                requests_per_minute=limits.get("requests_per_minute"),
+                tokens_per_minute=limits.get("tokens_per_minute"),
+                max_burst=limits.get("max_burst", 10),
+                max_backoff_seconds=limits.get("max_backoff_seconds", 60),
+            )
+            _governors[name] = governor
+
+        key = (name, PRIORITIES.get(priority, PRIORITIES["executor"]))
+        if key not in _limiters:
+            _limiters[key] = (PriorityRateLimiter(governor, key[1]), RateLimitCallbackHandler(governor))
+        return _limiters[key]
+
+
+def clear_rate_limiters() -> None:
+    """Drop all governors (e.g. after the rate limits changed), new clients get new ones."""
+    with _registry_lock:
+        _governors.clear()
+        _limiters.clear()
+
+
+def log_rate_limit_stats() -> None:
+    """Log the queueing delay metrics of every governor used in this run."""
+    for name, governor in _governors.items():
+        logger.info(f"LLM rate limiter stats for {name}: {governor.metrics()}")
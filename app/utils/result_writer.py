@@ -0,0 +1,274 @@
+"""
+Writers for the scraper results.
+
+`json` writes the whole result to output.json (streamed by the encoder instead of building
+the full string first). `ndjson` writes one JSON record per line to output.ndjson(.gz):
+
+    {"type": "header", ...run metadata...}
+    {"type": "row", "output": 0, "content_key": "Film-content", "data": {...}}
+    {"type": "output", "output": 0, "format_type": "table", "summary": "..."}
+    {"type": "footer", "rows": 1234, "outputs": 1, "status": "completed", ...}
+
+so rows can be written as soon as they are validated and the file can be read line by line.
+The output file of a run is opened before the scraper runs (open_output_writer): the rows
+committed page by page are streamed to it during the run, and save_result only adds the
+rows that were not committed, the output records and the footer.
+"""
+import gzip
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from app.utils.config_manager import config_manager
+
+logger = logging.getLogger(__name__)
+
+
+class NDJSONResultWriter:
+    """
+    Streams scraper results to an NDJSON file (optionally gzip compressed) with a header
+    record describing the run and a footer record with the totals.
+    """
+
+    def __init__(self, path: str, compress: bool = False, metadata: Optional[Dict[str, Any]] = None):
+        """
+        Open the file and write the header record.
+
+        Args:
+            path: Path of the output file (".gz" is appended when compressing)
+            compress: Whether to gzip the file
+            metadata: Run metadata stored in the header record (profile, url, prompt, ...)
+        """
+        if compress and not path.endswith(".gz"):
+            path = f"{path}.gz"
+        self.path = path
+        self.rows = 0
+        self.outputs = 0
+        # footer status, unless close is given one (e.g. "incomplete" for runs cut off at max_steps)
+        self.status = "completed"
+        self._started = time.monotonic()
+        # rows written before the result, by (output, content_key)
+        self._streamed: Dict[Tuple[int, Optional[str]], int] = {}
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if compress:
+            self._file = gzip.open(path, "wt", encoding="utf-8")
+        else:
+            self._file = open(path, "w", encoding="utf-8")
+
+        self._write({
+            "type": "header",
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            **(metadata or {}),
+        })
+
+    def write_rows(self, rows: Iterable[Dict[str, Any]], output: int = 0, content_key: Optional[str] = None) -> int:
+        """
+        Write validated content rows.
+
+        Args:
+            rows: The rows (model dumps of the content model)
+            output: Index of the output the rows belong to
+            content_key: Name of the content field ("<name>-content")
+
+        Returns:
+            The number of rows written
+        """
+        count = 0
+        for row in rows:
+            self._write({"type": "row", "output": output, "content_key": content_key, "data": row})
+            count += 1
+        self.rows += count
+        self._streamed[(output, content_key)] = self._streamed.get((output, content_key), 0) + count
+        return count
+
+    def flush(self) -> None:
+        """Flush the written records to disk (e.g. after every committed page)."""
+        self._file.flush()
+
+    def write_result(self, result: Any) -> None:
+        """
+        Write a complete scraper result: the rows of every `outputs[*]["<name>-content"]`,
+        then one record with the remaining fields of each output. Results without outputs
+        (e.g. free text) are written as a single "result" record.
+
+        Rows already streamed to an output (the committed rows, which come first in the
+        result) are not written again.
+        """
+        if not isinstance(result, dict) or not isinstance(result.get("outputs"), list):
+            self._write({"type": "result", "data": result})
+            return
+
+        streamed, self._streamed = self._streamed, {}
+        for output in result["outputs"]:
+            fields = {}
+            for key, value in output.items():
+                if key.endswith("-content") and isinstance(value, list):
+                    self.write_rows(value[streamed.get((self.outputs, key), 0):], output=self.outputs, content_key=key)
+                else:
+                    fields[key] = value
+            self._write({"type": "output", "output": self.outputs, **fields})
+            self.outputs += 1
+
+        extra = {key: value for key, value in result.items() if key != "outputs"}
+        if extra:
+            self._write({"type": "result", "data": extra})
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+    def close(self, status: Optional[str] = None, error: Optional[str] = None) -> None:
+        """Write the footer record and close the file."""
+        if self._file.closed:
+            return
+        footer = {
+            "type": "footer",
+            "status": status or self.status,
+            "rows": self.rows,
+            "outputs": self.outputs,
+            "finished_at": datetime.now(timezone.utc).isoformat(),
+            "duration_seconds": round(time.monotonic() - self._started, 3),
+        }
+        if error:
+            footer["error"] = error
+        self._write(footer)
+        self._file.close()
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        self._file.write(json.dumps(record, ensure_ascii=False, default=str))
+        self._file.write("\n")
+
+    def __enter__(self) -> "NDJSONResultWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc is None:
+            self.close()
+        else:
+            self.close(status="failed", error=str(exc))
+
+
+_output_writers: Dict[str, NDJSONResultWriter] = {}
+
+
+def open_output_writer(results_dir: str, metadata: Optional[Dict[str, Any]] = None) -> Optional[NDJSONResultWriter]:
+    """
+    Open the output.ndjson file of a run before the scraper runs, so the rows committed
+    during the run are streamed to it (see get_output_writer).
+
+    Returns:
+        The writer, or None unless local.output.format is "ndjson"
+    """
+    if config_manager.get("local.output.format", "json") != "ndjson":
+        return None
+    key = os.path.abspath(results_dir)
+    writer = _output_writers.get(key)
+    if writer is None or writer.closed:
+        compress = bool(config_manager.get("local.output.gzip", False))
+        writer = _output_writers[key] = NDJSONResultWriter(
+            os.path.join(results_dir, "output.ndjson"), compress=compress, metadata=metadata
+        )
+    return writer
+
+
+def get_output_writer(results_dir: str) -> Optional[NDJSONResultWriter]:
+    """The open output.ndjson writer of the run in results_dir, if any."""
+    writer = _output_writers.get(os.path.abspath(results_dir))
+    return writer if writer is not None and not writer.closed else None
+
+
+def close_output_writer(results_dir: str, status: Optional[str] = None, error: Optional[str] = None) -> None:
+    """Write the footer of the output.ndjson file of a run (e.g. after the run failed)."""
+    writer = _output_writers.pop(os.path.abspath(results_dir), None)
+    if writer is not None:
+        writer.close(status=status, error=error)
+
+
+def save_result(result: Any, results_dir: str, metadata: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Save a scraper result in the format configured in local.yaml (local.output.format).
+
+    Args:
+        result: The scraper result
+        results_dir: Directory of the run results
+        metadata: Run metadata for the NDJSON header record
+
+    Returns:
+        The path of the written file
+    """
+    output_format = config_manager.get("local.output.format", "json")
+    compress = bool(config_manager.get("local.output.gzip", False))
+
+    if config_manager.get("local.output.columnar.enabled", False):
+        save_columnar_result(result, results_dir)
+
+    if output_format == "ndjson":
+        # the rows committed during the run are already in the file opened by open_output_writer
+        writer = _output_writers.pop(os.path.abspath(results_dir), None)
+        if writer is None or writer.closed:
+            writer = NDJSONResultWriter(os.path.join(results_dir, "output.ndjson"), compress=compress, metadata=metadata)
+        with writer:
+            writer.write_result(result)
+        return writer.path
+
+    if output_format != "json":
+        logger.warning(f"Unknown output format: {output_format}. Saving as json.")
+    results_path = os.path.join(results_dir, "output.json")
+    os.makedirs(os.path.dirname(results_path), exist_ok=True)
+    opener = gzip.open if compress else open
+    if compress:
+        results_path = f"{results_path}.gz"
+    with opener(results_path, "wt", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    return results_path
+
+
+def content_rows(result: Any) -> Iterable[Dict[str, Any]]:
+    """Iterate over the rows of every `outputs[*]["<name>-content"]` of a scraper result."""
+    if not isinstance(result, dict) or not isinstance(result.get("outputs"), list):
+        return
+    for output in result["outputs"]:
+        for key, value in output.items():
+            if key.endswith("-content") and isinstance(value, list):
+                yield from value
+
+
+def save_columnar_result(result: Any, results_dir: str) -> Optional[str]:
+    """
+    Export the content rows of a result to Parquet/Feather (local.output.columnar).
+    Errors are logged without failing the run, the result is also saved as json/ndjson.
+
+    Returns:
+        The path of the written file, or None if nothing was written
+    """
+    from app.utils.columnar_writer import ColumnarResultWriter, columnar_output_path
+
+    columnar_config = config_manager.get("local.output.columnar", {}) or {}
+    file_format = columnar_config.get("format", "parquet")
+    content_structure = config_manager.get("profile.content_structure")
+    run_id = os.path.basename(os.path.normpath(results_dir))
+    try:
+        path = columnar_output_path(
+            results_dir, content_structure, run_id, file_format, append=columnar_config.get("append", True)
+        )
+        with ColumnarResultWriter(
+            path,
+            content_structure,
+            run_id=run_id,
+            file_format=file_format,
+            row_group_size=columnar_config.get("row_group_size", 10000),
+            dictionary_columns=columnar_config.get("dictionary_columns", "auto"),
+            compression=columnar_config.get("compression", "zstd"),
+        ) as writer:
+            writer.write_rows(content_rows(result))
+    except Exception as e:
+        logger.error(f"Failed to save the columnar output: {str(e)}")
+        return None
+    if not writer.rows:
+        return None
+    logger.info(f"Saved {writer.rows} rows to {path}")
+    return path
@@ -0,0 +1,162 @@
+"""
+Accumulator for the rows extracted page by page.
+
+With the `commit_page_rows` controller action the browser-use agent hands over the rows
+of every page as soon as they are extracted, instead of carrying all of them in its
+context until the final result. The rows are validated against the content model of the
+output format and appended to rows.ndjson in the run results directory right away, so
+the rows of a run cut off at max_steps are kept.
+"""
+import logging
+import os
+import typing
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+
+from app.utils.config_manager import config_manager
+from app.utils.result_writer import NDJSONResultWriter, get_output_writer
+
+logger = logging.getLogger(__name__)
+
+
+def output_content_model(output_format: Type[BaseModel]) -> Tuple[str, Type[BaseModel]]:
+    """
+    Get the content field name ("<name>-content") and the content model of an output
+    format built by build_output_model.
+    """
+    outputs = output_format.model_fields.get("outputs")
+    if outputs is None or not typing.get_args(outputs.annotation):
+        raise ValueError(f"{output_format.__name__} has no outputs list")
+    output_model = typing.get_args(outputs.annotation)[0]
+    for name, field in getattr(output_model, "model_fields", {}).items():
+        if name.endswith("-content"):
+            return name, typing.get_args(field.annotation)[0]
+    raise ValueError(f"{output_format.__name__} has no content field")
+
+
+class RowAccumulator:
+    """
+    Collects the validated rows committed for every page and flushes them to disk.
+    """
+
+    def __init__(self, output_format: Type[BaseModel], results_dir: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the accumulator.
+
+        Args:
+            output_format: Output model built by build_output_model
+            results_dir: Directory of the run results (default: RESULTS_PATH), rows are
+                only kept in memory if it is not set
+            metadata: Run metadata for the NDJSON header record
+        """
+        self.content_key, self.content_model = output_content_model(output_format)
+        self.results_dir = results_dir or os.getenv("RESULTS_PATH")
+        self.metadata = metadata
+        # Rows by page number, in commit order
+        self.pages: Dict[int, List[Dict[str, Any]]] = {}
+        # Number of committed rows, kept up to date for the step governor progress
+        self.row_count = 0
+        self._writer: Optional[NDJSONResultWriter] = None
+        self._owns_writer = True
+
+    @property
+    def rows(self) -> List[Dict[str, Any]]:
+        """All committed rows, in page order."""
+        return [row for page in sorted(self.pages) for row in self.pages[page]]
+
+    def commit(self, page: int, rows: Iterable[Dict[str, Any]]) -> Tuple[int, List[str]]:
+        """
+        Validate the rows of a page and flush the valid rows to disk.
+
+        Args:
+            page: Page number the rows were extracted from
+            rows: The extracted rows
+
+        Returns:
+            The number of committed rows and the validation errors of the rejected rows
+
+        Raises:
+            ValueError: If the page was already committed
+        """
+        if page in self.pages:
+            raise ValueError(f"Page {page} was already committed")
+
+        valid, errors = [], []
+        for index, row in enumerate(rows):
+            try:
+                valid.append(self.content_model.model_validate(row).model_dump())
+            except ValidationError as e:
+                errors.append(f"row {index}: {e.errors()[0]['msg']}")
+        self.pages[page] = valid
+        self.row_count += len(valid)
+
+        writer = self._get_writer()
+        if writer is not None:
+            writer.write_rows(valid, content_key=self.content_key)
+            writer.flush()
+        logger.info(f"Committed {len(valid)} rows of page {page} ({len(errors)} rejected)")
+        return len(valid), errors
+
+    def commit_next(self, rows: Iterable[Dict[str, Any]]) -> Tuple[int, List[str]]:
+        """Commit rows as the page after the last committed page (see commit)."""
+        return self.commit(max(self.pages, default=0) + 1, rows)
+
+    def merge_into(self, result: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Merge the committed rows into a scraper result (model dump of the output format).
+        The rows are put before the rows of the first output that were not committed; a
+        result with only the committed rows is built if there is no result.
+
+        Committed pages the agent repeated in the final output (the same rows in the same
+        order) are dropped; other rows are kept even if they equal a committed row, since
+        tables can hold identical rows.
+        """
+        rows = self.rows
+        if not result or not result.get("outputs"):
+            result = dict(result or {})
+            result["outputs"] = [{self.content_key: [], "format_type": "table", "summary": None}]
+
+        first = result["outputs"][0]
+        remaining = list(first.get(self.content_key) or [])
+        for page in sorted(self.pages):
+            remaining = _drop_page_rows(remaining, self.pages[page])
+        first[self.content_key] = rows + remaining
+        return result
+
+    def close(self, status: str = "completed", error: Optional[str] = None) -> None:
+        """Write the footer record of the rows file (the run output file is finished by save_result)."""
+        if self._writer is None:
+            return
+        if self._owns_writer:
+            self._writer.close(status=status, error=error)
+        else:
+            self._writer.status = status
+
+    def _get_writer(self) -> Optional[NDJSONResultWriter]:
+        if self._writer is None and self.results_dir:
+            # stream the rows to the output file of the run when it is open (local.output.format: ndjson)
+            self._writer = get_output_writer(self.results_dir)
+            self._owns_writer = self._writer is None
+            if self._writer is None:
+                self._writer = NDJSONResultWriter(
+                    os.path.join(self.results_dir, "rows.ndjson"),
+                    compress=bool(config_manager.get("local.output.gzip", False)),
+                    metadata=self.metadata,
+                )
+        return self._writer
+
+
+def _row_key(row: Dict[str, Any]) -> tuple:
+    return tuple(sorted((key, repr(value)) for key, value in row.items()))
+
+
+def _drop_page_rows(rows: List[Dict[str, Any]], page_rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Remove the first repetition of the rows of a committed page (in order) from rows."""
+    if not page_rows:
+        return rows
+    keys, page_keys = [_row_key(row) for row in rows], [_row_key(row) for row in page_rows]
+    for start in range(len(rows) - len(page_keys) + 1):
+        if keys[start:start + len(page_keys)] == page_keys:
+            return rows[:start] + rows[start + len(page_keys):]
+    return rows
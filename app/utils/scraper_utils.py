@@ -15,13 +15,15 @@ async def save_to_pdf(current_url, page, results_path, webpage_number):
     # create directory if it doesn't exist (Just extra measures)
     os.makedirs(f"{results_path}/webpage-{webpage_number}", exist_ok=True)
     
-    if os.path.exists(f"{results_path}/webpage-{webpage_number}/{slug}.pdf"):
+    pdf_path = f"{results_path}/webpage-{webpage_number}/{slug}.pdf"
+    if os.path.exists(pdf_path):
         logger.info(f"PDF already exists for {current_url}. Skipping PDF generation.")
-        return
+        return pdf_path
     
     # save page as pdf
     await page.emulate_media(media='screen')
-    await page.pdf(path=f"{results_path}/webpage-{webpage_number}/{slug}.pdf" , format='A4', print_background=False)
+    await page.pdf(path=pdf_path, format='A4', print_background=False)
+    return pdf_path
 
 async def cleanup_resources():
     """Clean up all async resources properly."""
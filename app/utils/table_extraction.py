@@ -0,0 +1,246 @@
+"""
+Fast path for tabular_extraction without LLM calls.
+
+The HTML tables of a page are parsed (rowspan/colspan expanded, footnote markers dropped),
+their headers fuzzy-matched to the content model fields and the cells coerced to the
+field types (the str/int/float/bool types of build_content_model). The best table, with
+the tables sharing its header mapping (e.g. a Wikipedia list split by decade), is used if
+its confidence reaches the configured minimum; otherwise the scraper falls back to the
+LLM agent.
+"""
+import logging
+import re
+import typing
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Type
+
+from bs4 import BeautifulSoup
+from pydantic import BaseModel, ValidationError
+
+from app.utils.field_matching import match_fields
+
+logger = logging.getLogger(__name__)
+
+# Cell values treated as missing
+EMPTY_VALUES = {"", "-", "–", "—", "n/a", "na", "none", "?", "tba"}
+TRUE_VALUES = {"yes", "y", "true", "✓", "✔", "x"}
+FALSE_VALUES = {"no", "n", "false", "✗", "✘"}
+
+_FOOTNOTE = re.compile(r"\[(?:\d+|[a-z]|note \d+|citation needed)\]", re.IGNORECASE)
+# the whole cell must be the number, only a prefix (e.g. a currency symbol) is allowed
+_INT = re.compile(r"^[^\d+.-]*([+-]?\d+)(?:\.(\d+))?$")
+_FLOAT = re.compile(r"^[^\d+.-]*([+-]?\d*\.?\d+)$")
+
+
+class TableMatch(NamedTuple):
+    """Rows extracted from the matching tables of a page"""
+    rows: List[Dict[str, Any]]
+    confidence: float
+    # field name -> table header
+    headers: Dict[str, str]
+
+
+def model_field_types(content_model: Type[BaseModel]) -> Dict[str, type]:
+    """Field types of a content model (Optional[int] -> int)."""
+    types = {}
+    for name, field in content_model.model_fields.items():
+        args = [arg for arg in typing.get_args(field.annotation) if arg is not type(None)]
+        types[name] = args[0] if args else field.annotation
+    return types
+
+
+def coerce_cell(text: str, field_type: type) -> Tuple[Any, bool]:
+    """
+    Coerce a table cell to a field type.
+
+    Returns:
+        The value (None for empty cells) and whether the cell could be coerced
+    """
+    if text.strip().lower() in EMPTY_VALUES:
+        return None, True
+    if field_type is str:
+        return text, True
+    cleaned = text.replace(",", "").replace(" ", "").replace(" ", "").replace("−", "-")
+    if field_type is int:
+        match = _INT.match(cleaned)
+        # "12.5" or "1999-2003" are not ints, "5.0" is
+        if not match or (match.group(2) or "").strip("0"):
+            return None, False
+        return int(match.group(1)), True
+    if field_type is float:
+        match = _FLOAT.match(cleaned)
+        return (float(match.group(1)), True) if match else (None, False)
+    if field_type is bool:
+        lowered = text.strip().lower()
+        if lowered in TRUE_VALUES:
+            return True, True
+        if lowered in FALSE_VALUES:
+            return False, True
+        return None, False
+    return text, True
+
+
+def _cell_text(cell) -> str:
+    for note in cell.find_all(["sup", "style", "script"]):
+        note.decompose()
+    text = " ".join(cell.get_text(" ", strip=True).split())
+    return _FOOTNOTE.sub("", text).strip()
+
+
+def _span(cell, name: str) -> int:
+    try:
+        return max(1, min(int(cell.get(name, 1)), 100))
+    except (TypeError, ValueError):
+        return 1
+
+
+def parse_table(table) -> Tuple[List[str], List[List[str]]]:
+    """
+    Parse an HTML table into headers and rows, expanding rowspan/colspan cells.
+
+    Returns:
+        The column headers (header rows joined) and the body rows
+    """
+    header_rows, body_rows = [], []
+    # column -> (text, rows left) of the cells spanning the following rows
+    spanning: Dict[int, Tuple[str, int]] = {}
+    for tr in table.find_all("tr"):
+        if tr.find_parent("table") is not table:
+            continue
+        cells = tr.find_all(["td", "th"], recursive=False)
+        row: List[str] = []
+        column = 0
+        index = 0
+        while index < len(cells) or column in spanning:
+            if column in spanning:
+                text, left = spanning.pop(column)
+                if left > 1:
+                    spanning[column] = (text, left - 1)
+                row.append(text)
+                column += 1
+                continue
+            cell = cells[index]
+            index += 1
+            text = _cell_text(cell)
+            rowspan = _span(cell, "rowspan")
+            for _ in range(_span(cell, "colspan")):
+                if rowspan > 1:
+                    spanning[column] = (text, rowspan - 1)
+                row.append(text)
+                column += 1
+        if not row:
+            continue
+        if not body_rows and all(cell.name == "th" for cell in cells):
+            header_rows.append(row)
+        else:
+            body_rows.append(row)
+
+    if not header_rows and body_rows:
+        header_rows.append(body_rows.pop(0))
+    width = max((len(row) for row in header_rows + body_rows), default=0)
+    headers = []
+    for column in range(width):
+        parts = [row[column] for row in header_rows if column < len(row) and row[column]]
+        headers.append(" ".join(dict.fromkeys(parts)))
+    return headers, body_rows
+
+
+def _match_table(headers: List[str], body_rows: List[List[str]], field_types: Dict[str, type]):
+    """Match a parsed table to the fields, returning (rows, confidence, field -> header) or None."""
+    matches = match_fields([h for h in headers if h], list(field_types))
+    if not matches or not body_rows:
+        return None
+    columns = {field: headers.index(header) for field, (header, _) in matches.items()}
+
+    rows, coerced, filled = [], 0, 0
+    for body_row in body_rows:
+        if len(set(body_row)) == 1 and len(body_row) > 1:
+            # section rows spanning the whole table
+            continue
+        row = {field: None for field in field_types}
+        for field, column in columns.items():
+            text = body_row[column] if column < len(body_row) else ""
+            value, ok = coerce_cell(text, field_types[field])
+            row[field] = value
+            if text.strip().lower() not in EMPTY_VALUES:
+                filled += 1
+                coerced += ok
+        rows.append(row)
+    if not rows:
+        return None
+
+    coverage = len(matches) / len(field_types)
+    header_score = sum(score for _, score in matches.values()) / len(matches)
+    cell_score = coerced / filled if filled else 0.0
+    confidence = coverage * header_score * cell_score
+    return rows, confidence, {field: header for field, (header, _) in matches.items()}
+
+
+def extract_table_rows(html: str, content_model: Type[BaseModel], min_confidence: float = 0.8) -> Optional[TableMatch]:
+    """
+    Extract the rows of the tables of a page matching a content model.
+
+    Args:
+        html: The page HTML
+        content_model: The content model (build_content_model)
+        min_confidence: Minimum confidence of the match (0 to 1)
+
+    Returns:
+        The extracted rows, or None if no table matched with enough confidence
+    """
+    field_types = model_field_types(content_model)
+    soup = BeautifulSoup(html, "html.parser")
+
+    candidates = []
+    for table in soup.find_all("table"):
+        if table.find("table"):
+            # layout tables wrapping the data tables
+            continue
+        headers, body_rows = parse_table(table)
+        match = _match_table(headers, body_rows, field_types)
+        if match is not None:
+            candidates.append(match)
+    if not candidates:
+        return None
+
+    best_rows, best_confidence, best_headers = max(candidates, key=lambda c: (c[1], len(c[0])))
+    logger.info(f"Best table match: {len(best_rows)} rows, confidence {best_confidence:.2f}, headers {best_headers}")
+    if best_confidence < min_confidence:
+        return None
+
+    rows = []
+    for candidate_rows, confidence, headers in candidates:
+        if headers == best_headers and confidence >= min_confidence:
+            rows.extend(candidate_rows)
+    valid_rows = []
+    for row in rows:
+        try:
+            valid_rows.append(content_model.model_validate(row).model_dump())
+        except ValidationError:
+            continue
+    return TableMatch(valid_rows, best_confidence, best_headers)
+
+
+def use_table_fast_path(task_template: str, prompt: Any) -> bool:
+    """
+    Whether to try the fast path (local.table_fast_path): tabular_extraction prompts
+    without filters or pagination, which the tables of the loaded page can not reflect.
+    """
+    from app.utils.config_manager import config_manager
+
+    if not config_manager.get("local.table_fast_path.enabled", False):
+        return False
+    if task_template != "tabular_extraction" or not isinstance(prompt, dict):
+        return False
+    return not prompt.get("filters") and not prompt.get("no_pages")
+
+
+def table_fast_path_result(match: TableMatch, content_key: str, source: str) -> Dict[str, Any]:
+    """Build a scraper result (model dump of the output format) from the matched table rows."""
+    return {
+        "outputs": [{
+            content_key: match.rows,
+            "format_type": "table",
+            "summary": f"Extracted {len(match.rows)} rows from the HTML tables of {source} (confidence {match.confidence:.2f})",
+        }],
+        "extraction": "table_fast_path",
+    }
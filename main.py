@@ -1,22 +1,28 @@
 import asyncio
-import json
 import logging
 import os
 import sys
 from typing import Dict, Any, Optional
 import warnings
-import tracemalloc
 
+# Only lightweight modules are imported at startup. The scrapers (and their heavy
+# dependencies such as browser-use, langgraph/mcp, FAISS and pymupdf4llm) are imported in
+# scrape_url for the selected scraper type, the LLM provider SDKs in get_llm_instance.
 from app.utils.config.local import load_profile_config, parse_local_config
 from app.utils.config_manager import config_manager
+from app.utils.config.browser_use_agent import get_agent_settings
 from app.utils.logging import setup_results_path
-from app.utils.config.browser_use_agent import DEBUG_MODE
+from app.utils.result_writer import close_output_writer, open_output_writer, save_result
 
 from app.models.tasks_models import Task
 from app.utils.scraper_utils import cleanup_resources
 
-# Start memory tracking
-tracemalloc.start()
+DEBUG_MODE = get_agent_settings().debug_mode
+
+if DEBUG_MODE:
+    # Track memory allocations so the RuntimeWarnings (e.g. never awaited coroutines) show where they were created
+    import tracemalloc
+    tracemalloc.start()
 warnings.simplefilter("always", RuntimeWarning)
 
 
@@ -59,6 +65,23 @@ async def scrape_url(
             from app.services.browser_use_scraper import WebScraper
             logger.info("Using browser_use for scraping")
             logger.info(f"Scraping {url} for information about: {prompt}")
+
+            if (
+                task_template == "tabular_extraction"
+                and isinstance(prompt, dict)
+                and prompt.get("no_pages")
+                and get_agent_settings().parallel_pages
+            ):
+                # Extract the pages of the table concurrently (agent_config.pagination)
+                from app.services.paginated_scraper import PaginatedWebScraper
+                scraper = PaginatedWebScraper(
+                    url=url, # type: ignore
+                    prompt=prompt,
+                    additional_context=additional_context,
+                    initial_actions=initial_actions, # type: ignore
+                    output_format=build_output_model(content_structure), # type: ignore
+                )
+                return await scraper.scrape()
             
             scraper = WebScraper(
                 url=url,
@@ -128,34 +151,47 @@ async def main():
     output_path = local_config.get("output_path")
     setup_results_path(output_path, profile_name)
     
+    results_env = os.getenv("RESULTS_PATH")
+    metadata = {
+        "profile": profile_name,
+        "scraper_type": local_config.get("scraper_type"),
+        "url": local_config.get("url"),
+        "task_template": local_config.get("task_template"),
+        "prompt": local_config.get("prompt"),
+        "config_version": config_manager.version,
+    }
     try:
-        # Scrape the URL
-        result = await scrape_url(
-            scraper_type=local_config.get("scraper_type", "browser_use"),
-            url=local_config.get("url"),
-            filepath=local_config.get("filepath", None),
-            prompt=local_config.get("prompt"),
-            additional_context=local_config.get("additional_context", None),
-            task_template=local_config.get("task_template", "default"),
-            initial_actions=local_config.get("initial_actions", []),
-        )
-        # Format the result as JSON
-        formatted_result = json.dumps(result, indent=2)
-
-        results_env = os.getenv("RESULTS_PATH")
+        # Scrape the URL, pinning the current config snapshot so the whole job reads the same configuration
+        with config_manager.pin():
+            if results_env:
+                # rows committed during the run are streamed to output.ndjson (local.output.format)
+                open_output_writer(results_env, metadata=metadata)
+            result = await scrape_url(
+                scraper_type=local_config.get("scraper_type", "browser_use"),
+                url=local_config.get("url"),
+                filepath=local_config.get("filepath", None),
+                prompt=local_config.get("prompt"),
+                additional_context=local_config.get("additional_context", None),
+                task_template=local_config.get("task_template", "default"),
+                initial_actions=local_config.get("initial_actions", []),
+            )
         if not results_env:
             logging.error("RESULTS_PATH environment variable is not set. Please set it to save the results.")
             return
-        results_path = os.path.join(results_env, "output.json")
-        os.makedirs(os.path.dirname(results_path), exist_ok=True)
-        with open(results_path, "w") as f:
-            f.write(formatted_result)
+        # Save the result as JSON or streamed NDJSON (local.output.format)
+        results_path = save_result(result, results_env, metadata=metadata)
             
         logging.info(f"Scraping completed successfully. Results saved to {results_path}")
     except Exception as e:
         logger.error(f"Error during scraping: {str(e)}")
+        if results_env:
+            close_output_writer(results_env, status="failed", error=str(e))
         raise
     finally:
+        from app.utils.llm_cache import log_response_cache_stats
+        from app.utils.rate_limiter import log_rate_limit_stats
+        log_response_cache_stats()
+        log_rate_limit_stats()
         # Clean up any resources if needed
         await cleanup_resources()
 
@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+from app.models import llm_models
+from app.models.llm_models import _connection_pool_params, _llm_instance_key, clear_llm_instances
+
+
+@pytest.fixture(autouse=True)
+def empty_registry():
+    clear_llm_instances()
+    yield
+    clear_llm_instances()
+
+
+def test_llm_instance_key():
+    """Test that clients are keyed by their parameters and credentials without keeping the secret."""
+    params = {"model": "gpt-4o", "temperature": 0.0}
+    key = _llm_instance_key("openai", params, api_key="sk-secret", priority="executor")
+
+    assert key == _llm_instance_key("openai", dict(params), api_key="sk-secret", priority="executor")
+    assert key != _llm_instance_key("openai", params, api_key="sk-other", priority="executor")
+    assert key != _llm_instance_key("openai", params, api_key="sk-secret", priority="planner")
+    assert "sk-secret" not in repr(key)
+
+
+def test_connection_pools_are_shared_per_event_loop():
+    """Test that the pool is reused within a loop and each asyncio.run gets its own async client."""
+    async def pools():
+        return _connection_pool_params("openai", {}), _connection_pool_params("openai", {})
+
+    first, same = asyncio.run(pools())
+    second, _ = asyncio.run(pools())
+
+    assert first is same
+    assert second["http_async_client"] is not first["http_async_client"]
+    # the pool of the closed loop is dropped and its sync client closed
+    with llm_models._LLM_INSTANCES_LOCK:
+        llm_models._drop_closed_loops()
+    assert first["http_client"].is_closed
+    assert len(llm_models._HTTP_POOLS) == 0
+    assert "http_async_client" not in _connection_pool_params("openai", {})
+
+
+def test_clear_llm_instances_closes_the_pools():
+    """Test that clearing the registry closes the HTTP clients of the running loop."""
+    async def clear():
+        pool = _connection_pool_params("openai", {})
+        clear_llm_instances()
+        await asyncio.sleep(0)
+        return pool
+
+    pool = asyncio.run(clear())
+    assert pool["http_client"].is_closed and pool["http_async_client"].is_closed
+    assert llm_models._HTTP_POOLS == {}
@@ -0,0 +1,77 @@
+import asyncio
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from app.models.llm_router import RoutingChatModel, TargetStats
+
+
+class SlowChatModel(FakeListChatModel):
+    """Fake chat model that answers after a delay."""
+    delay: float = 0.0
+
+    async def _agenerate(self, *args, **kwargs):
+        await asyncio.sleep(self.delay)
+        return await super()._agenerate(*args, **kwargs)
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+class FailingChatModel(FakeListChatModel):
+    """Fake chat model that always answers with an error."""
+    error: Exception = RateLimitError("rate limited")
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    def _generate(self, *args, **kwargs):
+        raise self.error
+
+    async def _agenerate(self, *args, **kwargs):
+        raise self.error
+
+
+def _router(targets, hedge_delay_seconds=None):
+    return RoutingChatModel(
+        targets=targets,
+        target_names=[f"fake/model-{i}" for i in range(len(targets))],
+        hedge_delay_seconds=hedge_delay_seconds,
+        stats=TargetStats(),
+    )
+
+
+def test_hedging_returns_faster_target():
+    """Test that a slow request is hedged and the first answer wins."""
+    router = _router(
+        [SlowChatModel(responses=["slow"], delay=1.0), SlowChatModel(responses=["fast"], delay=0.0)],
+        hedge_delay_seconds=0.05,
+    )
+    assert asyncio.run(router.ainvoke("question")).content == "fast"
+
+
+def test_failover_on_rate_limit():
+    """Test that 429 errors fail over to the next target, sync and async."""
+    router = _router([FailingChatModel(responses=["unused"]), FakeListChatModel(responses=["ok"])])
+    assert router.invoke("question").content == "ok"
+    assert asyncio.run(router.ainvoke("question")).content == "ok"
+    assert router.stats.summary()["fake/model-0"]["error_rate"] == 1.0
+
+
+def test_non_retryable_error_is_raised():
+    """Test that errors other than 429/5xx/timeouts are not retried on another target."""
+    router = _router([FailingChatModel(responses=["unused"], error=ValueError("bad request")), FakeListChatModel(responses=["ok"])])
+    with pytest.raises(ValueError):
+        router.invoke("question")
+
+
+def test_order_prefers_low_latency_and_healthy_targets():
+    """Test that targets are ordered by latency and unhealthy targets go last."""
+    stats = TargetStats(max_error_rate=0.5, cooldown_seconds=60)
+    stats.record("a", 2.0, ok=True)
+    stats.record("b", 0.5, ok=True)
+    assert stats.order(["a", "b", "c"], [1.0, 1.0, 1.0]) == ["c", "b", "a"]
+
+    stats.record("b", None, ok=False)
+    stats.record("b", None, ok=False)
+    assert not stats.is_healthy("b")
+    assert stats.order(["a", "b"], [1.0, 1.0]) == ["a", "b"]
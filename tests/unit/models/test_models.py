@@ -5,6 +5,7 @@ import tempfile
 from unittest.mock import patch
 from pydantic import ValidationError
 from app.models.output_format_models import build_output_model
+from app.utils.config.local import build_content_model
 from typing import Any, get_args
 
 
@@ -249,4 +250,13 @@ def test_build_scraper_output_model_validation(temp_yaml_config: dict[str, Any])
 #         assert film_info_instance.content[1].actor_name == "Leonardo DiCaprio"
 #         assert film_info_instance.content[1].role == "Cobb"
 #         assert film_info_instance.content[1].is_lead is True
-        
\ No newline at end of file
+        
+def test_build_output_model_is_cached_by_structure():
+    """Test that identical content structures return the same model class."""
+    structure = {"Film_Info": {"title": "str", "year": "int"}}
+
+    assert build_output_model(structure) is build_output_model({"Film_Info": {"title": "str", "year": "int"}})
+    # a different field order is a different model (the order is part of the schema)
+    reordered = {"Film_Info": {"year": "int", "title": "str"}}
+    assert build_output_model(reordered) is not build_output_model(structure)
+    assert list(build_content_model(reordered).model_fields) == ["year", "title"]
@@ -0,0 +1,98 @@
+import asyncio
+import json
+import os
+import tempfile
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("browser_use")
+
+from app.services.action_replay import ActionReplay, compile_actions
+
+
+class FakeAction:
+    def __init__(self, **action):
+        self.action = action
+
+    def model_dump(self, exclude_unset=False):
+        return self.action
+
+
+def _step(actions, errors=None, xpaths=None):
+    errors = errors or [None] * len(actions)
+    return SimpleNamespace(
+        model_output=SimpleNamespace(action=[FakeAction(**a) for a in actions]),
+        result=[SimpleNamespace(error=e) for e in errors],
+        state=SimpleNamespace(interacted_element=[SimpleNamespace(xpath=x) if x else None for x in (xpaths or [None] * len(actions))]),
+    )
+
+
+class FakePage:
+    def __init__(self, structure="BODY(DIV#main)", fail_xpath=None):
+        self.structure = structure
+        self.fail_xpath = fail_xpath
+        self.url = "https://example.com"
+        self.calls = []
+
+    async def evaluate(self, script, *args):
+        return self.structure if "maxDepth" in script else 800
+
+    def locator(self, selector):
+        async def click(timeout=None):
+            if self.fail_xpath and self.fail_xpath in selector:
+                raise TimeoutError("element not found")
+            self.calls.append(selector)
+        return SimpleNamespace(click=click)
+
+    async def goto(self, url, timeout=None):
+        self.calls.append(url)
+
+    async def wait_for_load_state(self, timeout=None):
+        pass
+
+
+def _agent(page):
+    async def get_current_page():
+        return page
+    return SimpleNamespace(browser_session=SimpleNamespace(get_current_page=get_current_page), state=SimpleNamespace(last_result=None))
+
+
+def test_compile_actions_keeps_successful_navigation():
+    """Test that clicks are compiled to xpaths, failed and extraction actions are skipped."""
+    history = SimpleNamespace(history=[
+        _step([{"click_element_by_index": {"index": 3}}], xpaths=["html/body/a[1]"]),
+        _step([{"go_to_url": {"url": "https://example.com/list"}}, {"scroll_down": {"amount": 500}}], errors=[None, "failed"]),
+        _step([{"extract_content": {"goal": "films"}}]),
+        _step([{"input_text": {"index": 1, "text": "query"}}, {"click_by_xpath": {"xpath": "//button"}}]),
+    ])
+
+    assert compile_actions(history) == [
+        {"click_by_xpath": "/html/body/a[1]"},
+        {"go_to_url": "https://example.com/list"},
+    ]
+
+
+def test_replay_runs_recording_and_stops_on_failure():
+    """Test that recorded actions are replayed until a selector fails and only for the same page structure."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "replay.json")
+        recorder = ActionReplay("https://example.com", "task", path=path)
+        asyncio.run(recorder.on_step_start(_agent(FakePage())))
+        recorder.record(SimpleNamespace(history=[
+            _step([{"click_by_xpath": {"xpath": "//a[1]"}}, {"click_by_xpath": {"xpath": "//a[2]"}}]),
+        ]))
+        assert len(json.load(open(path))) == 1
+
+        page = FakePage(fail_xpath="//a[2]")
+        agent = _agent(page)
+        replay = ActionReplay("https://example.com", "task", path=path)
+        asyncio.run(replay.on_step_start(agent))
+        assert page.calls == ["xpath=//a[1]"]
+        assert replay.replayed == [{"click_by_xpath": "//a[1]"}]
+        assert agent.state.last_result is not None
+
+        changed = FakePage(structure="BODY(TABLE)")
+        replay = ActionReplay("https://example.com", "task", path=path)
+        asyncio.run(replay.on_step_start(_agent(changed)))
+        assert changed.calls == [] and replay.replayed == []
@@ -0,0 +1,126 @@
+import asyncio
+import json
+import os
+import tempfile
+from types import SimpleNamespace
+
+from app.services.hooks.adaptive_wait import AdaptiveWait, PageLoadStats, wait_for_quiescence
+
+
+class FakePage:
+    def __init__(self, url, settle_after=0.0, quiet=True):
+        self.url = url
+        self.settle_after = settle_after
+        self.quiet = quiet
+
+    async def wait_for_load_state(self, state, timeout=None):
+        await asyncio.sleep(self.settle_after)
+
+    async def evaluate(self, script, args):
+        quiet_ms, timeout_ms = args
+        await asyncio.sleep(min(self.settle_after, timeout_ms / 1000) if self.quiet else timeout_ms / 1000)
+        return self.quiet
+
+
+def test_page_load_stats_are_merged_into_the_file():
+    """Test that the wait times of concurrent runs are merged and bounded per domain."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "page_load_stats.json")
+        first, second = PageLoadStats(path, max_samples=3), PageLoadStats(path, max_samples=3)
+        first.record("example.com", 0.2)
+        second.record("example.com", 0.4)
+        second.record("slow.org", 2.0)
+        first.save()
+        second.save()
+
+        with open(path) as f:
+            assert json.load(f) == {"example.com": [[0.2, True], [0.4, True]], "slow.org": [[2.0, True]]}
+        stats = PageLoadStats(path, max_samples=3)
+        assert stats.expected("example.com") == 0.4 and stats.expected("unknown.net") is None
+
+
+def test_budget_is_learned_and_bounded():
+    """Test that known domains are waited for up to headroom x their wait times, at most max_wait."""
+    stats = PageLoadStats()
+    for seconds in (0.2, 0.3, 0.25):
+        stats.record("static.com", seconds)
+    stats.record("slow.org", 8.0)
+    wait = AdaptiveWait(stats, max_wait=10, headroom=2.0, min_budget=1.0)
+
+    assert wait.budget("static.com") == 1.0
+    assert wait.budget("slow.org") == 10
+    assert wait.budget("new.net") == 10
+
+
+def test_quiescence_wait():
+    """Test that quiet pages end the wait early and pages that keep changing time out."""
+    waited, settled = asyncio.run(wait_for_quiescence(FakePage("https://a.com", settle_after=0.05), timeout=2))
+    assert settled and waited < 1
+
+    waited, settled = asyncio.run(wait_for_quiescence(FakePage("https://a.com", quiet=False), timeout=0.1))
+    assert not settled and waited >= 0.1
+
+
+def test_on_step_start_records_the_domain_wait():
+    """Test that the wait of a quiet page is recorded for its domain."""
+    page = FakePage("https://static.com/list", settle_after=0.01)
+    agent = SimpleNamespace(browser_session=SimpleNamespace(get_current_page=lambda: _coroutine(page)))
+    wait = AdaptiveWait(PageLoadStats(), max_wait=5)
+    asyncio.run(wait.on_step_start(agent))
+
+    assert len(wait.stats.samples["static.com"]) == 1
+
+
+async def _coroutine(value):
+    return value
+
+
+def test_only_waits_after_a_navigation_are_recorded():
+    """Test that steps staying on the same page wait without recording their wait."""
+    page = FakePage("https://static.com/list", settle_after=0.01)
+    agent = SimpleNamespace(browser_session=SimpleNamespace(get_current_page=lambda: _coroutine(page)))
+    wait = AdaptiveWait(PageLoadStats(), max_wait=5)
+    for _ in range(3):
+        asyncio.run(wait.on_step_start(agent))
+    assert len(wait.stats.samples["static.com"]) == 1
+
+    page.url = "https://static.com/list?page=2"
+    asyncio.run(wait.on_step_start(agent))
+    assert len(wait.stats.samples["static.com"]) == 2
+
+
+def test_timed_out_waits_are_recorded_and_fall_back():
+    """Test that timed-out waits grow the budget and never-quiet domains get the fixed wait."""
+    page = FakePage("https://ticker.com/quotes", quiet=False)
+    agent = SimpleNamespace(browser_session=SimpleNamespace(get_current_page=lambda: _coroutine(page)))
+    stats = PageLoadStats()
+    stats.record("ticker.com", 0.02)
+    wait = AdaptiveWait(stats, max_wait=0.2, headroom=2.0, min_budget=0.01, fallback_wait=0.01, recheck_every=2)
+    for step in range(3):
+        page.url = f"https://ticker.com/quotes/{step}"
+        asyncio.run(wait.on_step_start(agent))
+
+    # a budget of 0.04 (2 x the 90th percentile) recorded at twice the budget, then 0.16 capped at max_wait
+    assert stats.samples["ticker.com"][1:] == [[0.08, False], [0.2, False], [0.2, False]]
+    stats.samples["ticker.com"] = stats.samples["ticker.com"][1:]
+    assert stats.never_settles("ticker.com")
+
+    # fixed wait, then a full wait again on the second step after a navigation
+    page.url = "https://ticker.com/quotes/3"
+    asyncio.run(wait.on_step_start(agent))
+    assert len(stats.samples["ticker.com"]) == 3
+    page.quiet = True
+    page.url = "https://ticker.com/quotes/4"
+    asyncio.run(wait.on_step_start(agent))
+    assert len(stats.samples["ticker.com"]) == 4 and not stats.never_settles("ticker.com")
+
+
+def test_page_load_stats_read_the_former_file_format():
+    """Test that statistics files holding only the quiet wait times are still read."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "page_load_stats.json")
+        with open(path, "w") as f:
+            json.dump({"example.com": [0.2, 0.4]}, f)
+
+        stats = PageLoadStats(path)
+        assert stats.expected("example.com") == 0.4 and not stats.never_settles("example.com")
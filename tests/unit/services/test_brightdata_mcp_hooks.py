@@ -0,0 +1,57 @@
+import gzip
+import json
+import os
+import tempfile
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from app.services.hooks.brightdata_mcp_hooks import MCPMessageLogger
+
+
+@pytest.fixture
+def logs_dir():
+    """Create a temporary directory for the MCP logs."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield temp_dir
+
+
+def _read_log(logs_dir):
+    with open(os.path.join(logs_dir, MCPMessageLogger.FILENAME), encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_log_messages_preserves_every_message(logs_dir):
+    """Test that every message is logged once, even when called with a growing list."""
+    messages = [
+        HumanMessage(content="Scrape https://example.com"),
+        AIMessage(content="", tool_calls=[{"name": "scrape_as_markdown", "args": {"url": "https://example.com"}, "id": "call_1"}]),
+    ]
+    with MCPMessageLogger(logs_dir) as mcp_logger:
+        mcp_logger.log_messages(messages[:1])
+        mcp_logger.log_messages(messages)
+        mcp_logger.log_messages(messages + [AIMessage(content="done")])
+
+    records = _read_log(logs_dir)
+    assert [r["index"] for r in records] == [0, 1, 2]
+    assert [r["type"] for r in records] == ["human", "ai", "ai"]
+    assert records[1]["tool_calls"][0]["name"] == "scrape_as_markdown"
+    assert records[2]["content"] == "done"
+
+
+def test_large_payload_is_spilled_to_side_file(logs_dir):
+    """Test that large tool payloads are truncated and saved compressed by hash."""
+    page = "# Page\n" + "row | value\n" * 1000
+    with MCPMessageLogger(logs_dir, max_inline_chars=100) as mcp_logger:
+        mcp_logger.log_message(ToolMessage(content=page, tool_call_id="call_1"))
+        mcp_logger.log_message(ToolMessage(content=page, tool_call_id="call_2"))
+
+    records = _read_log(logs_dir)
+    assert all(r["truncated"] for r in records)
+    assert records[0]["content"] == page[:100]
+    assert records[0]["content_length"] == len(page)
+    assert records[0]["content_ref"] == records[1]["content_ref"]
+
+    with gzip.open(os.path.join(logs_dir, records[0]["content_ref"]), "rt", encoding="utf-8") as f:
+        assert f.read() == page
+    assert len(os.listdir(os.path.join(logs_dir, MCPMessageLogger.PAYLOAD_DIR))) == 1
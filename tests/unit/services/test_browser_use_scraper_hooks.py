@@ -0,0 +1,44 @@
+import asyncio
+import os
+import tempfile
+
+from app.services.hooks import browser_use_scraper_hooks
+from app.utils.page_cache import PageSnapshotCache
+
+
+class FakePage:
+    def __init__(self, html):
+        self.html = html
+        self.printed = 0
+
+    async def content(self):
+        return self.html
+
+    async def emulate_media(self, media=None):
+        pass
+
+    async def pdf(self, path, format=None, print_background=None):
+        self.printed += 1
+        with open(path, "wb") as f:
+            f.write(b"%PDF-1.4")
+
+
+def test_save_page_pdf_reuses_the_cached_pdf(monkeypatch):
+    """Test that the same page version is printed once and copied for the next job."""
+    cache = PageSnapshotCache()
+    monkeypatch.setattr(browser_use_scraper_hooks, "get_page_cache", lambda: cache)
+    page = FakePage("<p>films</p>")
+    url = "https://example.com/films"
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        first_job, second_job = os.path.join(temp_dir, "run1", "local"), os.path.join(temp_dir, "run2", "local")
+        first = asyncio.run(browser_use_scraper_hooks._save_page_pdf(url, page, first_job, 1))
+        second = asyncio.run(browser_use_scraper_hooks._save_page_pdf(url, page, second_job, 1))
+
+        assert page.printed == 1 and len(cache) == 1
+        assert second.startswith(second_job) and os.path.basename(second) == os.path.basename(first)
+        assert os.path.exists(second)
+
+        page.html = "<p>films, updated</p>"
+        asyncio.run(browser_use_scraper_hooks._save_page_pdf(url, page, os.path.join(temp_dir, "run3", "local"), 1))
+        assert page.printed == 2
@@ -0,0 +1,63 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.models.output_format_models import build_output_model
+from app.services.hooks.json_capture_hooks import JSONCapture, find_records, next_page_url
+from app.utils.row_accumulator import RowAccumulator
+
+API_URL = "https://example.com/api/films?page=1&size=2"
+API_PAGES = {
+    API_URL: {"data": {"items": [{"filmTitle": "A", "releaseYear": 2001, "id": 1}, {"filmTitle": "B", "releaseYear": 2002, "id": 2}]}},
+    "https://example.com/api/films?page=2&size=2": {"data": {"items": [{"filmTitle": "C", "releaseYear": 2003, "id": 3}]}},
+    "https://example.com/api/films?page=3&size=2": {"data": {"items": []}},
+}
+
+
+def test_find_records_matches_nested_lists():
+    """Test that the list of records whose keys match the fields is found and mapped."""
+    rows, score = find_records(API_PAGES[API_URL], ["title", "year"])
+
+    assert score == 1.0
+    assert rows[0] == {"title": "A", "year": 2001}
+    assert find_records({"menu": [{"label": "Home"}]}, ["title", "year"]) is None
+
+
+def test_next_page_url():
+    """Test that APIs are paged through by their page or offset parameter."""
+    assert next_page_url(API_URL, 2) == "https://example.com/api/films?page=2&size=2"
+    assert next_page_url("https://example.com/api?offset=0&limit=25", 25) == "https://example.com/api?offset=25&limit=25"
+    assert next_page_url("https://example.com/api?q=films", 25) is None
+
+
+def test_capture_extracts_api_pages_and_stops_agent():
+    """Test that a captured response is extracted, the API paged through and the agent stopped."""
+    accumulator = RowAccumulator(build_output_model({"Film": {"title": "str", "year": "int"}}))
+    capture = JSONCapture(fields=["title", "year"], commit=accumulator.commit_next)
+
+    async def get(url):
+        async def json():
+            return API_PAGES[url]
+        return SimpleNamespace(ok=True, json=json)
+
+    page = SimpleNamespace(context=SimpleNamespace(request=SimpleNamespace(get=get)))
+
+    async def get_current_page():
+        return page
+
+    stopped = []
+    agent = SimpleNamespace(browser_session=SimpleNamespace(get_current_page=get_current_page), stop=lambda: stopped.append(True))
+
+    async def response_json():
+        return API_PAGES[API_URL]
+
+    response = SimpleNamespace(
+        url=API_URL,
+        headers={"content-type": "application/json"},
+        request=SimpleNamespace(resource_type="fetch", method="GET"),
+        json=response_json,
+    )
+    asyncio.run(capture._on_response(response))
+    asyncio.run(capture.on_step_end(agent))
+
+    assert capture.extracted and capture.pages == 2 and stopped
+    assert [row["title"] for row in accumulator.rows] == ["A", "B", "C"]
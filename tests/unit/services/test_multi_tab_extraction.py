@@ -0,0 +1,83 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.multi_tab_extraction import extract_pages, parse_llm_json
+from app.utils.page_cache import PageSnapshotCache
+
+PAGES = {
+    "https://example.com/film/1": "<h1>Film One</h1><p>Year: 2001</p><script>var x = 1;</script>",
+    "https://example.com/film/2": "<h1>Film Two</h1><p>Year: 2002</p>",
+}
+
+
+class FakeContext:
+    def __init__(self):
+        self.open_tabs = 0
+        self.max_open_tabs = 0
+        self.loads = 0
+
+    async def new_page(self):
+        context = self
+
+        class Page:
+            def __init__(self):
+                context.open_tabs += 1
+                context.max_open_tabs = max(context.max_open_tabs, context.open_tabs)
+                self.url = None
+
+            async def goto(self, url, wait_until=None, timeout=None):
+                if url not in PAGES:
+                    raise RuntimeError("net::ERR_NAME_NOT_RESOLVED")
+                context.loads += 1
+                self.url = url
+                await asyncio.sleep(0.01)
+
+            async def content(self):
+                return PAGES[self.url]
+
+            async def close(self):
+                context.open_tabs -= 1
+
+        return Page()
+
+
+class FakeLLM:
+    def __init__(self):
+        self.prompts = []
+
+    async def ainvoke(self, prompt):
+        self.prompts.append(prompt)
+        title = "Film One" if "Film One" in prompt else "Film Two"
+        return SimpleNamespace(content=f'```json\n{{"title": "{title}"}}\n```')
+
+
+def test_extract_pages_in_bounded_parallel_tabs():
+    """Test that every URL is extracted in order with at most max_tabs tabs open."""
+    pytest.importorskip("markdownify")
+    context, llm = FakeContext(), FakeLLM()
+    urls = list(PAGES) + ["https://missing.invalid/", "https://example.com/film/1"]
+    results = asyncio.run(extract_pages(context, urls, "the film title", llm, max_tabs=2))
+
+    assert [result["url"] for result in results] == urls[:3]
+    assert results[0]["data"] == {"title": "Film One"} and results[1]["data"] == {"title": "Film Two"}
+    assert "ERR_NAME_NOT_RESOLVED" in results[2]["error"]
+    assert context.max_open_tabs <= 2 and context.open_tabs == 0
+    assert "var x" not in llm.prompts[0]
+
+
+def test_extract_pages_reuses_the_page_cache():
+    """Test that pages in the page cache are not loaded again."""
+    pytest.importorskip("markdownify")
+    context, cache = FakeContext(), PageSnapshotCache()
+    for _ in range(2):
+        asyncio.run(extract_pages(context, list(PAGES), "the film title", FakeLLM(), cache=cache))
+
+    assert context.loads == 2
+
+
+def test_parse_llm_json():
+    """Test that fenced JSON answers are parsed and other answers kept as text."""
+    assert parse_llm_json('```json\n{"a": 1}\n```') == {"a": 1}
+    assert parse_llm_json("No film found") == "No film found"
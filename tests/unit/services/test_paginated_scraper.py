@@ -0,0 +1,96 @@
+import asyncio
+import os
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("browser_use")
+
+from app.models.output_format_models import build_output_model
+from app.services import paginated_scraper
+from app.services.paginated_scraper import PaginatedWebScraper, PaginationInfo, merge_page_results, page_urls
+
+
+def test_page_urls_from_page_and_offset_templates():
+    """Test that page URLs are built from the page number or row offset, bounded by the page limits."""
+    info = PaginationInfo(url_template="https://example.com/films?page={page}", first_page=1, page_count=12)
+    assert page_urls(info, 3, max_pages=50) == [f"https://example.com/films?page={n}" for n in (1, 2, 3)]
+    assert len(page_urls(info, "all", max_pages=5)) == 5
+
+    offsets = PaginationInfo(url_template="https://example.com/films?start={offset}", page_size=25, page_count=3)
+    assert page_urls(offsets, "all", max_pages=50) == [f"https://example.com/films?start={n}" for n in (0, 25, 50)]
+
+
+def test_page_urls_without_addressable_pages():
+    """Test that no URLs are built when the pages can not be opened by URL."""
+    assert page_urls(PaginationInfo(url_template=None), "all", max_pages=50) == []
+    assert page_urls(PaginationInfo(url_template="https://example.com/films?start={offset}"), "all", max_pages=50) == []
+
+
+def test_merge_page_results_keeps_page_order():
+    """Test that the rows of all pages are merged in page order and failed pages are reported."""
+    def page(*titles):
+        return {"outputs": [{"Film-content": [{"title": t} for t in titles], "format_type": "table", "summary": "films"}]}
+
+    merged = merge_page_results([page("A", "B"), None, page("C")], "Film-content")
+
+    assert [row["title"] for row in merged["outputs"][0]["Film-content"]] == ["A", "B", "C"]
+    assert merged["outputs"][0]["summary"] == "films"
+    assert merged["pages"] == {"extracted": 2, "failed": [2]}
+
+
+@pytest.mark.parametrize("page_count", [4, None])
+def test_discover_then_extract_pages_concurrently(monkeypatch, page_count):
+    """Test that the discovery browser is stopped and no page that returned rows is dropped after an empty page."""
+    class FakeSession:
+        stopped = False
+
+        async def stop(self):
+            FakeSession.stopped = True
+
+    class FakeAgent:
+        def __init__(self, **kwargs):
+            assert kwargs["browser_session"] is session
+
+        async def run(self, max_steps):
+            info = PaginationInfo(url_template="https://example.com/films?page={page}", page_count=page_count)
+            return SimpleNamespace(final_result=info.model_dump_json)
+
+    scraped, profiles = [], []
+
+    class FakeWebScraper:
+        def __init__(self, url, user_data_dir=None, **kwargs):
+            self.url = url
+            profiles.append(user_data_dir)
+
+        async def scrape(self):
+            scraped.append(self.url)
+            await asyncio.sleep(0.01)
+            page = int(self.url.rsplit("=", 1)[1])
+            titles = [] if page == 3 or page > 4 else [f"Film {page}a", f"Film {page}b"]
+            return {"outputs": [{"Film-content": [{"title": t} for t in titles], "format_type": "table"}]}
+
+    session = FakeSession()
+    monkeypatch.setattr(paginated_scraper, "define_browser_use_session", lambda **kwargs: session)
+    monkeypatch.setattr(paginated_scraper, "get_llm_instance", lambda: None)
+    monkeypatch.setattr(paginated_scraper, "Agent", FakeAgent)
+    monkeypatch.setattr(paginated_scraper, "WebScraper", FakeWebScraper)
+
+    prompt = {"website": "Example", "data_category": "films", "data_points": "title", "no_pages": "all", "filters": None}
+    scraper = PaginatedWebScraper(
+        url="https://example.com/films",
+        prompt=prompt,
+        output_format=build_output_model({"Film": {"title": "str"}}),
+    )
+    result = asyncio.run(scraper.scrape())
+
+    assert FakeSession.stopped
+    # page 4 was extracted concurrently with the empty page 3, its rows are kept
+    titles = [row["title"] for row in result["outputs"][0]["Film-content"]]
+    assert titles == ["Film 1a", "Film 1b", "Film 2a", "Film 2b", "Film 4a", "Film 4b"]
+    assert result["pages"] == {"extracted": 4, "failed": []}
+    # every page session has its own browser profile, removed afterwards
+    assert len(set(profiles)) == len(profiles) and not any(os.path.exists(path) for path in profiles)
+    if page_count is None:
+        # the pages after the end of the table are not extracted
+        assert len(scraped) == 4
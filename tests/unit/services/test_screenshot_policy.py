@@ -0,0 +1,110 @@
+import asyncio
+import base64
+import io
+import os
+import tempfile
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.hooks.screenshot_policy import ScreenshotPolicy, encode_image
+from app.utils.config.browser_use import BrowserSettings
+
+
+class FakePage:
+    def __init__(self, url, html, png=b"png-bytes"):
+        self.url = url
+        self.html = html
+        self.png = png
+        self.screenshots = 0
+
+    async def content(self):
+        return self.html
+
+    async def screenshot(self, full_page=False, type="png", quality=None):
+        self.screenshots += 1
+        return b"jpeg-bytes" if type == "jpeg" else self.png
+
+
+def _agent(done=False, vision_screenshot=None):
+    history = SimpleNamespace(
+        history=[SimpleNamespace(state=SimpleNamespace(screenshot=vision_screenshot))],
+        is_done=lambda: done,
+    )
+    return SimpleNamespace(
+        settings=SimpleNamespace(use_vision=vision_screenshot is not None),
+        state=SimpleNamespace(history=history, stopped=False),
+    )
+
+
+def test_capture_only_on_url_or_content_change():
+    """Test that unchanged steps point to the latest screenshot instead of capturing again."""
+    policy = ScreenshotPolicy(BrowserSettings(screenshot_format="jpeg", screenshot_triggers=["url_change", "dom_change"]))
+    page = FakePage("https://example.com/a", "<p>a</p>")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        first = asyncio.run(policy.capture(_agent(), page, 1, temp_dir))
+        same = asyncio.run(policy.capture(_agent(), page, 2, temp_dir))
+        page.html = "<p>a</p><p>more</p>"
+        changed = asyncio.run(policy.capture(_agent(), page, 3, temp_dir))
+        page.url = "https://example.com/b"
+        navigated = asyncio.run(policy.capture(_agent(), page, 4, temp_dir))
+
+        assert first == os.path.join(temp_dir, "screenshot-step-1.jpg") and same == first
+        assert changed.endswith("screenshot-step-3.jpg") and navigated.endswith("screenshot-step-4.jpg")
+        assert page.screenshots == 3 and policy.skipped == 1
+
+
+def test_final_step_and_sampling():
+    """Test that the final step and every sampled step are captured."""
+    policy = ScreenshotPolicy(BrowserSettings(screenshot_triggers=["final"], screenshot_sample_every=3))
+    policy.last_path, policy.last_url, policy.last_step = "step-1.png", "https://example.com", 1
+
+    assert policy.reason(2, "https://example.com/b", None, final=False) is None
+    assert policy.reason(4, "https://example.com", None, final=False) == "sample"
+    assert policy.reason(2, "https://example.com", None, final=True) == "final"
+
+
+def _attached_agent(policy, page, screenshot):
+    """Agent whose browser state carries a vision screenshot of the page, with the policy attached."""
+    state = SimpleNamespace(url=page.url, screenshot=screenshot)
+    browser_session = SimpleNamespace(
+        get_state_summary=lambda *args, **kwargs: _coroutine(state),
+        get_current_page=lambda: _coroutine(page),
+    )
+    agent = _agent()
+    agent.browser_session = browser_session
+    policy.attach(agent)
+    return agent
+
+
+async def _coroutine(value):
+    return value
+
+
+def test_state_screenshot_is_reused_for_the_same_page():
+    """Test that the state screenshot is saved only when it shows the page being recorded."""
+    pytest.importorskip("PIL")
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new("RGBA", (8, 8), (255, 0, 0, 255)).save(buffer, format="PNG")
+    screenshot = base64.b64encode(buffer.getvalue()).decode()
+    policy = ScreenshotPolicy(BrowserSettings(screenshot_format="webp", screenshot_quality=50))
+    page = FakePage("https://example.com", "<p>a</p>", png=buffer.getvalue())
+    agent = _attached_agent(policy, page, screenshot)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        asyncio.run(agent.browser_session.get_state_summary())
+        path = asyncio.run(policy.capture(agent, page, 1, temp_dir))
+        assert path.endswith(".webp") and page.screenshots == 0
+        assert Image.open(path).format == "WEBP"
+
+        # the step navigated after its state was fetched: the state screenshot shows the previous page
+        asyncio.run(agent.browser_session.get_state_summary())
+        page.url = "https://example.com/next"
+        asyncio.run(policy.capture(agent, page, 2, temp_dir))
+        assert page.screenshots == 1
+
+
+def test_encode_image_keeps_png():
+    """Test that PNG screenshots are not re-encoded."""
+    assert encode_image(b"png-bytes", "png", 70) == (b"png-bytes", "png")
@@ -0,0 +1,109 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.services.hooks.step_content import step_content_hash
+from app.services.hooks.step_governor import LOOP_NOTE, StepGovernor, step_signature
+
+
+class FakeAction:
+    def __init__(self, **action):
+        self.action = action
+
+    def model_dump(self, exclude_unset=False):
+        return self.action
+
+
+class FakeAgent:
+    def __init__(self, url="https://example.com/list", html="<p>list</p>"):
+        self.page = SimpleNamespace(url=url, content=lambda: _coroutine(html))
+        self.browser_session = SimpleNamespace(get_current_page=lambda: _coroutine(self.page))
+        self.history = SimpleNamespace(history=[], total_input_tokens=lambda: 1000 * len(self.history.history))
+        self.state = SimpleNamespace(history=self.history)
+        self.settings = SimpleNamespace(planner_llm=None)
+        self.plans = []
+        self._message_manager = SimpleNamespace(add_plan=lambda plan, position=None: self.plans.append(plan))
+        self.stopped = False
+
+    def add_step(self, error=None, **action):
+        self.history.history.append(SimpleNamespace(
+            model_output=SimpleNamespace(action=[FakeAction(**action)]),
+            result=[SimpleNamespace(error=error)],
+        ))
+
+    def stop(self):
+        self.stopped = True
+
+
+async def _coroutine(value):
+    return value
+
+
+def _run(governor, agent, steps, **action):
+    for _ in range(steps):
+        agent.add_step(**action)
+        asyncio.run(governor.on_step_end(agent))
+
+
+def test_loop_replans_then_stops():
+    """Test that a repeated step is replanned first and stops the agent when it repeats again."""
+    agent = FakeAgent()
+    governor = StepGovernor(loop_window=4, loop_repeats=3, max_replans=1)
+    _run(governor, agent, 3, scroll_down={"amount": 500})
+
+    assert agent.plans == [LOOP_NOTE] and not agent.stopped
+
+    _run(governor, agent, 3, scroll_down={"amount": 500})
+    assert agent.stopped and governor.stop_reason.startswith("loop")
+
+
+def test_progress_clears_the_loop_window():
+    """Test that committed rows count as progress even when the steps look the same."""
+    agent = FakeAgent()
+    rows = []
+    governor = StepGovernor(loop_repeats=3, max_replans=0, progress=lambda: len(rows))
+    for page in range(5):
+        rows.append(page)
+        _run(governor, agent, 1, commit_page_rows={"page": 1})
+
+    assert not agent.stopped and governor.stop_reason is None
+
+
+def test_repeated_failures_and_budgets():
+    """Test that repeated errors and the token budget stop the agent."""
+    agent = FakeAgent()
+    governor = StepGovernor(loop_repeats=2, max_replans=0)
+    agent.add_step(error="Element not found", click_element_by_index={"index": 4})
+    asyncio.run(governor.on_step_end(agent))
+    agent.add_step(error="Element not found", click_element_by_index={"index": 7})
+    asyncio.run(governor.on_step_end(agent))
+    assert agent.stopped and "failed" in governor.stop_reason
+
+    agent = FakeAgent()
+    governor = StepGovernor(max_tokens=2500, cost_per_1k_tokens=0.01)
+    for index in range(3):
+        _run(governor, agent, 1, go_to_url={"url": f"https://example.com/{index}"})
+    assert agent.stopped and governor.stop_reason.startswith("token budget")
+
+
+def test_step_signature_differs_by_page_content():
+    """Test that the same action on changed page content is a different step."""
+    action = [{"scroll_down": {"amount": 500}}]
+    assert step_signature("https://a.com", action, "sha256:1") != step_signature("https://a.com", action, "sha256:2")
+
+
+def test_step_content_hash_is_shared_by_the_hooks():
+    """Test that the page content is read once per step whatever the number of hooks hashing it."""
+    reads = []
+    page = SimpleNamespace(url="https://example.com/list", content=lambda: reads.append(1) or _coroutine("<p>list</p>"))
+    agent = FakeAgent()
+    agent.page, agent.state.n_steps = page, 1
+    agent.add_step(scroll_down={"amount": 500})
+
+    governor = StepGovernor()
+    asyncio.run(governor.on_step_end(agent))
+    first = asyncio.run(step_content_hash(agent, page))
+    assert len(reads) == 1 and first is not None
+
+    agent.state.n_steps = 2
+    asyncio.run(step_content_hash(agent, page))
+    assert len(reads) == 2
@@ -0,0 +1,72 @@
+import asyncio
+import base64
+import io
+import json
+import os
+import tempfile
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.hooks.vision_controller import VisionController, fit_image, image_tokens
+
+
+def _screenshot(width, height):
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), (255, 255, 255)).save(buffer, format="PNG")
+    return base64.b64encode(buffer.getvalue()).decode("utf-8")
+
+
+def _state(screenshot, dom_text):
+    tree = SimpleNamespace(clickable_elements_to_string=lambda: dom_text)
+    return SimpleNamespace(screenshot=screenshot, element_tree=tree)
+
+
+def test_fit_image_crops_and_downscales():
+    """Test that screenshots are cropped to the maximum height and downscaled to the pixel budget."""
+    pytest.importorskip("PIL")
+    screenshot, original_size, size = fit_image(_screenshot(1920, 3000), max_pixels=500_000, max_height=1080)
+
+    assert original_size == (1920, 3000)
+    assert size[0] * size[1] <= 500_000 and abs(size[0] / size[1] - 1920 / 1080) < 0.01
+    assert fit_image(screenshot, 0, 0)[2] == size
+
+
+def test_screenshots_sent_only_when_needed():
+    """Test that screenshots are dropped when the DOM text is enough, except on the cadence and after failures."""
+    pytest.importorskip("PIL")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        controller = VisionController(max_pixels=100_000, send_every=3, min_dom_chars=20, trace_dir=temp_dir)
+        rich_text = "[1]<a>Next page</a> [2]<button>Search</button>"
+
+        states = [_state(_screenshot(800, 600), rich_text) for _ in range(4)]
+        controller.process(states[0], 1)
+        controller.process(states[1], 2)
+        controller.process(states[2], 3, failed=True)
+        sparse = _state(_screenshot(800, 600), "[1]<canvas>")
+        controller.process(sparse, 5)
+
+        assert [record["reason"] for record in controller.steps] == ["cadence", None, "after_failure", "dom_insufficient"]
+        assert states[1].screenshot is None and sparse.screenshot is not None
+        assert controller.total_image_tokens == 3 * image_tokens(365, 273)
+        with open(os.path.join(temp_dir, "vision.jsonl")) as f:
+            assert [json.loads(line)["step"] for line in f] == [1, 2, 3, 5]
+
+
+def test_attach_processes_the_step_state_once():
+    """Test that only the first browser state fetched in a step is processed."""
+    pytest.importorskip("PIL")
+    controller = VisionController(min_dom_chars=0, send_every=0)
+
+    class Session:
+        async def get_state_summary(self, cache_clickable_elements_hashes=True):
+            return _state(_screenshot(100, 100), "text")
+
+    agent = SimpleNamespace(browser_session=Session(), state=SimpleNamespace(n_steps=1, consecutive_failures=0))
+    controller.attach(agent)
+    state = asyncio.run(agent.browser_session.get_state_summary())
+    asyncio.run(agent.browser_session.get_state_summary(cache_clickable_elements_hashes=False))
+
+    assert state.screenshot is None and len(controller.steps) == 1
@@ -1,5 +1,5 @@
 import pytest
-from app.templates.task_templates import get_task_template, get_available_templates, TASK_TEMPLATES
+from app.templates.task_templates import get_task_template, get_available_templates, INTERNAL_TEMPLATES, TASK_TEMPLATES
 
 def test_get_available_templates():
     """Test that get_available_templates returns the correct list of templates."""
@@ -7,7 +7,8 @@ def test_get_available_templates():
     assert isinstance(templates, list)
     assert len(templates) > 0
     assert "default" in templates
-    assert set(templates) == set(TASK_TEMPLATES.keys())
+    assert set(templates) == set(TASK_TEMPLATES.keys()) - INTERNAL_TEMPLATES
+    assert "pagination_discovery" not in templates
 
 def test_get_task_template_valid():
     """Test retrieving a valid template."""
@@ -0,0 +1,67 @@
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# Budget for `import main` (cumulative import time in milliseconds), override with IMPORT_TIME_BUDGET_MS
+IMPORT_TIME_BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", 1500))
+
+# Modules that must only be loaded for the scraper type or LLM provider that needs them
+HEAVY_MODULES = [
+    "browser_use",
+    "langchain_openai",
+    "langchain_anthropic",
+    "langchain_google_genai",
+    "langchain_ollama",
+    "langgraph",
+    "mcp",
+    "faiss",
+    "pymupdf4llm",
+]
+
+
+def _import_main(*args):
+    """Import main.py in a fresh interpreter and return the completed process."""
+    return subprocess.run(
+        [sys.executable, *args, "-c", "import sys, main; print(','.join(sorted(sys.modules)))"],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+
+
+def _import_times(stderr):
+    """Parse `-X importtime` output into {module: cumulative microseconds}."""
+    times = {}
+    for match in re.finditer(r"import time:\s+\d+ \|\s+(\d+) \|\s+(\S.*)", stderr):
+        times[match.group(2).strip()] = int(match.group(1))
+    return times
+
+
+def test_startup_does_not_import_heavy_modules():
+    """Test that importing main does not load scraper or provider SDKs."""
+    process = _import_main()
+    assert process.returncode == 0, process.stderr
+    loaded = set(process.stdout.strip().split(","))
+    assert not [module for module in HEAVY_MODULES if module in loaded]
+
+
+@pytest.mark.skipif(os.getenv("SKIP_IMPORT_TIME_BUDGET") == "1", reason="import time budget disabled")
+def test_startup_import_time_budget():
+    """Test that `import main` stays within the import time budget (python -X importtime)."""
+    _import_main("-X", "importtime")  # warm up the bytecode cache
+    process = _import_main("-X", "importtime")
+    assert process.returncode == 0, process.stderr
+
+    times = _import_times(process.stderr)
+    main_ms = times["main"] / 1000
+    slowest = [(name, round(us / 1000)) for name, us in sorted(times.items(), key=lambda item: item[1], reverse=True)[:10]]
+    assert main_ms < IMPORT_TIME_BUDGET_MS, (
+        f"import main took {main_ms:.0f}ms (budget {IMPORT_TIME_BUDGET_MS:.0f}ms), slowest imports (ms): {slowest}"
+    )
@@ -0,0 +1,91 @@
+import os
+import pytest
+import tempfile
+
+pa = pytest.importorskip("pyarrow")
+
+from app.utils.columnar_writer import RUN_ID_COLUMN, ColumnarResultWriter, arrow_schema, columnar_output_path
+
+CONTENT_STRUCTURE = {"Film": {"title": "str", "studio": "str", "year": "int", "rating": "float", "won": "bool"}}
+
+
+def _rows(n):
+    return [
+        {"title": f"Film {i}", "studio": ["A24", "Pixar"][i % 2], "year": 2000 + i, "rating": i / 2, "won": i % 3 == 0}
+        for i in range(n)
+    ]
+
+
+def test_arrow_schema_from_content_structure():
+    """Test that the content structure types map to nullable Arrow types."""
+    schema = arrow_schema(CONTENT_STRUCTURE)
+    assert schema.names == ["title", "studio", "year", "rating", "won", RUN_ID_COLUMN]
+    assert schema.field("year").type == pa.int64()
+    assert schema.field("won").type == pa.bool_()
+    assert all(field.nullable for field in schema)
+
+
+@pytest.mark.parametrize("file_format", ["parquet", "feather"])
+def test_writer_writes_row_groups(file_format):
+    """Test that rows are written in row groups and read back unchanged."""
+    rows = _rows(25) + [{"title": None, "studio": None, "year": None, "rating": None, "won": None}]
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, f"output.{file_format}")
+        with ColumnarResultWriter(path, CONTENT_STRUCTURE, run_id="run-1", file_format=file_format, row_group_size=10) as writer:
+            writer.write_rows(rows)
+
+        if file_format == "parquet":
+            import pyarrow.parquet as pq
+            assert pq.ParquetFile(path).num_row_groups == 3
+            table = pq.read_table(path)
+        else:
+            import pyarrow.feather as feather
+            table = feather.read_table(path)
+            assert pa.types.is_dictionary(table.schema.field("studio").type)
+            assert not pa.types.is_dictionary(table.schema.field("title").type)
+
+    assert writer.rows == 26
+    assert table.column("title").to_pylist() == [row["title"] for row in rows]
+    assert table.column("studio").to_pylist() == [row["studio"] for row in rows]
+    assert set(table.column(RUN_ID_COLUMN).to_pylist()) == {"run-1"}
+
+
+def test_runs_are_appended_to_the_profile_dataset():
+    """Test that runs become parts of one dataset and a changed structure is kept out of it."""
+    import pyarrow.dataset as ds
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for run_id in ["250101000000", "250102000000"]:
+            results_dir = os.path.join(temp_dir, "profile", run_id)
+            path = columnar_output_path(results_dir, CONTENT_STRUCTURE, run_id)
+            with ColumnarResultWriter(path, CONTENT_STRUCTURE, run_id=run_id) as writer:
+                writer.write_rows(_rows(5))
+
+        dataset_dir = os.path.join(temp_dir, "profile", "dataset")
+        assert ds.dataset(dataset_dir).to_table().num_rows == 10
+
+        changed = {"Film": {"title": "str"}}
+        results_dir = os.path.join(temp_dir, "profile", "250103000000")
+        assert columnar_output_path(results_dir, changed, "250103000000") == os.path.join(results_dir, "output.parquet")
+
+
+def test_failed_write_leaves_no_part_behind():
+    """Test that a failed run leaves no partial part and unreadable parts do not break later runs."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        results_dir = os.path.join(temp_dir, "profile", "run1")
+        path = columnar_output_path(results_dir, CONTENT_STRUCTURE, "run1")
+        with pytest.raises(pa.ArrowInvalid):
+            with ColumnarResultWriter(path, CONTENT_STRUCTURE, run_id="run1") as writer:
+                writer.write_rows([{"title": "A", "year": "n/a"}])
+
+        dataset_dir = os.path.join(temp_dir, "profile", "dataset")
+        assert os.listdir(dataset_dir) == []
+
+        with open(os.path.join(dataset_dir, "part-run0.parquet"), "wb") as f:
+            f.write(b"PAR1")
+        results_dir = os.path.join(temp_dir, "profile", "run2")
+        path = columnar_output_path(results_dir, CONTENT_STRUCTURE, "run2")
+        assert path == os.path.join(dataset_dir, "part-run2.parquet")
+        with ColumnarResultWriter(path, CONTENT_STRUCTURE, run_id="run2") as writer:
+            writer.write_rows(_rows(3))
+        assert sorted(os.listdir(dataset_dir)) == ["part-run0.parquet", "part-run2.parquet"]
@@ -1,3 +1,4 @@
+import json
 import os
 import pytest
 import tempfile
@@ -90,4 +91,79 @@ def test_config_manager_reload(temp_config_dir):
     
     # Reload and verify the updated value
     config_manager.reload()
-    assert config_manager.get("test_config.test_section.key1") == "updated_value"
\ No newline at end of file
+    assert config_manager.get("test_config.test_section.key1") == "updated_value"
+
+
+def test_config_manager_loads_files_lazily(temp_config_dir):
+    """Test that config files are only parsed when one of their values is requested."""
+    config_manager = ConfigManager(config_dir=temp_config_dir)
+    assert config_manager.snapshot().configs == {}
+
+    assert config_manager.get("test_config.test_section.key2") == 123
+    assert list(config_manager.snapshot().configs) == ["test_config"]
+
+    # missing files fall back to the default
+    assert config_manager.get("missing_config.key", "default") == "default"
+
+
+def test_config_manager_cached_settings_rebuilt_on_reload(temp_config_dir):
+    """Test that cached settings objects are rebuilt after a reload."""
+    config_manager = ConfigManager(config_dir=temp_config_dir)
+    build = lambda: config_manager.get("test_config.test_section.key1")
+
+    assert config_manager.cached("test", build) == "value1"
+
+    config_path = Path(temp_config_dir) / "test_config.yaml"
+    with open(config_path, 'w') as f:
+        yaml.dump({"test_section": {"key1": "updated_value"}}, f)
+    assert config_manager.cached("test", build) == "value1"
+
+    config_manager.reload()
+    assert config_manager.cached("test", build) == "updated_value"
+
+
+def test_config_manager_snapshots_are_read_only(temp_config_dir):
+    """Test that config values can't be modified in place."""
+    config_manager = ConfigManager(config_dir=temp_config_dir)
+    section = config_manager.get("test_config.test_section")
+
+    with pytest.raises(TypeError):
+        section["key1"] = "changed"
+    assert json.loads(json.dumps(section))["key1"] == "value1"
+
+
+def test_config_manager_pinned_snapshot_survives_reload(temp_config_dir):
+    """Test that a pinned job keeps its snapshot while reload publishes a new one."""
+    config_manager = ConfigManager(config_dir=temp_config_dir)
+    with config_manager.pin() as snapshot:
+        assert config_manager.get("test_config.test_section.key1") == "value1"
+
+        config_path = Path(temp_config_dir) / "test_config.yaml"
+        with open(config_path, 'w') as f:
+            yaml.dump({"test_section": {"key1": "updated_value"}}, f)
+        config_manager.reload()
+
+        assert config_manager.get("test_config.test_section.key1") == "value1"
+        assert config_manager.version == snapshot.version
+
+    assert config_manager.version == snapshot.version + 1
+    assert config_manager.get("test_config.test_section.key1") == "updated_value"
+
+
+def test_config_manager_pinned_snapshot_never_reads_changed_files(temp_config_dir):
+    """Test that a pinned snapshot keeps the files it has not parsed yet as they were when it was pinned."""
+    config_manager = ConfigManager(config_dir=temp_config_dir)
+    with config_manager.pin() as snapshot:
+        assert config_manager.get("test_config.test_section.key1") == "value1"
+
+        with open(Path(temp_config_dir) / "test_config.yaml", 'w') as f:
+            yaml.dump({"test_section": {"key1": "updated_value"}}, f)
+        with open(Path(temp_config_dir) / "secrets.yaml", 'w') as f:
+            yaml.dump({"llms": {"api_key": "updated_key"}}, f)
+        config_manager.reload()
+
+        assert config_manager.get("test_config.test_section.key1") == "value1"
+        assert config_manager.get("secrets.llms.api_key") == "test_api_key"
+        assert config_manager.version == snapshot.version
+
+    assert config_manager.get("secrets.llms.api_key") == "updated_key"
@@ -0,0 +1,69 @@
+import os
+import pytest
+import tempfile
+from pathlib import Path
+import yaml
+
+from app.utils.config_manager import ConfigManager
+from app.utils.config_watcher import ConfigWatcher
+
+
+def _write(path, config):
+    """Write a YAML file and bump its modification time so the change is always detected."""
+    with open(path, 'w') as f:
+        yaml.dump(config, f)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture
+def config_dir():
+    """Create a temporary config directory with two config files."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        _write(Path(temp_dir) / "browser_config.yaml", {"browser": {"headless": True}})
+        _write(Path(temp_dir) / "llm_config.yaml", {"llm": {"model": "gpt-4o-mini"}})
+        yield Path(temp_dir)
+
+
+def _require_headless_flag(manager):
+    def validate():
+        assert isinstance(manager.get("browser_config.browser.headless"), bool), "headless must be a boolean"
+    return validate
+
+
+def test_watcher_reloads_only_changed_files(config_dir):
+    """Test that a changed file is published as a new snapshot and subscribers of other files are not notified."""
+    manager = ConfigManager(config_dir=str(config_dir))
+    manager.get("browser_config.browser.headless")
+    manager.get("llm_config.llm.model")
+    watcher = ConfigWatcher(manager, validators={})
+    watcher.check()
+
+    notified = []
+    manager.subscribe(["browser_config"], lambda old, new: notified.append("browser"))
+    manager.subscribe(["llm_config"], lambda old, new: notified.append("llm"))
+
+    _write(config_dir / "browser_config.yaml", {"browser": {"headless": False}})
+    assert watcher.check() == ["browser_config"]
+    assert manager.get("browser_config.browser.headless") is False
+    assert notified == ["browser"]
+    assert watcher.check() == []
+
+
+def test_watcher_keeps_configuration_on_invalid_change(config_dir):
+    """Test that invalid YAML or a failing validator does not replace the current configuration."""
+    manager = ConfigManager(config_dir=str(config_dir))
+    manager.get("browser_config.browser.headless")
+    watcher = ConfigWatcher(manager, validators={"browser_config": [_require_headless_flag(manager)]})
+    watcher.check()
+    version = manager.version
+
+    _write(config_dir / "browser_config.yaml", {"browser": {"headless": "sometimes"}})
+    assert watcher.check() == []
+
+    with open(config_dir / "browser_config.yaml", 'w') as f:
+        f.write("browser: [unclosed")
+    assert watcher.check() == []
+
+    assert manager.version == version
+    assert manager.get("browser_config.browser.headless") is True
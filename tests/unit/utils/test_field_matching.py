@@ -0,0 +1,17 @@
+from app.utils.field_matching import match_fields, name_similarity
+
+
+def test_name_similarity():
+    """Test that names are compared ignoring case and separators, with partial names scored high."""
+    assert name_similarity("Release Year", "release_year") == 1.0
+    assert name_similarity("year", "releaseYear") == 0.9
+    assert name_similarity("title", "budget") < 0.5
+
+
+def test_match_fields_uses_each_name_once():
+    """Test that the best pairs are matched first and unmatched fields are left out."""
+    matches = match_fields(["filmTitle", "title", "year_released", "id"], ["title", "year", "director"])
+
+    assert matches["title"] == ("title", 1.0)
+    assert matches["year"][0] == "year_released"
+    assert "director" not in matches
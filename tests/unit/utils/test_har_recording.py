@@ -0,0 +1,58 @@
+import asyncio
+import os
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from pydantic import ValidationError
+
+from app.utils.config.browser_use import BrowserSettings, compress_har, decompress_har, har_record_path, replay_har
+from app.utils.config_manager import ConfigSnapshot, config_manager, freeze
+
+
+def _browser_config(**har):
+    return ConfigSnapshot(1, Path("missing"), {"browser_config": freeze({"browser": {"har": har}})})
+
+
+def test_har_settings():
+    """Test that the HAR mode is validated and attached bodies are recorded to a zip."""
+    with pytest.raises(ValidationError):
+        BrowserSettings(har_mode="replay-all")
+    settings = BrowserSettings(har_mode="record", har_content="attach")
+    assert har_record_path(settings, "results/run") == os.path.join("results/run", "network.zip")
+    # concurrent page workers record to their own directory, even with a configured path
+    worker_dir = os.path.join("results/run", "pages", "page-0002")
+    settings = BrowserSettings(har_mode="record", har_path="shared/network.har")
+    assert har_record_path(settings, worker_dir, worker=True) == os.path.join(worker_dir, "network.har")
+
+
+def test_compress_and_decompress_har():
+    """Test that a recorded HAR is replaced by its zstd compressed file and can be restored."""
+    pytest.importorskip("zstandard")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "network.har")
+        Path(path).write_text('{"log": {"entries": []}}')
+        with config_manager.pin(_browser_config(mode="record", compress="zstd")):
+            compressed = compress_har(path)
+
+        assert compressed == f"{path}.zst" and not os.path.exists(path)
+        restored = decompress_har(compressed, os.path.join(temp_dir, "replay.har"))
+        assert Path(restored).read_text() == '{"log": {"entries": []}}'
+
+
+def test_replay_har_routes_the_browser_context():
+    """Test that the recorded HAR is routed with the missing request policy."""
+    calls = []
+
+    async def route_from_har(path, not_found=None, url=None):
+        calls.append((path, not_found, url))
+
+    session = SimpleNamespace(browser_context=SimpleNamespace(route_from_har=route_from_har))
+    with tempfile.NamedTemporaryFile(suffix=".har") as har:
+        with config_manager.pin(_browser_config(mode="replay", path=har.name, not_found="abort")):
+            asyncio.run(replay_har(session))
+        with config_manager.pin(_browser_config(mode="off", path=har.name)):
+            asyncio.run(replay_har(session))
+
+    assert calls == [(har.name, "abort", None)]
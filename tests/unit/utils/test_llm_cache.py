@@ -0,0 +1,95 @@
+import pytest
+from unittest.mock import patch
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration
+
+from app.utils.llm_cache import LLMResponseCache
+
+
+class KeywordEmbeddings:
+    """Deterministic embeddings for testing: one dimension per keyword."""
+    KEYWORDS = ["film", "award", "plot", "weather"]
+
+    def embed_query(self, text):
+        return [text.lower().count(keyword) for keyword in self.KEYWORDS]
+
+
+def _generation(text):
+    return [ChatGeneration(message=AIMessage(content=text))]
+
+
+@pytest.fixture
+def cache():
+    """Create an in-memory response cache."""
+    return LLMResponseCache(path=":memory:")
+
+
+def test_exact_hit_and_miss(cache):
+    """Test that responses are only returned for the same prompt and model configuration."""
+    cache.update("prompt", "gpt-4o-mini", _generation("answer"))
+
+    hit = cache.lookup("prompt", "gpt-4o-mini")
+    assert hit[0].message.content == "answer"
+    assert cache.lookup("prompt", "o4-mini") is None
+    assert cache.lookup("other prompt", "gpt-4o-mini") is None
+
+    stats = cache.stats()
+    assert stats["exact_hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["entries"] == 1
+
+
+def test_ttl_expiry():
+    """Test that expired responses are evicted on lookup."""
+    cache = LLMResponseCache(path=":memory:", ttl_seconds=60)
+    with patch("app.utils.llm_cache.time.time", return_value=1000.0):
+        cache.update("prompt", "model", _generation("answer"))
+    with patch("app.utils.llm_cache.time.time", return_value=1030.0):
+        assert cache.lookup("prompt", "model") is not None
+    with patch("app.utils.llm_cache.time.time", return_value=1061.0):
+        assert cache.lookup("prompt", "model") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_max_entries_evicts_least_recently_used():
+    """Test that the least recently used responses are evicted above max_entries."""
+    cache = LLMResponseCache(path=":memory:", max_entries=2)
+    for i, now in enumerate([1.0, 2.0]):
+        with patch("app.utils.llm_cache.time.time", return_value=now):
+            cache.update(f"prompt-{i}", "model", _generation(f"answer-{i}"))
+    # touch prompt-0 so prompt-1 becomes the least recently used
+    with patch("app.utils.llm_cache.time.time", return_value=3.0):
+        cache.lookup("prompt-0", "model")
+    with patch("app.utils.llm_cache.time.time", return_value=4.0):
+        cache.update("prompt-2", "model", _generation("answer-2"))
+
+    assert cache.lookup("prompt-0", "model") is not None
+    assert cache.lookup("prompt-1", "model") is None
+    assert cache.lookup("prompt-2", "model") is not None
+
+
+def test_semantic_hit_above_threshold():
+    """Test that near-identical prompts reuse answers for the same model only."""
+    cache = LLMResponseCache(path=":memory:", embeddings=KeywordEmbeddings(), similarity_threshold=0.95)
+    cache.update("film award film", "model", _generation("answer"))
+
+    assert cache.lookup("Film award film?", "model")[0].message.content == "answer"
+    assert cache.lookup("film award film", "other-model") is None
+    assert cache.lookup("weather plot", "model") is None
+    assert cache.stats()["semantic_hits"] == 1
+
+
+def test_semantic_index_follows_inserts_and_evictions():
+    """Test that the in-memory embeddings see new prompts and skip evicted ones."""
+    embeddings = KeywordEmbeddings()
+    cache = LLMResponseCache(path=":memory:", embeddings=embeddings, similarity_threshold=0.95, max_entries=1)
+    cache.update("film award film", "model", _generation("films"))
+    assert cache.lookup("Film award film?", "model")[0].message.content == "films"
+
+    # evicts the film prompt, the embeddings are not read from the database again
+    cache.update("weather plot", "model", _generation("weather"))
+    with patch.object(cache, "_conn", wraps=cache._conn) as conn:
+        assert cache.lookup("Weather plot?", "model")[0].message.content == "weather"
+        assert not any("embedding" in str(call) for call in conn.execute.call_args_list)
+    assert cache.lookup("Film award film?", "model") is None
+    assert cache.stats()["misses"] == 1
@@ -0,0 +1,81 @@
+import asyncio
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+from app.utils.config.brightdata_mcp import define_mcp_server_params
+from app.utils.config_manager import ConfigSnapshot, config_manager, freeze
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    local_mcp_server = pytest.importorskip("app.utils.mcp_tools.local_mcp_server")
+    (tmp_path / "example-com-films.md").write_text("# Films\n\n- Film One\n- Film Two\n", encoding="utf-8")
+    (tmp_path / "default.html").write_text("<h1>Default</h1><a href='/films'>Films</a>", encoding="utf-8")
+    monkeypatch.setattr(local_mcp_server, "FIXTURE_DIR", tmp_path)
+    monkeypatch.setattr(local_mcp_server, "_stats", {"calls": 0, "errors": 0})
+    monkeypatch.setattr(local_mcp_server, "_browser", {"url": None})
+    return local_mcp_server
+
+
+def test_fixture_lookup(server):
+    """Test that URLs are served from their fixture, the other format or the default page."""
+    assert server.fixture_slug("https://www.example.com/films/") == "example-com-films"
+    assert asyncio.run(server.scrape_as_markdown("https://example.com/films")).startswith("# Films")
+    # no markdown fixture: the html default is converted to text
+    text = asyncio.run(server.scrape_as_markdown("https://example.com/unknown"))
+    assert "Default" in text and "<h1>" not in text
+
+
+def test_payload_resizing(server, monkeypatch):
+    """Test that pages are padded or truncated to the payload size."""
+    monkeypatch.setattr(server, "PAYLOAD_SIZE", 100)
+    assert len(asyncio.run(server.scrape_as_markdown("https://example.com/films"))) == 100
+    monkeypatch.setattr(server, "PAYLOAD_SIZE", 5)
+    assert asyncio.run(server.scrape_as_markdown("https://example.com/films")) == "# Fil"
+
+
+def test_every_tool_goes_through_the_simulated_network(server, monkeypatch):
+    """Test that the error rate and call count apply to every tool, browser tools included."""
+    asyncio.run(server.scraping_browser_navigate("https://example.com/films"))
+    monkeypatch.setattr(server, "ERROR_RATE", 1.0)
+    tools = [
+        server.scraping_browser_get_text,
+        server.scraping_browser_get_html,
+        server.scraping_browser_links,
+        server.session_stats,
+    ]
+    for tool in tools:
+        with pytest.raises(RuntimeError, match="Simulated upstream error"):
+            asyncio.run(tool())
+    assert server._stats == {"calls": 5, "errors": 4}
+
+    monkeypatch.setattr(server, "ERROR_RATE", 0.5)
+    monkeypatch.setattr(server, "_random", random.Random(7))
+    failures = 0
+    for _ in range(200):
+        try:
+            asyncio.run(server.scraping_browser_links())
+        except RuntimeError:
+            failures += 1
+    assert 60 < failures < 140
+
+
+def test_local_server_is_selected_from_the_config():
+    """Test that mcp_config.server "local" starts the stand-in server with its settings."""
+    snapshot = ConfigSnapshot(1, Path("missing"), {
+        "mcp_config": freeze({
+            "server": "local",
+            "local_mcp": {"fixture_dir": "data/mcp_fixtures", "latency_ms": 50, "error_rate": 0.1, "seed": 7},
+        }),
+    })
+    with config_manager.pin(snapshot):
+        params = define_mcp_server_params()
+
+    assert params.command == sys.executable
+    assert params.args == ["-m", "app.utils.mcp_tools.local_mcp_server"]
+    assert Path(params.env["LOCAL_MCP_FIXTURE_DIR"]).is_dir()
+    assert params.env["LOCAL_MCP_LATENCY_MS"] == "50" and params.env["LOCAL_MCP_ERROR_RATE"] == "0.1"
+    assert params.env["LOCAL_MCP_SEED"] == "7" and params.env["LOCAL_MCP_PAYLOAD_SIZE"] == "0"
@@ -0,0 +1,55 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.utils.page_cache import PageSnapshotCache, cache_page_tools, content_validator, normalize_url
+
+
+def test_normalize_url():
+    """Test that URL variants of the same page share a cache key."""
+    assert normalize_url("HTTPS://Example.com:443/films/?b=2&a=1&utm_source=x#top") == "https://example.com/films?a=1&b=2"
+    assert normalize_url("https://example.com") == normalize_url("https://example.com/")
+    assert normalize_url("https://example.com/films?page=2") != normalize_url("https://example.com/films?page=3")
+
+
+def test_content_validator_prefers_headers():
+    """Test that the ETag/Last-Modified headers are used before the content hash."""
+    assert content_validator({"ETag": '"abc"'}, "<html>") == 'etag:"abc"'
+    assert content_validator({"Last-Modified": "Mon"}, "<html>") == "last-modified:Mon"
+    assert content_validator({}, "<html>").startswith("sha256:")
+    assert content_validator() is None
+
+
+def test_cache_ttl_lru_and_versions():
+    """Test that snapshots are found by URL and version, expire and are evicted in LRU order."""
+    cache = PageSnapshotCache(max_entries=2, ttl_seconds=60)
+    cache.put("https://example.com/a", "v1", html="a1")
+    cache.put("https://example.com/a/", "v2", pdf_path="a2.pdf")
+
+    assert cache.get("https://example.com/a", "v1").data["html"] == "a1"
+    assert cache.get("https://example.com/a").validator == "v2"
+    assert cache.get("https://example.com/a", key="html").validator == "v1"
+    assert cache.get("https://example.com/a", "v3") is None
+
+    cache.put("https://example.com/b", "v1", html="b1")
+    assert len(cache) == 2 and cache.get("https://example.com/a", "v2") is None
+
+    cache.ttl_seconds = -1
+    assert cache.get("https://example.com/b", "v1") is None
+
+
+def test_cache_page_tools():
+    """Test that the MCP page tools are only called once per page."""
+    calls = []
+
+    async def scrape(url):
+        calls.append(url)
+        return f"# {url}"
+
+    tool = SimpleNamespace(name="scrape_as_markdown", coroutine=scrape)
+    other = SimpleNamespace(name="search_engine", coroutine=scrape)
+    cache_page_tools([tool, other], PageSnapshotCache())
+
+    assert asyncio.run(tool.coroutine(url="https://example.com/")) == "# https://example.com/"
+    assert asyncio.run(tool.coroutine(url="https://example.com")) == "# https://example.com/"
+    assert asyncio.run(other.coroutine(url="https://example.com")) == "# https://example.com"
+    assert len(calls) == 2
@@ -0,0 +1,83 @@
+import asyncio
+import pytest
+
+from app.utils.rate_limiter import LLMRateGovernor, PRIORITIES, retry_after_from_headers
+
+
+def test_request_bucket_limits_burst():
+    """Test that only max_burst requests are admitted at once."""
+    governor = LLMRateGovernor("test/model", requests_per_minute=60, max_burst=2)
+    assert governor.acquire(blocking=False)
+    assert governor.acquire(blocking=False)
+    assert not governor.acquire(blocking=False)
+    assert governor.metrics()["requests"] == 2
+    assert governor.metrics()["queued"] == 0
+
+
+def test_token_bucket_blocks_when_exhausted():
+    """Test that requests wait once the tokens per minute are used up."""
+    governor = LLMRateGovernor("test/model", tokens_per_minute=1000)
+    assert governor.acquire(blocking=False)
+    governor.consume_tokens(1500)
+    assert not governor.acquire(blocking=False)
+
+
+def test_rate_limited_pauses_requests():
+    """Test that a 429 pauses all requests for the retry-after period."""
+    governor = LLMRateGovernor("test/model")
+    governor.report_rate_limited(retry_after=30)
+    assert not governor.acquire(blocking=False)
+    assert governor.metrics()["rate_limited"] == 1
+
+
+def test_interrupted_acquire_leaves_the_queue(monkeypatch):
+    """Test that a request interrupted while waiting does not block the requests behind it."""
+    governor = LLMRateGovernor("test/model")
+    governor.report_rate_limited(retry_after=30)
+
+    def interrupt(seconds):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr("app.utils.rate_limiter.time.sleep", interrupt)
+    with pytest.raises(KeyboardInterrupt):
+        governor.acquire()
+    assert governor.metrics()["queued"] == 0
+
+
+def test_waiting_requests_are_admitted_by_priority():
+    """Test that queued planner requests are admitted before executor and PDF QA requests."""
+    governor = LLMRateGovernor("test/model", requests_per_minute=600, max_burst=1, check_every_n_seconds=0.01)
+    governor.acquire()  # use up the burst so the following requests queue
+    # pause the governor so all requests are queued before the first one is admitted
+    governor.report_rate_limited(retry_after=0.2)
+    order = []
+
+    async def request(name):
+        await governor.aacquire(PRIORITIES[name])
+        order.append(name)
+
+    async def run():
+        tasks = [asyncio.create_task(request(name)) for name in ["pdf_qa", "executor", "planner"]]
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+    assert order == ["planner", "executor", "pdf_qa"]
+    assert governor.metrics()["max_wait_seconds"] > 0
+
+
+@pytest.mark.parametrize(
+    "headers,expected",
+    [
+        ({"Retry-After": "7"}, 7.0),
+        ({"retry-after-ms": "1500"}, 1.5),
+        ({"x-ratelimit-reset-requests": "1s", "x-ratelimit-reset-tokens": "6m0s"}, 360.0),
+        ({"x-ratelimit-reset-tokens": "20ms"}, 0.02),
+        ({}, None),
+    ],
+)
+def test_retry_after_from_headers(headers, expected):
+    """Test parsing the wait time from provider rate limit headers."""
+    if expected is None:
+        assert retry_after_from_headers(headers) is None
+    else:
+        assert retry_after_from_headers(headers) == pytest.approx(expected)
@@ -0,0 +1,80 @@
+import gzip
+import json
+import os
+import pytest
+import tempfile
+from pathlib import Path
+
+from app.models.output_format_models import build_output_model
+from app.utils.config_manager import ConfigSnapshot, config_manager, freeze
+from app.utils.result_writer import NDJSONResultWriter, open_output_writer, save_result
+from app.utils.row_accumulator import RowAccumulator
+
+
+def _result(rows):
+    return {
+        "outputs": [{"Film-content": rows, "format_type": "table", "summary": "films"}],
+        "task_template": "tabular_extraction",
+        "prompt": "Extract the films",
+    }
+
+
+def _read(path):
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_ndjson_writer_writes_header_rows_and_footer(compress):
+    """Test that every row is written as its own record between the header and footer."""
+    rows = [{"title": f"Film {i}", "year": 2000 + i} for i in range(3)]
+    with tempfile.TemporaryDirectory() as temp_dir:
+        with NDJSONResultWriter(os.path.join(temp_dir, "output.ndjson"), compress=compress, metadata={"profile": "test"}) as writer:
+            writer.write_result(_result(rows))
+
+        assert writer.path.endswith(".gz") == compress
+        records = _read(writer.path)
+
+    assert records[0]["type"] == "header" and records[0]["profile"] == "test"
+    assert [r["data"] for r in records if r["type"] == "row"] == rows
+    assert [r for r in records if r["type"] == "output"][0]["summary"] == "films"
+    assert records[-1]["type"] == "footer"
+    assert records[-1]["rows"] == 3 and records[-1]["status"] == "completed"
+
+
+def test_ndjson_writer_marks_failed_runs():
+    """Test that rows written before an error are kept and the footer records the failure."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        with pytest.raises(RuntimeError):
+            with NDJSONResultWriter(os.path.join(temp_dir, "output.ndjson")) as writer:
+                writer.write_rows([{"title": "Film"}], content_key="Film-content")
+                raise RuntimeError("browser crashed")
+        records = _read(writer.path)
+
+    assert records[1]["data"] == {"title": "Film"}
+    assert records[-1]["status"] == "failed"
+    assert records[-1]["error"] == "browser crashed"
+
+
+def test_committed_rows_are_streamed_to_the_output_file():
+    """Test that committed rows are in output.ndjson during the run and written only once."""
+    snapshot = ConfigSnapshot(1, Path("missing"), {"local": freeze({"output": {"format": "ndjson"}})})
+    with tempfile.TemporaryDirectory() as temp_dir, config_manager.pin(snapshot):
+        open_output_writer(temp_dir, metadata={"profile": "test"})
+        accumulator = RowAccumulator(build_output_model({"Film": {"title": "str"}}), results_dir=temp_dir)
+        accumulator.commit(2, [{"title": "Film 2"}])
+        accumulator.commit(1, [{"title": "Film 1"}])
+        accumulator.close(status="incomplete")
+
+        path = os.path.join(temp_dir, "output.ndjson")
+        assert [r["data"]["title"] for r in _read(path) if r["type"] == "row"] == ["Film 2", "Film 1"]
+        assert not os.path.exists(os.path.join(temp_dir, "rows.ndjson"))
+
+        result = accumulator.merge_into(_result([{"title": "Film 3"}]))
+        assert save_result(result, temp_dir) == path
+        records = _read(path)
+
+    assert records[0]["profile"] == "test"
+    assert [r["data"]["title"] for r in records if r["type"] == "row"] == ["Film 2", "Film 1", "Film 3"]
+    assert records[-1]["rows"] == 3 and records[-1]["status"] == "incomplete"
@@ -0,0 +1,79 @@
+import json
+import os
+import pytest
+import tempfile
+
+from pydantic import BaseModel
+
+from app.models.output_format_models import build_output_model
+from app.utils.row_accumulator import RowAccumulator, output_content_model
+
+CONTENT_STRUCTURE = {"Film": {"title": "str", "year": "int"}}
+
+
+def _read(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_row_accumulator_flushes_valid_rows_per_page():
+    """Test that committed rows are validated and on disk before the run ends."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        accumulator = RowAccumulator(build_output_model(CONTENT_STRUCTURE), results_dir=temp_dir)
+        committed, errors = accumulator.commit(1, [{"title": "Film 1", "year": 2001}, {"title": "Film 2", "year": "unknown"}])
+        accumulator.commit(2, [{"title": "Film 3", "year": "2003"}])
+
+        assert committed == 1 and len(errors) == 1 and accumulator.row_count == 2
+        records = _read(os.path.join(temp_dir, "rows.ndjson"))
+        assert [r["data"] for r in records if r["type"] == "row"] == [
+            {"title": "Film 1", "year": 2001},
+            {"title": "Film 3", "year": 2003},
+        ]
+        assert records[-1]["type"] == "row"
+
+        accumulator.close(status="incomplete")
+        assert _read(os.path.join(temp_dir, "rows.ndjson"))[-1]["status"] == "incomplete"
+
+    with pytest.raises(ValueError):
+        accumulator.commit(2, [])
+
+
+def test_row_accumulator_merges_into_result():
+    """Test that committed rows come first in page order and are not duplicated."""
+    accumulator = RowAccumulator(build_output_model(CONTENT_STRUCTURE))
+    accumulator.commit(2, [{"title": "Film 2", "year": 2002}])
+    accumulator.commit(1, [{"title": "Film 1", "year": 2001}])
+
+    result = accumulator.merge_into({"outputs": [{
+        "Film-content": [{"title": "Film 2", "year": 2002}, {"title": "Film 3", "year": 2003}],
+        "format_type": "table",
+        "summary": "films",
+    }]})
+    assert [row["title"] for row in result["outputs"][0]["Film-content"]] == ["Film 1", "Film 2", "Film 3"]
+
+    partial = accumulator.merge_into(None)
+    assert [row["title"] for row in partial["outputs"][0]["Film-content"]] == ["Film 1", "Film 2"]
+
+
+def test_merge_keeps_identical_rows_that_were_not_committed():
+    """Test that only repeated committed pages are dropped, not identical rows of other pages."""
+    accumulator = RowAccumulator(build_output_model(CONTENT_STRUCTURE))
+    accumulator.commit(1, [{"title": "TBA", "year": None}, {"title": "Film 1", "year": 2001}])
+
+    tba = {"title": "TBA", "year": None}
+    result = accumulator.merge_into({"outputs": [{"Film-content": [tba, {"title": "Film 3", "year": 2003}]}]})
+    assert [row["title"] for row in result["outputs"][0]["Film-content"]] == ["TBA", "Film 1", "TBA", "Film 3"]
+
+    repeated = accumulator.merge_into({"outputs": [{"Film-content": accumulator.rows + [tba]}]})
+    assert [row["title"] for row in repeated["outputs"][0]["Film-content"]] == ["TBA", "Film 1", "TBA"]
+
+
+def test_output_formats_without_outputs_are_rejected():
+    """Test that models not built by build_output_model raise a ValueError."""
+    class Answer(BaseModel):
+        answer: str
+
+    with pytest.raises(ValueError):
+        output_content_model(Answer)
+    with pytest.raises(ValueError):
+        RowAccumulator(Answer)
@@ -0,0 +1,52 @@
+from app.utils.config.local import build_content_model
+from app.utils.table_extraction import coerce_cell, extract_table_rows
+
+CONTENT_MODEL = build_content_model({"Film": {"film": "str", "year": "int", "awards": "int", "box_office": "float"}})
+
+FILMS_HTML = """
+<html><body>
+<table class="wikitable">
+  <tr><th>Film</th><th>Year</th><th>Awards</th><th>Box office ($M)</th></tr>
+  <tr><td><i>Anora</i></td><td rowspan="2">2024<sup>[1]</sup></td><td>5</td><td>56.3</td></tr>
+  <tr><td>The Brutalist</td><td>3</td><td>50.1</td></tr>
+  <tr><td colspan="4">2023</td></tr>
+  <tr><td>Oppenheimer</td><td>2023</td><td>7</td><td>975.8</td></tr>
+</table>
+<table class="wikitable">
+  <tr><th>Film</th><th>Year</th><th>Awards</th><th>Box office ($M)</th></tr>
+  <tr><td>Titanic</td><td>1997</td><td>11</td><td>2,264.7</td></tr>
+</table>
+<table><tr><th>Name</th><th>Country</th></tr><tr><td>Jane</td><td>France</td></tr></table>
+</body></html>
+"""
+
+
+def test_coerce_cell():
+    """Test that cells are coerced to the content structure types."""
+    assert coerce_cell("1,234", int) == (1234, True)
+    assert coerce_cell("$2,264.7", float) == (2264.7, True)
+    assert coerce_cell("—", int) == (None, True)
+    assert coerce_cell("unknown", int) == (None, False)
+    assert coerce_cell("Yes", bool) == (True, True)
+    # the whole cell must be the number
+    assert coerce_cell("12.5", int) == (None, False)
+    assert coerce_cell("5.0", int) == (5, True)
+    assert coerce_cell("1999–2003", int) == (None, False)
+    assert coerce_cell("3 wins", int) == (None, False)
+    assert coerce_cell("1.2.3", float) == (None, False)
+
+
+def test_extract_table_rows_merges_matching_tables():
+    """Test that rowspans and footnotes are handled and tables with the same headers are merged."""
+    match = extract_table_rows(FILMS_HTML, CONTENT_MODEL)
+
+    assert match is not None and match.confidence >= 0.8
+    assert match.headers["box_office"] == "Box office ($M)"
+    assert match.rows[1] == {"film": "The Brutalist", "year": 2024, "awards": 3, "box_office": 50.1}
+    assert [row["film"] for row in match.rows] == ["Anora", "The Brutalist", "Oppenheimer", "Titanic"]
+
+
+def test_extract_table_rows_low_confidence():
+    """Test that tables matching few fields are left to the agent."""
+    model = build_content_model({"Athlete": {"athlete": "str", "time": "float", "venue": "str", "name": "str"}})
+    assert extract_table_rows(FILMS_HTML, model) is None